@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import UserProfile, Task, Project
+from django.utils import timezone
+from .models import UserProfile, Task, Project, StatCounter, UserWorkload, Job
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
@@ -9,8 +10,8 @@ class UserProfileAdmin(admin.ModelAdmin):
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
-    list_display = ['title', 'priority', 'status', 'assigned_to', 'created_by', 'created_at']
-    list_filter = ['priority', 'status', 'created_at']
+    list_display = ['title', 'priority', 'status', 'assigned_to', 'project', 'created_by', 'created_at']
+    list_filter = ['priority', 'status', 'project', 'created_at']
     search_fields = ['title', 'description', 'assigned_to__username']
     list_editable = ['priority', 'status']
 
@@ -20,3 +21,25 @@ class ProjectAdmin(admin.ModelAdmin):
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'description', 'manager__username']
     filter_horizontal = ['members']
+
+@admin.register(StatCounter)
+class StatCounterAdmin(admin.ModelAdmin):
+    list_display = ['key', 'value']
+    search_fields = ['key']
+
+@admin.register(UserWorkload)
+class UserWorkloadAdmin(admin.ModelAdmin):
+    list_display = ['user', 'status', 'priority', 'tasks', 'overdue', 'next_due_date']
+    list_filter = ['status', 'priority']
+    search_fields = ['user__username']
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'max_attempts', 'run_at', 'locked_by', 'created_at']
+    list_filter = ['status', 'name']
+    readonly_fields = ['last_error']
+    actions = ['retry']
+
+    @admin.action(description="Retry selected jobs now")
+    def retry(self, request, queryset):
+        queryset.exclude(status=Job.RUNNING).update(status=Job.QUEUED, attempts=0, run_at=timezone.now())
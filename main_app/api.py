@@ -0,0 +1,389 @@
+"""
+JSON API for tasks, projects and users.
+
+Every resource supports sparse fieldsets (``?fields=id,title,status``), which
+become ``.only()`` so unrequested columns are never read, and cursor
+pagination (``?cursor=``, ``?limit=``). Responses carry an ETag and
+Last-Modified derived from ``updated_at`` (users, whose own columns have no
+timestamp, get only an ETag). The conditional check runs before the view and
+reads only primary keys and timestamps, so a client revalidating an unchanged
+resource gets 304 Not Modified without any row being loaded or
+serialized.
+
+Tasks and projects can also be created (POST), updated (PATCH) and deleted
+(DELETE). Request bodies are JSON validated with TaskForm/ProjectForm, and
+need the CSRF token in an X-CSRFToken header like any other session POST.
+"""
+
+import hashlib
+import json
+from collections import namedtuple
+from functools import wraps
+from operator import attrgetter
+
+from django.contrib.auth.models import User
+from django.db.models import Prefetch
+from django.forms.models import model_to_dict
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition, require_http_methods
+
+from .forms import ProjectForm, TaskForm
+from .models import Project, Task, UserProfile
+from .pagination import CursorPaginator
+from .search import search
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# ``columns`` are the .only() paths a field reads; ``prefetch`` is a lookup it needs
+Field = namedtuple('Field', 'columns get prefetch', defaults=(None,))
+
+
+def column(name):
+    return Field((name,), attrgetter(name))
+
+
+def foreign_key(name):
+    return Field((name,), attrgetter(f'{name}_id'))
+
+
+def profile_column(name, get=None):
+    get = get or attrgetter(name)
+
+    def get_value(user):
+        # Users who never edited their profile have none; show its blank values
+        return get(UserProfile.for_user(user))
+    return Field((f'userprofile__{name}',), get_value)
+
+
+def _picture_url(profile):
+    return profile.profile_picture.url if profile.profile_picture else None
+
+
+def _thumbnail_urls(profile):
+    return {size: profile.thumbnail(size) for size in profile.thumbnails}
+
+
+def _user_updated_at(user):
+    return UserProfile.for_user(user).updated_at or user.date_joined
+
+
+class Resource:
+    """
+    How one model is exposed: its fields, timestamp, ordering, filters and form.
+    ``etag_columns`` go into the ETag next to the timestamp, for rows that can
+    change without it moving; such resources send no Last-Modified.
+    """
+
+    def __init__(self, model, fields, updated_at, filter, ordering=('-created_at', '-id'),
+                 select_related=(), form=None, owner=None, etag_columns=()):
+        self.model = model
+        self.fields = fields
+        self.updated_at = updated_at
+        self.etag_columns = etag_columns
+        self.filter = filter
+        self.ordering = ordering
+        self.select_related = select_related
+        self.form = form
+        self.owner = owner
+
+    def parse_fields(self, request):
+        """The requested field names, or None if any are unknown."""
+        names = [name for name in request.GET.get('fields', '').split(',') if name]
+        if not names:
+            return list(self.fields)
+        if any(name not in self.fields for name in names):
+            return None
+        return names
+
+    def queryset(self, names):
+        """Rows loading only what ``names`` need, plus the keys pagination and ETags rely on."""
+        columns = {'pk', self.updated_at, *self.etag_columns}
+        columns.update(name.lstrip('-') for name in self.ordering)
+        prefetches = []
+        for name in names:
+            columns.update(self.fields[name].columns)
+            if self.fields[name].prefetch:
+                prefetches.append(self.fields[name].prefetch)
+        queryset = self.model.objects.select_related(*self.select_related).only(*columns)
+        return queryset.prefetch_related(*prefetches)
+
+    def timestamp(self, obj):
+        return self.fields['updated_at'].get(obj)
+
+    def etag_key(self, obj, timestamp):
+        values = [str(obj.pk), timestamp.isoformat()]
+        values.extend(str(getattr(obj, name)) for name in self.etag_columns)
+        return ':'.join(values)
+
+    def serialize(self, obj, names):
+        return {name: self.fields[name].get(obj) for name in names}
+
+
+def _id(value):
+    # Hindi number ay walang matching row
+    return int(value) if value.isdigit() else 0
+
+
+def filter_tasks(queryset, params):
+    if params.get('search'):
+        queryset = search(queryset, params['search'])
+    for name in ('status', 'priority'):
+        if params.get(name):
+            queryset = queryset.filter(**{name: params[name]})
+    for name in ('assigned_to', 'project'):
+        if params.get(name):
+            queryset = queryset.filter(**{name: _id(params[name])})
+    return queryset
+
+
+def filter_projects(queryset, params):
+    if params.get('search'):
+        queryset = search(queryset, params['search'])
+    if params.get('manager'):
+        queryset = queryset.filter(manager=_id(params['manager']))
+    if params.get('is_active') in ('true', 'false'):
+        queryset = queryset.filter(Project.active_filter(params['is_active'] == 'true'))
+    return queryset
+
+
+def filter_users(queryset, params):
+    if params.get('search'):
+        queryset = search(queryset, params['search'])
+    return queryset
+
+
+def _member_ids(project):
+    return [member.pk for member in project.members.all()]
+
+
+RESOURCES = {
+    'tasks': Resource(
+        Task,
+        {
+            'id': column('id'),
+            'title': column('title'),
+            'description': column('description'),
+            'priority': column('priority'),
+            'status': column('status'),
+            'assigned_to': foreign_key('assigned_to'),
+            'created_by': foreign_key('created_by'),
+            'project': foreign_key('project'),
+            'due_date': column('due_date'),
+            'created_at': column('created_at'),
+            'updated_at': column('updated_at'),
+        },
+        updated_at='updated_at',
+        filter=filter_tasks,
+        form=TaskForm,
+        owner='created_by',
+    ),
+    'projects': Resource(
+        Project,
+        {
+            'id': column('id'),
+            'name': column('name'),
+            'description': column('description'),
+            'manager': foreign_key('manager'),
+            'members': Field((), _member_ids, Prefetch('members', queryset=User.objects.only('id'))),
+            'deadline': column('deadline'),
+            'is_active': column('is_active'),
+            'created_at': column('created_at'),
+            'updated_at': column('updated_at'),
+        },
+        updated_at='updated_at',
+        filter=filter_projects,
+        form=ProjectForm,
+        owner='manager',
+    ),
+    'users': Resource(
+        User,
+        {
+            'id': column('id'),
+            'username': column('username'),
+            'first_name': column('first_name'),
+            'last_name': column('last_name'),
+            'email': column('email'),
+            'date_joined': column('date_joined'),
+            'phone': profile_column('phone'),
+            'address': profile_column('address'),
+            'profile_picture': profile_column('profile_picture', _picture_url),
+            'thumbnails': profile_column('thumbnails', _thumbnail_urls),
+            'updated_at': Field(('userprofile__updated_at',), _user_updated_at),
+        },
+        updated_at='userprofile__updated_at',
+        filter=filter_users,
+        ordering=('-date_joined', '-id'),
+        select_related=('userprofile',),
+        # Editing a user moves no timestamp, so their own fields version them
+        etag_columns=('username', 'first_name', 'last_name', 'email'),
+    ),
+}
+
+
+def error(status, message, **extra):
+    return JsonResponse({'error': message, **extra}, status=status)
+
+
+def api_login_required(view):
+    """login_required answering 401 instead of redirecting to the login page."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return error(401, 'Authentication required.')
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def get_resource(name):
+    if name not in RESOURCES:
+        raise Http404(f"No API resource named {name!r}.")
+    return RESOURCES[name]
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        return None
+    return limit if 1 <= limit <= MAX_LIMIT else None
+
+
+def _page(resource, request, names, limit):
+    queryset = resource.filter(resource.queryset(names), request.GET)
+    paginator = CursorPaginator(queryset, limit, ordering=resource.ordering)
+    return paginator.get_page(request.GET.get('cursor'))
+
+
+def _page_url(request, cursor):
+    if not cursor:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return f'{request.path}?{params.urlencode()}'
+
+
+# Conditional GET
+def _version(request, resource, pk=None):
+    """
+    (ETag, Last-Modified) of the response, from the primary keys and timestamps
+    of the rows it would contain. Memoized on the request, since condition()
+    asks for each separately.
+    """
+    if not hasattr(request, '_api_version'):
+        request._api_version = (None, None)
+        names = resource.parse_fields(request)
+        if request.method in ('GET', 'HEAD') and names is not None:
+            if pk is None:
+                limit = _limit(request)
+                rows = list(_page(resource, request, [], limit)) if limit else None
+            else:
+                rows = list(resource.queryset([]).filter(pk=pk))
+            if rows:
+                timestamps = [resource.timestamp(row) for row in rows]
+                keys = ','.join(resource.etag_key(row, timestamp) for row, timestamp in zip(rows, timestamps))
+                digest = hashlib.md5(f'{request.get_full_path()}|{keys}'.encode()).hexdigest()
+                last_modified = None if resource.etag_columns else max(timestamps)
+                request._api_version = (f'"{digest}"', last_modified)
+    return request._api_version
+
+
+def list_etag(request, resource):
+    return _version(request, get_resource(resource))[0]
+
+
+def list_last_modified(request, resource):
+    return _version(request, get_resource(resource))[1]
+
+
+def detail_etag(request, resource, pk):
+    return _version(request, get_resource(resource), pk)[0]
+
+
+def detail_last_modified(request, resource, pk):
+    return _version(request, get_resource(resource), pk)[1]
+
+
+# Writes
+def _json_body(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _form_data(form_class, instance):
+    """The instance's current values as form data, so a PATCH only has to send what changes."""
+    data = model_to_dict(instance, fields=form_class._meta.fields)
+    for name, value in data.items():
+        if isinstance(value, list):
+            data[name] = [obj.pk for obj in value]
+    return data
+
+
+def _save(request, resource, data, instance=None, status=200):
+    form = resource.form(data, instance=instance)
+    if not form.is_valid():
+        return error(400, 'Invalid data.', errors=form.errors.get_json_data())
+    obj = form.save(commit=False)
+    if instance is None:
+        setattr(obj, resource.owner, request.user)
+    obj.save()
+    form.save_m2m()
+    return JsonResponse(resource.serialize(obj, list(resource.fields)), status=status)
+
+
+# Views
+@api_login_required
+@require_http_methods(['GET', 'HEAD', 'POST'])
+@condition(etag_func=list_etag, last_modified_func=list_last_modified)
+def resource_list(request, resource):
+    """A page of tasks, projects or users (GET), or a new task or project (POST)"""
+    resource = get_resource(resource)
+    if request.method == 'POST':
+        if resource.form is None:
+            return error(405, 'This resource is read-only.')
+        data = _json_body(request)
+        if data is None:
+            return error(400, 'The request body must be a JSON object.')
+        return _save(request, resource, data, status=201)
+
+    names = resource.parse_fields(request)
+    if names is None:
+        return error(400, 'Unknown field.', fields=sorted(resource.fields))
+    limit = _limit(request)
+    if limit is None:
+        return error(400, f'limit must be between 1 and {MAX_LIMIT}.')
+    page = _page(resource, request, names, limit)
+    return JsonResponse({
+        'results': [resource.serialize(obj, names) for obj in page],
+        'next': _page_url(request, page.next_cursor),
+        'previous': _page_url(request, page.previous_cursor),
+    })
+
+
+@api_login_required
+@require_http_methods(['GET', 'HEAD', 'PATCH', 'DELETE'])
+@condition(etag_func=detail_etag, last_modified_func=detail_last_modified)
+def resource_detail(request, resource, pk):
+    """One task, project or user (GET), updated (PATCH) or deleted (DELETE)"""
+    resource = get_resource(resource)
+    if request.method in ('PATCH', 'DELETE'):
+        if resource.form is None:
+            return error(405, 'This resource is read-only.')
+        instance = get_object_or_404(resource.model, pk=pk)
+        if request.method == 'DELETE':
+            instance.delete()
+            return HttpResponse(status=204)
+        data = _json_body(request)
+        if data is None:
+            return error(400, 'The request body must be a JSON object.')
+        return _save(request, resource, {**_form_data(resource.form, instance), **data}, instance)
+
+    names = resource.parse_fields(request)
+    if names is None:
+        return error(400, 'Unknown field.', fields=sorted(resource.fields))
+    obj = get_object_or_404(resource.queryset(names), pk=pk)
+    return JsonResponse(resource.serialize(obj, names))
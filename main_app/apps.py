@@ -7,3 +7,5 @@ class MainAppConfig(AppConfig):
 
     def ready(self):
         import main_app.signals
+        # Installs the query recorder on every database connection
+        import main_app.perf
@@ -0,0 +1,152 @@
+"""
+Async versions of the read-heavy views, used when settings.ASYNC_VIEWS is on
+(asgi.py turns it on). They build the same contexts as their counterparts in
+views.py with the async ORM and render the template in a worker thread. In
+Django 4.2 every async ORM call runs on the one thread-sensitive executor, so
+a view's queries run one after another, as in the sync views; what ASGI gains
+is that a waiting request does not hold a worker.
+"""
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404
+from django.shortcuts import render
+
+from . import caching, counters
+from .forms import TaskBulkForm
+from .models import UserProfile, Task, Project
+from .pagination import CursorPaginator
+from .views import (
+    PROJECT_SORT_CHOICES, dashboard_counter_keys, dashboard_stats, filtered_projects, filtered_tasks, user_projects,
+)
+
+arender = sync_to_async(render)
+
+
+def _load_user(request):
+    # Evaluates the lazy request.user, which reads the session and database
+    request.user.is_authenticated
+    return request.user
+
+
+def login_required(view):
+    """login_required for async views (Django 4.2's decorator only wraps sync ones)."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await sync_to_async(_load_user)(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def aget_object_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+
+
+async def alist(queryset):
+    return [obj async for obj in queryset]
+
+
+@login_required
+async def dashboard(request):
+    user = request.user
+    stats_version = await caching.aversions('tasks', 'projects', 'users', f'user:{user.pk}')
+    recent_version = await caching.aversions(f'user:{user.pk}')
+
+    async def get_stats():
+        return dashboard_stats(await counters.aget_counts(dashboard_counter_keys(user)), user)
+
+    async def get_recent():
+        return {
+            'recent_tasks': await alist(Task.objects.filter(assigned_to=user)[:5]),
+            'recent_projects': await alist(user_projects(user)[:5]),
+        }
+
+    stats = await caching.acached_context(f'dashboard:stats:{user.pk}', stats_version, get_stats)
+    recent = await caching.acached_context(f'dashboard:recent:{user.pk}', recent_version, get_recent)
+    return await arender(request, 'dashboard.html', {
+        **stats,
+        **recent,
+        'cache_timeout': settings.FRAGMENT_CACHE_TIMEOUT,
+        'stats_version': stats_version,
+        'recent_version': recent_version,
+    })
+
+
+@login_required
+async def task_list(request):
+    tasks, filters = filtered_tasks(request)
+    paginator = CursorPaginator(tasks, 10, count_mode='approximate')
+    page_obj = await paginator.aget_page(request.GET.get('cursor'))
+    return await arender(request, 'tasks/task_list.html', dict(
+        filters,
+        page_obj=page_obj,
+        bulk_form=TaskBulkForm(),
+        status_choices=Task.STATUS_CHOICES,
+        priority_choices=Task.PRIORITY_CHOICES,
+    ))
+
+
+@login_required
+async def project_list(request):
+    projects, ordering, filters = filtered_projects(request)
+    paginator = CursorPaginator(projects, 10, ordering=ordering, count_mode='approximate')
+    page_obj = await paginator.aget_page(request.GET.get('cursor'))
+    return await arender(request, 'projects/project_list.html', dict(
+        filters,
+        page_obj=page_obj,
+        sort_choices=PROJECT_SORT_CHOICES,
+    ))
+
+
+@login_required
+async def user_detail(request, pk):
+    version = await caching.aversions(f'user:{pk}')
+
+    async def get_context():
+        user = await aget_object_or_404(User.objects.all(), pk=pk)
+        projects = user_projects(user)
+        user_tasks_key = counters.user_tasks_key(user.pk)
+        task_counts = await counters.aget_counts([user_tasks_key])
+        return {
+            'user': user,
+            'profile': await UserProfile.afor_user(user),
+            'user_tasks': await alist(Task.objects.filter(assigned_to=user)[:10]),
+            'user_projects': await alist(projects[:10]),
+            'task_count': task_counts[user_tasks_key],
+            'project_count': await projects.acount(),
+        }
+
+    context = await caching.acached_context(f'user_detail:{pk}', version, get_context)
+    return await arender(request, 'users/user_detail.html', dict(
+        context, cache_timeout=settings.FRAGMENT_CACHE_TIMEOUT, cache_version=version,
+    ))
+
+
+@login_required
+async def project_detail(request, pk):
+    version = await caching.aversions(f'project:{pk}')
+
+    async def get_context():
+        project = await aget_object_or_404(Project.objects.select_related('manager'), pk=pk)
+        members = await alist(project.members.select_related('userprofile'))
+        return {
+            'project': project,
+            'members': members,
+            'member_count': len(members),
+            'project_tasks': await alist(project.tasks.select_related('assigned_to')[:10]),
+            'task_status_counts': await counters.aproject_status_counts(project.pk),
+        }
+
+    context = await caching.acached_context(f'project_detail:{pk}', version, get_context)
+    return await arender(request, 'projects/project_detail.html', dict(
+        context, cache_timeout=settings.FRAGMENT_CACHE_TIMEOUT, cache_version=version,
+    ))
@@ -0,0 +1,47 @@
+"""
+User autocomplete for the assignee and member pickers.
+
+Matches users whose username, first name or last name starts with the typed
+text, ignoring case. Each field has an index on ``LOWER(field)`` (migration
+0010), and the prefix is turned into a range on that expression so SQLite
+and PostgreSQL can seek into the index instead of scanning every user. A
+plain ``istartswith`` would not: its ``LIKE``/``UPPER()`` cannot use those
+indexes.
+"""
+
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+FIELDS = ('username', 'first_name', 'last_name')
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def _prefix_range(field, prefix):
+    # Everything starting with 'ali' sorts in ['ali', 'alj'); the LIKE re-checks
+    # the few rows a linguistic collation may sort into that range
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': upper, f'{field}__startswith': prefix})
+
+
+def match_users(query, limit=DEFAULT_LIMIT):
+    """Up to ``limit`` users whose username or name starts with ``query``, by username."""
+    prefix = query.strip().lower()
+    if not prefix:
+        return User.objects.none()
+    condition = Q()
+    for field in FIELDS:
+        condition |= _prefix_range(f'{field}_lower', prefix)
+    return (
+        User.objects.alias(**{f'{field}_lower': Lower(field) for field in FIELDS})
+        .filter(condition)
+        .order_by('username_lower')
+        .only('id', 'username', 'first_name', 'last_name')[:limit]
+    )
+
+
+def label(user):
+    """How a user is shown in the pickers: their full name and username, or just the username."""
+    name = user.get_full_name()
+    return f'{name} ({user.username})' if name else user.username
@@ -0,0 +1,38 @@
+"""
+Authentication backend that serves ``request.user`` from the cache.
+
+AuthenticationMiddleware looks the logged-in user up on every request. This
+backend keeps each user in the cache for USER_CACHE_TIMEOUT seconds, so that
+lookup is a cache hit instead of a query. signals.py forgets a user as soon
+as they are saved or deleted, so a changed password, name or permission flag
+takes effect on the next request. Users are cached from the primary, since a
+lagging replica could still hold the old password hash.
+"""
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from . import routers
+
+USER_KEY_PREFIX = 'auth-user:'
+
+
+def _user_key(user_id):
+    return f'{USER_KEY_PREFIX}{user_id}'
+
+
+def forget_user(user_id):
+    cache.delete(_user_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        key = _user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            with routers.primary():
+                user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,460 @@
+"""
+Helpers shared by the benchmark management commands.
+
+Benchmarks never touch the configured database: they build a throwaway test
+database, seed it, measure, and drop it again. The view benchmarks GET every
+route in main_app/urls.py with the test client and report latency
+percentiles, query counts and allocations, which can be saved as a JSON
+baseline and compared against later.
+"""
+
+import math
+import random
+import statistics
+import time
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import DatabaseError, close_old_connections, connection, connections
+from django.db.models import DateTimeField
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from . import perf
+from .models import Task, Project
+from .pagination import CursorPaginator
+from .urls import urlpatterns
+
+
+@contextmanager
+def scratch_database(alias='default', verbosity=0):
+    """Create a migrated throwaway database for ``alias`` and drop it afterwards."""
+    connection = connections[alias]
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+
+
+def insert_rows(connection, model, columns, rows):
+    """INSERT plain tuples of ``columns`` values, skipping model instances and field hooks."""
+    fields = [model._meta.get_field(column) for column in columns]
+    table = connection.ops.quote_name(model._meta.db_table)
+    names = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(columns))
+    # Store datetimes exactly as the ORM does, or equality lookups on them miss
+    adapt = [connection.ops.adapt_datetimefield_value if isinstance(field, DateTimeField) else None
+             for field in fields]
+    if any(adapt):
+        rows = [tuple(f(value) if f else value for f, value in zip(adapt, row)) for row in rows]
+    with connection.cursor() as cursor:
+        cursor.executemany(f'INSERT INTO {table} ({names}) VALUES ({placeholders})', rows)
+
+
+def seed_rows(tasks, users=1000, projects=None, batch_size=10000, seed=0, alias='default'):
+    """
+    Fill the database with ``tasks`` tasks spread over ``users`` users.
+
+    Rows are written with raw multi-row INSERTs so that ``created_at`` can be
+    spread over the past two years instead of being stamped with one time.
+    """
+    rng = random.Random(seed)
+    connection = connections[alias]
+    now = timezone.now()
+    password = make_password('password123')
+    projects = projects if projects is not None else max(1, tasks // 100)
+
+    User.objects.using(alias).bulk_create(
+        [User(username=f'bench{i}', password=password, date_joined=now) for i in range(users)],
+        batch_size=batch_size,
+    )
+    user_ids = list(User.objects.using(alias).values_list('id', flat=True))
+
+    statuses = [value for value, label in Task.STATUS_CHOICES]
+    priorities = [value for value, label in Task.PRIORITY_CHOICES]
+
+    def created():
+        return now - timedelta(seconds=rng.randrange(2 * 365 * 24 * 3600))
+
+    project_rows = (
+        (f'Project {i}', 'Benchmark project', rng.choice(user_ids), created(), now, rng.random() < 0.8)
+        for i in range(projects)
+    )
+    insert_in_batches(connection, Project,
+                       ['name', 'description', 'manager', 'created_at', 'updated_at', 'is_active'],
+                       project_rows, batch_size)
+
+    task_rows = (
+        (f'Task {i}', 'Benchmark task description', rng.choice(priorities), rng.choice(statuses),
+         rng.choice(user_ids), rng.choice(user_ids), created(), now)
+        for i in range(tasks)
+    )
+    insert_in_batches(connection, Task,
+                       ['title', 'description', 'priority', 'status', 'assigned_to', 'created_by',
+                        'created_at', 'updated_at'],
+                       task_rows, batch_size)
+    return user_ids
+
+
+def insert_in_batches(connection, model, columns, rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            insert_rows(connection, model, columns, batch)
+            batch = []
+    if batch:
+        insert_rows(connection, model, columns, batch)
+
+
+def analyze(connection):
+    """Refresh planner statistics so EXPLAIN reflects the seeded data."""
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def time_queryset(queryset, repeat=5):
+    """Median wall time in milliseconds of fully evaluating ``queryset``."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        list(queryset.all())
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+# View benchmarks
+DEEP_PAGE = 50
+BULK_TASKS = 5000
+
+
+class Case:
+    """
+    One URL to benchmark, fetched with GET or, given ``data``, POSTed as JSON.
+    ``anonymous`` cases run logged out; ``relogin`` cases log the client out,
+    so it logs back in before every run.
+    """
+
+    def __init__(self, name, url, repeat=None, anonymous=False, relogin=False, data=None):
+        self.name = name
+        self.url = url
+        self.data = data
+        self.repeat = repeat
+        self.anonymous = anonymous
+        self.relogin = relogin
+
+
+def _cursor_for_page(queryset, page, ordering=('-created_at', '-id')):
+    """The cursor the list views would hand out for ``page``, as their paginators order it."""
+    paginator = CursorPaginator(queryset, 10, ordering=ordering)
+    cursor = None
+    for _ in range(page - 1):
+        current = paginator.get_page(cursor)
+        if not current.has_next():
+            break
+        cursor = current.next_cursor
+    return cursor
+
+
+def cases(user):
+    """Every route in main_app/urls.py, with filtered, searched and deep-page variants of the lists."""
+    task = Task.objects.order_by('-pk').first()
+    project = Project.objects.order_by('-pk').first()
+    deep_tasks = _cursor_for_page(Task.objects.all(), DEEP_PAGE)
+    deep_projects = _cursor_for_page(Project.objects.all(), DEEP_PAGE)
+    bulk_ids = list(Task.objects.order_by('-pk').values_list('pk', flat=True)[:BULK_TASKS])
+    deep_users = _cursor_for_page(User.objects.all(), DEEP_PAGE, ordering=('-date_joined', '-id'))
+    return [
+        Case('home', reverse('home'), anonymous=True),
+        Case('home (logged in)', reverse('home')),
+        Case('dashboard', reverse('dashboard')),
+        Case('login', reverse('login'), anonymous=True),
+        Case('logout', reverse('logout'), relogin=True),
+        Case('register', reverse('register'), anonymous=True),
+        Case('profile', reverse('profile')),
+        Case('user_list', reverse('user_list')),
+        Case('user_list ?search', reverse('user_list') + '?search=user1'),
+        Case(f'user_list page {DEEP_PAGE}', f"{reverse('user_list')}?cursor={deep_users}"),
+        Case('user_detail', reverse('user_detail', args=[user.pk])),
+        Case('user_autocomplete', reverse('user_autocomplete') + '?q=us'),
+        Case('task_list', reverse('task_list')),
+        Case('task_list ?status', reverse('task_list') + '?status=pending'),
+        Case('task_list ?status&priority', reverse('task_list') + '?status=in_progress&priority=high'),
+        Case('task_list ?search', reverse('task_list') + '?search=deploy'),
+        Case('task_list ?search&status', reverse('task_list') + '?search=fix+auth&status=pending'),
+        Case(f'task_list page {DEEP_PAGE}', f"{reverse('task_list')}?cursor={deep_tasks}"),
+        Case('task_create', reverse('task_create')),
+        Case(f'task_bulk {BULK_TASKS} tasks', reverse('task_bulk'), data={
+            'action': 'update', 'priority': 'high', 'task_ids': bulk_ids,
+        }),
+        Case('task_detail', reverse('task_detail', args=[task.pk])),
+        Case('task_update', reverse('task_update', args=[task.pk])),
+        Case('task_delete', reverse('task_delete', args=[task.pk])),
+        Case('project_list', reverse('project_list')),
+        Case('project_list ?search', reverse('project_list') + '?search=website'),
+        Case('project_list ?is_active', reverse('project_list') + '?is_active=1'),
+        Case('project_list ?sort=-open_tasks', reverse('project_list') + '?sort=-open_tasks'),
+        Case('project_list ?sort=next_due', reverse('project_list') + '?sort=next_due'),
+        Case(f'project_list page {DEEP_PAGE}', f"{reverse('project_list')}?cursor={deep_projects}"),
+        Case('project_create', reverse('project_create')),
+        Case('project_detail', reverse('project_detail', args=[project.pk])),
+        Case('project_update', reverse('project_update', args=[project.pk])),
+        Case('project_delete', reverse('project_delete', args=[project.pk])),
+        # Full exports scale with the table, so a single run each
+        Case('live_search tasks', reverse('live_search', args=['tasks']) + '?search=fix+au'),
+        Case('live_search tasks ?format=json', reverse('live_search', args=['tasks']) + '?search=dep&format=json'),
+        Case('live_search projects', reverse('live_search', args=['projects']) + '?search=web'),
+        Case('live_search users', reverse('live_search', args=['users']) + '?search=user1'),
+        Case('export_data tasks', reverse('export_data', args=['tasks']) + '?format=csv', repeat=1),
+        Case('export_data projects', reverse('export_data', args=['projects']) + '?format=jsonl', repeat=1),
+        Case('workload_report', reverse('workload_report')),
+        Case('api tasks', reverse('api_list', args=['tasks'])),
+        Case('api tasks ?fields', reverse('api_list', args=['tasks']) + '?fields=id,title,status'),
+        Case('api tasks ?status&limit', reverse('api_list', args=['tasks']) + '?status=pending&limit=100'),
+        Case(f'api tasks page {DEEP_PAGE}', f"{reverse('api_list', args=['tasks'])}?limit=10&cursor={deep_tasks}"),
+        Case('api task', reverse('api_detail', args=['tasks', task.pk])),
+        Case('api projects', reverse('api_list', args=['projects'])),
+        Case('api project', reverse('api_detail', args=['projects', project.pk])),
+        Case('api users', reverse('api_list', args=['users'])),
+        Case('api user', reverse('api_detail', args=['users', user.pk])),
+        Case('perf_report', reverse('perf_report')),
+    ]
+
+
+def uncovered_routes(benchmark_cases):
+    """URL names in main_app/urls.py that no case exercises."""
+    covered = {resolve(case.url.split('?')[0]).url_name for case in benchmark_cases}
+    return sorted(pattern.name for pattern in urlpatterns if pattern.name not in covered)
+
+
+def _request(client, case):
+    if case.data:
+        response = client.post(case.url, case.data, content_type='application/json')
+    else:
+        response = client.get(case.url)
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def measure(user, case, repeat):
+    """Latency percentiles (ms), query count and allocations (KiB) of requesting ``case.url``."""
+    client = Client()
+
+    def login():
+        if not case.anonymous:
+            client.force_login(user)
+
+    def run():
+        if case.relogin:
+            login()
+        start = time.perf_counter()
+        response = _request(client, case)
+        return (time.perf_counter() - start) * 1000, response
+
+    login()
+    run()  # warm up
+    timings = [run()[0] for _ in range(case.repeat or repeat)]
+
+    # Query capture and allocation tracing slow requests down, so they get a run of their own
+    if case.relogin:
+        login()
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            response = _request(client, case)
+        allocated, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'status': response.status_code,
+        'runs': len(timings),
+        'mean': statistics.fmean(timings),
+        'p50': _percentile(timings, 0.5),
+        'p95': _percentile(timings, 0.95),
+        'p99': _percentile(timings, 0.99),
+        'queries': len(queries),
+        'alloc_kib': allocated / 1024,
+        'peak_kib': peak / 1024,
+    }
+
+
+def _percentile(ordered, quantile):
+    """Nearest-rank percentile of a sorted list."""
+    return ordered[max(0, math.ceil(quantile * len(ordered)) - 1)]
+
+
+def run_views(user, repeat=20, on_result=None):
+    """Benchmark every case as ``user`` and return {case name: measurements}."""
+    results = {}
+    for case in cases(user):
+        results[case.name] = measure(user, case, repeat)
+        if on_result:
+            on_result(case.name, results[case.name])
+    return results
+
+
+def compare(baseline, results, tolerance=0.2, min_delta=5.0):
+    """
+    Regressions of ``results`` against ``baseline`` (both {size: {case: measurements}}).
+
+    A case regresses when its p95 grows by more than ``tolerance`` and by at
+    least ``min_delta`` ms, or when it runs more queries than before.
+    """
+    regressions = []
+    for size, cases_now in results.items():
+        for name, now in cases_now.items():
+            before = baseline.get(size, {}).get(name)
+            if before is None:
+                continue
+            if now['p95'] > before['p95'] * (1 + tolerance) and now['p95'] - before['p95'] >= min_delta:
+                regressions.append(f"{size} tasks, {name}: p95 {before['p95']:.1f} -> {now['p95']:.1f} ms")
+            if now['queries'] > before['queries']:
+                regressions.append(f"{size} tasks, {name}: {before['queries']} -> {now['queries']} queries")
+    return regressions
+
+
+# Template rendering benchmarks
+UNCACHED_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+def template_profile(cached_loader, form_rendering):
+    """Settings rendering with or without the cached loader, and forms with 'fast' or 'crispy'."""
+    loaders = [('django.template.loaders.cached.Loader', UNCACHED_LOADERS)] if cached_loader else UNCACHED_LOADERS
+    return {
+        'TEMPLATES': [{**engine, 'OPTIONS': {**engine['OPTIONS'], 'loaders': loaders}} for engine in settings.TEMPLATES],
+        'FORM_RENDERING': form_rendering,
+    }
+
+
+RENDER_PROFILES = {
+    'before': template_profile(cached_loader=False, form_rendering='crispy'),
+    'after': template_profile(cached_loader=True, form_rendering='fast'),
+}
+
+
+def render_cases(user):
+    """The GET cases that can render a page (exports and JSON responses are skipped)."""
+    return [
+        case for case in cases(user)
+        if not (case.data or case.relogin or case.repeat) and not case.name.startswith('api ')
+    ]
+
+
+def measure_render(user, case, repeat):
+    """Percentiles (ms) of the time spent rendering templates when requesting ``case.url``."""
+    client = Client()
+    if not case.anonymous:
+        client.force_login(user)
+    client.get(case.url)  # warm up
+    timings = []
+    for _ in range(repeat):
+        metrics, token = perf.start()
+        try:
+            response = client.get(case.url)
+        finally:
+            perf.finish(token)
+        timings.append(metrics.template_time)
+    timings.sort()
+    return {
+        'status': response.status_code,
+        'html': response.get('Content-Type', '').startswith('text/html'),
+        'p50': _percentile(timings, 0.5),
+        'p95': _percentile(timings, 0.95),
+    }
+
+
+def run_renders(user, repeat=20, on_result=None):
+    """Render time of every HTML page as ``user`` and return {case name: measurements}."""
+    results = {}
+    # PerformanceMiddleware would time the requests with metrics of its own
+    with override_settings(PERF_ENABLED=False):
+        for case in render_cases(user):
+            result = measure_render(user, case, repeat)
+            if result['status'] != 200 or not result['html']:
+                continue
+            results[case.name] = result
+            if on_result:
+                on_result(case.name, result)
+    return results
+
+
+# Database concurrency benchmarks
+def _task_form_data(task, status):
+    return {
+        'title': task.title, 'description': task.description, 'priority': task.priority, 'status': status,
+        'assigned_to': task.assigned_to_id, 'project': task.project_id or '', 'due_date': '',
+    }
+
+
+def mixed_workload(user, operations, concurrency, write_ratio=0.2, seed=0):
+    """
+    Run ``operations`` requests from ``concurrency`` threads, each with its own
+    connection: task list and detail reads, and task_update POSTs for
+    ``write_ratio`` of them. Returns throughput, read/write latency percentiles
+    (ms) and how many requests failed, e.g. with "database is locked".
+    """
+    task_ids = list(Task.objects.order_by('-pk').values_list('pk', flat=True)[:1000])
+    statuses = [value for value, label in Task.STATUS_CHOICES]
+    reads = [reverse('task_list'), reverse('task_list') + '?status=pending']
+    lock = threading.Lock()
+    timings = {'read': [], 'write': []}
+    errors = []
+
+    def worker(number):
+        rng = random.Random(seed + number)
+        client = Client(raise_request_exception=False)
+        client.force_login(user)
+        try:
+            for _ in range(operations // concurrency):
+                # The test client skips the connection upkeep of real requests; do it here
+                close_old_connections()
+                kind = 'write' if rng.random() < write_ratio else 'read'
+                start = time.perf_counter()
+                try:
+                    if kind == 'write':
+                        task = Task.objects.get(pk=rng.choice(task_ids))
+                        response = client.post(reverse('task_update', args=[task.pk]),
+                                               _task_form_data(task, rng.choice(statuses)))
+                        ok = response.status_code == 302
+                    else:
+                        url = rng.choice(reads + [reverse('task_detail', args=[rng.choice(task_ids)])])
+                        ok = client.get(url).status_code == 200
+                except DatabaseError:
+                    ok = False
+                elapsed = (time.perf_counter() - start) * 1000
+                close_old_connections()
+                with lock:
+                    timings[kind].append(elapsed)
+                    if not ok:
+                        errors.append(kind)
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    result = {'ops_per_second': sum(map(len, timings.values())) / elapsed, 'errors': len(errors)}
+    for kind, values in timings.items():
+        values.sort()
+        result[f'{kind}_p50'] = _percentile(values, 0.5) if values else 0.0
+        result[f'{kind}_p95'] = _percentile(values, 0.95) if values else 0.0
+    return result
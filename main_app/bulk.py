@@ -0,0 +1,79 @@
+"""
+Bulk task operations.
+
+Changing or deleting many tasks runs one UPDATE or one DELETE for all of them
+instead of a save() or delete() per task, so the per-task signal handlers do
+not run. tasks_bulk_changed is sent once instead, with the tasks grouped by
+(status, assignee, project), which is all the counters and caches need.
+"""
+
+from django.db import connections, router, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Task
+from .signals import COUNTER_FIELDS, tasks_bulk_changed
+
+MAX_TASKS = 10000
+FIELDS = ('status', 'priority', 'assigned_to')
+
+
+def _groups(tasks):
+    """(status, assigned_to_id, project_id, count) for the tasks, one row per distinct triple."""
+    return list(tasks.order_by().values_list(*COUNTER_FIELDS).annotate(count=Count('id')))
+
+
+def _raw_delete(model, pks):
+    """DELETE the rows with these primary keys in one statement, without signals; returns how many."""
+    pks = sorted(set(pks))
+    if not pks:
+        return 0
+    connection = connections[router.db_for_write(model)]
+    meta = model._meta
+    # Plain ids rather than a subquery on the same table, which MySQL rejects
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {connection.ops.quote_name(meta.db_table)} '
+            f'WHERE {connection.ops.quote_name(meta.pk.column)} IN ({", ".join(["%s"] * len(pks))})',
+            pks,
+        )
+        return cursor.rowcount
+
+
+def update_tasks(task_ids, **changes):
+    """Set ``changes`` (any of status, priority and assigned_to) on the tasks; returns how many changed."""
+    unknown = set(changes) - set(FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot bulk update {', '.join(sorted(unknown))}")
+    assigned_to = changes.get('assigned_to')
+    assigned_to_id = getattr(assigned_to, 'pk', assigned_to)
+
+    with transaction.atomic():
+        tasks = Task.objects.filter(pk__in=task_ids)
+        groups = _groups(tasks)
+        # QuerySet.update() skips auto_now, and the API's ETags depend on updated_at
+        updated = tasks.update(updated_at=timezone.now(), **changes)
+        tasks_bulk_changed.send(sender=Task, groups=[
+            (
+                (status, user_id, project_id),
+                (changes.get('status', status), assigned_to_id or user_id, project_id),
+                count,
+            )
+            for status, user_id, project_id, count in groups
+        ])
+    return updated
+
+
+def delete_tasks(task_ids):
+    """Delete the tasks with a single DELETE; returns how many were deleted."""
+    with transaction.atomic():
+        tasks = Task.objects.filter(pk__in=task_ids)
+        groups = _groups(tasks)
+        # Nothing cascades from Task, so skip the collector, which would load
+        # every row just to send pre_delete/post_delete for it
+        deleted = _raw_delete(Task, task_ids)
+        tasks_bulk_changed.send(sender=Task, groups=[
+            ((status, user_id, project_id), None, count)
+            for status, user_id, project_id, count in groups
+        ])
+    return deleted
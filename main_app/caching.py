@@ -0,0 +1,97 @@
+"""
+Versioned caching of view contexts and template fragments.
+
+Cached entries are keyed by the current version of every scope they depend
+on, e.g. ``user:5`` or ``project:3``. Signal handlers bump a scope's version
+when something in it changes, so stale entries are never read again and
+simply expire. Scopes are:
+
+* ``tasks``, ``projects``, ``users`` - anything of that kind changed
+* ``user:<id>`` - the user's profile, assigned tasks or projects changed
+* ``project:<id>`` - the project, its members or its tasks changed
+"""
+
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from . import routers
+
+VERSION_PREFIX = 'cache-version:'
+
+
+def _version_key(scope):
+    return f'{VERSION_PREFIX}{scope}'
+
+
+def _initial_version():
+    # Time based so a version evicted from the cache never restarts at a value
+    # that old entries were stored under
+    return time.time_ns() // 1000
+
+
+def versions(*scopes):
+    """A string identifying the current version of every scope."""
+    keys = [_version_key(scope) for scope in scopes]
+    current = cache.get_many(keys)
+    missing = {key: _initial_version() for key in keys if key not in current}
+    if missing:
+        cache.set_many(missing, None)
+        current.update(missing)
+    return '.'.join(str(current[key]) for key in keys)
+
+
+async def aversions(*scopes):
+    keys = [_version_key(scope) for scope in scopes]
+    current = await cache.aget_many(keys)
+    missing = {key: _initial_version() for key in keys if key not in current}
+    if missing:
+        await cache.aset_many(missing, None)
+        current.update(missing)
+    return '.'.join(str(current[key]) for key in keys)
+
+
+def bump(*scopes):
+    """Invalidate everything cached under the given scopes."""
+    for scope in set(scopes):
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), None)
+
+
+def bump_on_commit(*scopes):
+    """Bump cache versions once the current transaction commits, so readers never cache uncommitted data."""
+    transaction.on_commit(partial(bump, *scopes))
+
+
+def cached_context(name, version, builder, timeout=None):
+    """
+    Return ``builder()``, cached under ``name`` at ``version`` (from versions())
+    for ``timeout`` seconds (FRAGMENT_CACHE_TIMEOUT by default).
+
+    The result must be picklable, so evaluate querysets into lists. The
+    builder reads from the primary, never from a replica that may lag.
+    """
+    key = f'context:{name}:{version}'
+    value = cache.get(key)
+    if value is None:
+        with routers.primary():
+            value = builder()
+        cache.set(key, value, settings.FRAGMENT_CACHE_TIMEOUT if timeout is None else timeout)
+    return value
+
+
+async def acached_context(name, version, builder):
+    """Async cached_context(); ``builder`` is a coroutine function."""
+    key = f'context:{name}:{version}'
+    value = await cache.aget(key)
+    if value is None:
+        with routers.primary():
+            value = await builder()
+        await cache.aset(key, value, settings.FRAGMENT_CACHE_TIMEOUT)
+    return value
@@ -0,0 +1,217 @@
+"""
+Materialized counters for the dashboard.
+
+Counts are stored as StatCounter rows and adjusted by the signal handlers in
+signals.py. A missing row is simply recomputed the next time it is read, so
+handlers never create rows themselves and a counter can be reset by deleting it.
+The recount is stored in a transaction that keeps task changes out until it
+commits (see _store_missing), so no change falls between the count and the
+row it would have incremented.
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connections, router, transaction
+from django.db.models import Count, F
+
+from .models import StatCounter, Task, Project
+
+USERS = 'users'
+TASKS = 'tasks'
+PROJECTS = 'projects'
+
+
+def task_status_key(status):
+    return f'tasks:status:{status}'
+
+
+def user_tasks_key(user_id):
+    return f'user:{user_id}:tasks'
+
+
+def user_task_status_key(user_id, status):
+    return f'user:{user_id}:tasks:status:{status}'
+
+
+def project_task_status_key(project_id, status):
+    return f'project:{project_id}:tasks:status:{status}'
+
+
+def task_keys(status, user_id, project_id=None):
+    """Every counter a task with the given status, assignee and project contributes to."""
+    keys = [
+        TASKS,
+        task_status_key(status),
+        user_tasks_key(user_id),
+        user_task_status_key(user_id, status),
+    ]
+    if project_id is not None:
+        keys.append(project_task_status_key(project_id, status))
+    return keys
+
+
+def counted_queryset(key):
+    """The queryset whose size is the value of a counter."""
+    if key == USERS:
+        return User.objects.all()
+    if key == PROJECTS:
+        return Project.objects.all()
+    if key == TASKS:
+        return Task.objects.all()
+
+    parts = key.split(':')
+    if parts[:2] == ['tasks', 'status']:
+        return Task.objects.filter(status=parts[2])
+    if parts[0] == 'user' and parts[2:3] == ['tasks']:
+        tasks = Task.objects.filter(assigned_to_id=parts[1])
+        if parts[3:4] == ['status']:
+            tasks = tasks.filter(status=parts[4])
+        return tasks
+    if parts[0] == 'project' and parts[2:4] == ['tasks', 'status']:
+        return Task.objects.filter(project_id=parts[1], status=parts[4])
+    raise ValueError(f"Unknown counter key: {key!r}")
+
+
+def compute(key):
+    """Count the value of a counter straight from the source tables."""
+    return counted_queryset(key).count()
+
+
+def get_counts(keys):
+    """Return a dict of counter values, computing and storing any missing ones."""
+    values = dict(StatCounter.objects.filter(key__in=keys).values_list('key', 'value'))
+    missing = [key for key in keys if key not in values]
+    if missing:
+        values.update(_store_missing(missing))
+    return values
+
+
+async def aget_counts(keys):
+    """Async get_counts()."""
+    rows = StatCounter.objects.filter(key__in=keys).values_list('key', 'value')
+    values = {key: value async for key, value in rows}
+    missing = [key for key in keys if key not in values]
+    if missing:
+        values.update(await sync_to_async(_store_missing)(missing))
+    return values
+
+
+def _store_missing(keys):
+    """
+    Count and store missing counters. A task saved between the count and the
+    insert would find no row to increment and be missing from the counter for
+    good, so both run in one transaction that task changes wait for: SQLite
+    takes the write lock at BEGIN IMMEDIATE (see main_app/sqlite), PostgreSQL
+    locks the counter table against increments.
+    """
+    using = router.db_for_write(StatCounter)
+    connection = connections[using]
+    try:
+        with transaction.atomic(using=using):
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LOCK TABLE {StatCounter._meta.db_table} IN SHARE ROW EXCLUSIVE MODE')
+            counts = {key: compute(key) for key in keys}
+            StatCounter.objects.bulk_create(
+                [StatCounter(key=key, value=value) for key, value in counts.items()],
+                ignore_conflicts=True,
+            )
+    except DatabaseError:
+        # A deferred SQLite transaction loses the write lock to any writer in
+        # between; serve the counts without storing them, the next read retries
+        return {key: compute(key) for key in keys}
+    return counts
+
+
+def increment(keys, delta=1):
+    """Adjust existing counters in a single UPDATE; missing ones are left alone."""
+    StatCounter.objects.filter(key__in=keys).update(value=F('value') + delta)
+
+
+def apply(deltas):
+    """Adjust counters by {key: delta}, with one UPDATE per distinct delta."""
+    by_delta = {}
+    for key, delta in deltas.items():
+        if delta:
+            by_delta.setdefault(delta, []).append(key)
+    for delta, keys in by_delta.items():
+        increment(keys, delta)
+
+
+def invalidate(keys):
+    """Drop counters so they are recomputed on the next read."""
+    StatCounter.objects.filter(key__in=keys).delete()
+
+
+def invalidate_user(user_id):
+    StatCounter.objects.filter(key__startswith=f'user:{user_id}:').delete()
+
+
+def invalidate_project(project_id):
+    StatCounter.objects.filter(key__startswith=f'project:{project_id}:').delete()
+
+
+def _project_status_keys(project_id):
+    return {status: project_task_status_key(project_id, status) for status, label in Task.STATUS_CHOICES}
+
+
+def project_status_counts(project_id):
+    """(status, label, count) for every task status within a project."""
+    keys = _project_status_keys(project_id)
+    values = get_counts(list(keys.values()))
+    return [(status, label, values[keys[status]]) for status, label in Task.STATUS_CHOICES]
+
+
+async def aproject_status_counts(project_id):
+    keys = _project_status_keys(project_id)
+    values = await aget_counts(list(keys.values()))
+    return [(status, label, values[keys[status]]) for status, label in Task.STATUS_CHOICES]
+
+
+def move_task(old, new):
+    """Shift a task's contribution from one (status, assignee, project) to another."""
+    old_keys = set(task_keys(*old))
+    new_keys = set(task_keys(*new))
+    increment(old_keys - new_keys, -1)
+    increment(new_keys - old_keys, 1)
+
+
+def build_all():
+    """Compute every counter with a handful of grouped queries."""
+    values = {
+        USERS: User.objects.count(),
+        PROJECTS: Project.objects.count(),
+        TASKS: Task.objects.count(),
+    }
+    rows = (
+        Task.objects.order_by()
+        .values('assigned_to_id', 'status')
+        .annotate(total=Count('id'))
+    )
+    for row in rows:
+        user_id, status, total = row['assigned_to_id'], row['status'], row['total']
+        status_key = task_status_key(status)
+        values[status_key] = values.get(status_key, 0) + total
+        values[user_tasks_key(user_id)] = values.get(user_tasks_key(user_id), 0) + total
+        values[user_task_status_key(user_id, status)] = total
+    rows = (
+        Task.objects.filter(project__isnull=False).order_by()
+        .values('project_id', 'status')
+        .annotate(total=Count('id'))
+    )
+    for row in rows:
+        values[project_task_status_key(row['project_id'], row['status'])] = row['total']
+    return values
+
+
+def rebuild(batch_size=1000):
+    """Replace the whole counter table with freshly computed values."""
+    with transaction.atomic():
+        values = build_all()
+        StatCounter.objects.all().delete()
+        # A request may store a counter it just computed in the meantime
+        StatCounter.objects.bulk_create(
+            [StatCounter(key=key, value=value) for key, value in values.items()],
+            batch_size=batch_size, update_conflicts=True, unique_fields=['key'], update_fields=['value'],
+        )
+    return len(values)
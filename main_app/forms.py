@@ -1,7 +1,11 @@
 from django import forms
+from django.conf import settings
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from django.urls import reverse_lazy
+from django.utils.text import format_lazy
 from .models import UserProfile, Task, Project
+from . import autocomplete, bulk
 
 class CustomUserCreationForm(UserCreationForm):
     email = forms.EmailField(required=True)
@@ -29,29 +33,179 @@ class UserProfileForm(forms.ModelForm):
             'address': forms.Textarea(attrs={'rows': 3}),
         }
 
-class TaskForm(forms.ModelForm):
+# Pickers: the widget renders only the selected users (or projects) and
+# main.js searches the rest through the autocomplete URL
+class PickerMixin:
+    autocomplete_url = None
+    search_param = 'q'
+    placeholder = 'Type a name or username'
+
+    def selected_choices(self, pks):
+        raise NotImplementedError
+
+    def optgroups(self, name, value, attrs=None):
+        self.choices = self.selected_choices([pk for pk in value if str(pk).isdigit()])
+        return super().optgroups(name, value, attrs)
+
+    def get_context(self, name, value, attrs):
+        attrs = {
+            **(attrs or {}),
+            'data-autocomplete-url': self.autocomplete_url,
+            'data-autocomplete-param': self.search_param,
+            'data-autocomplete-placeholder': self.placeholder,
+        }
+        return super().get_context(name, value, attrs)
+
+class UserPickerMixin(PickerMixin):
+    autocomplete_url = reverse_lazy('user_autocomplete')
+
+    def selected_choices(self, pks):
+        users = User.objects.filter(pk__in=pks).only('id', 'username', 'first_name', 'last_name')
+        return [(user.pk, autocomplete.label(user)) for user in users]
+
+class UserPickerSelect(UserPickerMixin, forms.Select):
+    pass
+
+class UserPickerSelectMultiple(UserPickerMixin, forms.SelectMultiple):
+    pass
+
+class ProjectPickerSelect(PickerMixin, forms.Select):
+    # The JSON live search matches project names as you type
+    autocomplete_url = format_lazy('{}?format=json', reverse_lazy('live_search', args=['projects']))
+    search_param = 'search'
+    placeholder = 'Type a project name'
+
+    def selected_choices(self, pks):
+        return list(Project.objects.filter(pk__in=pks).values_list('id', 'name'))
+
+class UserChoiceField(forms.ModelChoiceField):
+    """One user by id, validated with a single query for that id."""
+    widget = UserPickerSelect
+
+    def label_from_instance(self, obj):
+        return autocomplete.label(obj)
+
+class ProjectChoiceField(forms.ModelChoiceField):
+    """One project by id, validated with a single query for that id."""
+    widget = ProjectPickerSelect
+
+class UserMultipleChoiceField(forms.ModelMultipleChoiceField):
+    """Users by id, validated with one in_bulk() of the submitted ids."""
+    widget = UserPickerSelectMultiple
+
+    def label_from_instance(self, obj):
+        return autocomplete.label(obj)
+
+    def _check_values(self, value):
+        try:
+            ids = {int(pk) for pk in value}
+        except (TypeError, ValueError):
+            raise forms.ValidationError(self.error_messages['invalid_list'], code='invalid_list')
+        users = self.queryset.in_bulk(ids)
+        missing = sorted(ids - set(users))
+        if missing:
+            raise forms.ValidationError(self.error_messages['invalid_choice'], code='invalid_choice',
+                                        params={'value': missing[0]})
+        return list(users.values())
+
+class BootstrapFormMixin:
+    """
+    Renders as ``{{ form }}`` with the Bootstrap 5 markup crispy would produce,
+    from one template loop instead of crispy's per-field layout rendering.
+    """
+    template_name = 'forms/bootstrap.html'
+    WIDGET_CLASSES = {
+        'checkbox': 'form-check-input',
+        'select': 'form-select',
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            css_class = self.WIDGET_CLASSES.get(getattr(field.widget, 'input_type', None), 'form-control')
+            classes = field.widget.attrs.get('class', '').split()
+            if css_class not in classes:
+                field.widget.attrs['class'] = ' '.join(classes + [css_class])
+
+    def add_error(self, field, error):
+        super().add_error(field, error)
+        for name in self.errors:
+            if name in self.fields:
+                widget = self.fields[name].widget
+                if 'is-invalid' not in widget.attrs['class'].split():
+                    widget.attrs['class'] += ' is-invalid'
+
+    @property
+    def use_crispy(self):
+        return settings.FORM_RENDERING == 'crispy'
+
+class TaskForm(BootstrapFormMixin, forms.ModelForm):
     class Meta:
         model = Task
-        fields = ['title', 'description', 'priority', 'status', 'assigned_to', 'due_date']
+        fields = ['title', 'description', 'priority', 'status', 'assigned_to', 'project', 'due_date']
+        field_classes = {
+            'assigned_to': UserChoiceField,
+            'project': ProjectChoiceField,
+        }
         widgets = {
             'description': forms.Textarea(attrs={'rows': 4}),
             'due_date': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
         }
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields['assigned_to'].queryset = User.objects.all()
-
-class ProjectForm(forms.ModelForm):
+class ProjectForm(BootstrapFormMixin, forms.ModelForm):
     class Meta:
         model = Project
         fields = ['name', 'description', 'members', 'deadline', 'is_active']
+        field_classes = {
+            'members': UserMultipleChoiceField,
+        }
         widgets = {
             'description': forms.Textarea(attrs={'rows': 4}),
             'deadline': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
-            'members': forms.CheckboxSelectMultiple(),
         }
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields['members'].queryset = User.objects.all()
+class IdListField(forms.Field):
+    """A list of ids, from repeated form values or a JSON list."""
+    widget = forms.MultipleHiddenInput
+
+    def __init__(self, *, max_length=None, **kwargs):
+        self.max_length = max_length
+        super().__init__(**kwargs)
+
+    def to_python(self, value):
+        if not value:
+            return []
+        try:
+            ids = sorted({int(v) for v in value})
+        except (TypeError, ValueError):
+            raise forms.ValidationError('Enter a list of ids.', code='invalid')
+        if self.max_length and len(ids) > self.max_length:
+            raise forms.ValidationError(f'Select at most {self.max_length} items.', code='max_length')
+        return ids
+
+class TaskBulkForm(forms.Form):
+    ACTION_CHOICES = [
+        ('update', 'Update'),
+        ('delete', 'Delete'),
+    ]
+
+    action = forms.ChoiceField(choices=ACTION_CHOICES)
+    task_ids = IdListField(max_length=bulk.MAX_TASKS)
+    status = forms.ChoiceField(choices=[('', 'Status')] + Task.STATUS_CHOICES, required=False,
+                               widget=forms.Select(attrs={'class': 'form-select'}))
+    priority = forms.ChoiceField(choices=[('', 'Priority')] + Task.PRIORITY_CHOICES, required=False,
+                                 widget=forms.Select(attrs={'class': 'form-select'}))
+    # By username, so the list page needs no select of every user
+    assigned_to = forms.ModelChoiceField(
+        queryset=User.objects.all(), to_field_name='username', required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Assign to username'}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('action') == 'update' and not self.changes():
+            raise forms.ValidationError('Choose a status, priority or assignee to apply.')
+        return cleaned_data
+
+    def changes(self):
+        return {field: self.cleaned_data[field] for field in bulk.FIELDS if self.cleaned_data.get(field)}
@@ -0,0 +1,205 @@
+"""
+Database-backed background jobs.
+
+Side effects that a response does not have to wait for (thumbnails, the
+workload summary, ...) are queued as Job rows and run by
+``manage.py run_worker``, so no broker is needed:
+
+* ``enqueue()`` inserts the row with ``transaction.on_commit``: a request
+  that rolls back queues nothing, and workers never wait on rows that are
+  not committed yet.
+* Workers claim due jobs with an UPDATE only one of them can win (plus
+  SELECT ... FOR UPDATE SKIP LOCKED where the database has it).
+* A job runs in one transaction with its removal from the queue, so its
+  database changes are applied exactly once even when it is retried.
+* A job that raises is retried with exponential backoff, up to
+  ``max_attempts``; after that it stays in the table as failed, with its
+  traceback, for the admin to look at.
+* Jobs left running by a worker that died are queued again after
+  JOB_TIMEOUT seconds.
+
+Only functions decorated with ``@job`` can be queued. Their arguments are
+stored as JSON, so pass ids rather than model instances.
+"""
+
+import logging
+import os
+import random
+import signal
+import socket
+import time
+import traceback
+from contextlib import nullcontext
+from datetime import timedelta
+from functools import partial
+from importlib import import_module
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def job(func):
+    """Register ``func`` so it can be queued with enqueue()."""
+    registry[job_name(func)] = func
+    return func
+
+
+def job_name(func):
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def _lookup(name):
+    if name not in registry:
+        # Import the module that defines it, which registers it
+        import_module(name.rsplit('.', 1)[0])
+    return registry[name]
+
+
+def enqueue(func, *args, unique=False, delay=0, max_attempts=None):
+    """
+    Run ``func(*args)`` in a worker once the current transaction commits.
+    With ``unique``, nothing is queued if the same call is already waiting.
+    """
+    name = job_name(func)
+    if name not in registry:
+        raise ValueError(f"{name} is not a registered job.")
+    if settings.JOBS_EAGER:
+        transaction.on_commit(partial(func, *args))
+        return
+    transaction.on_commit(partial(_insert, name, list(args), unique, delay, max_attempts))
+
+
+def _insert(name, args, unique, delay, max_attempts):
+    if unique and Job.objects.filter(name=name, args=args, status=Job.QUEUED).exists():
+        return
+    Job.objects.create(
+        name=name, args=args,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def claim(worker, limit=1):
+    """Mark up to ``limit`` due jobs as running by ``worker`` and return them."""
+    now = timezone.now()
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    # Without SKIP LOCKED the SELECT stays out of the transaction: on SQLite a
+    # transaction that reads and then writes fails at once if another one wrote
+    with transaction.atomic() if skip_locked else nullcontext():
+        due = Job.objects.filter(status=Job.QUEUED, run_at__lte=now).order_by('run_at', 'id')
+        if skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        job_ids = list(due.values_list('id', flat=True)[:limit])
+        if not job_ids:
+            return []
+        # Another worker may have read the same ids; only one UPDATE finds them still queued
+        Job.objects.filter(pk__in=job_ids, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=worker, locked_at=now, attempts=F('attempts') + 1,
+        )
+    return list(
+        Job.objects.filter(pk__in=job_ids, status=Job.RUNNING, locked_by=worker, locked_at=now)
+        .order_by('run_at', 'id')
+    )
+
+
+def backoff(attempts):
+    """Seconds to wait before retrying a job that has failed ``attempts`` times."""
+    return settings.JOB_RETRY_DELAY * 2 ** (attempts - 1) * random.uniform(1, 1.5)
+
+
+def run(job):
+    """Run a claimed job. Returns whether it succeeded."""
+    try:
+        with transaction.atomic():
+            _lookup(job.name)(*job.args)
+            Job.objects.filter(pk=job.pk, locked_by=job.locked_by).delete()
+    except Exception:
+        logger.exception("Job %s failed (attempt %s of %s)", job, job.attempts, job.max_attempts)
+        _fail(job, traceback.format_exc())
+        return False
+    return True
+
+
+def _fail(job, error):
+    changes = {'locked_by': '', 'locked_at': None, 'last_error': error}
+    if job.attempts >= job.max_attempts:
+        changes['status'] = Job.FAILED
+    else:
+        changes['status'] = Job.QUEUED
+        changes['run_at'] = timezone.now() + timedelta(seconds=backoff(job.attempts))
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(**changes)
+
+
+def requeue_stale():
+    """Give back the jobs of workers that stopped while running them. Returns how many."""
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=timezone.now() - timedelta(seconds=settings.JOB_TIMEOUT),
+    )
+    error = 'The worker running this job stopped before it finished.'
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, locked_by='', locked_at=None, last_error=error,
+    )
+    requeued = stale.update(
+        status=Job.QUEUED, locked_by='', locked_at=None, last_error=error, run_at=timezone.now(),
+    )
+    return failed + requeued
+
+
+def run_pending(worker='inline', batch=10):
+    """Run due jobs in this process until none are left. Returns (succeeded, failed)."""
+    succeeded = failed = 0
+    while True:
+        jobs = claim(worker, batch)
+        if not jobs:
+            return succeeded, failed
+        for claimed in jobs:
+            if run(claimed):
+                succeeded += 1
+            else:
+                failed += 1
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def work(stop, batch=10, poll_interval=1.0):
+    """Claim and run jobs until ``stop`` (an Event) is set."""
+    worker = worker_name()
+    last_requeue = 0
+    while not stop.is_set():
+        close_old_connections()
+        try:
+            if time.monotonic() - last_requeue > settings.JOB_TIMEOUT / 2:
+                requeue_stale()
+                last_requeue = time.monotonic()
+            jobs = claim(worker, batch)
+        except DatabaseError:
+            # e.g. the database is locked or restarting; try again after a pause
+            logger.warning("Worker %s could not claim jobs", worker, exc_info=True)
+            jobs = []
+        for claimed in jobs:
+            run(claimed)
+        if not jobs:
+            stop.wait(poll_interval)
+
+
+def work_in_process(stop, batch, poll_interval):
+    """The loop of a worker process started by run_worker, once worker.main has set Django up."""
+    # Ctrl+C (and systemd's SIGTERM) reach the whole process group; let the
+    # parent decide when to stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    try:
+        work(stop, batch, poll_interval)
+    finally:
+        connection.close()
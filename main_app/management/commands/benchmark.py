@@ -0,0 +1,97 @@
+import json
+import platform
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from main_app.benchmarks import analyze, cases, compare, run_views, scratch_database, uncovered_routes
+from main_app.sample_data import generate
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class Command(BaseCommand):
+    help = ("Seed throwaway databases at each size and benchmark every route in main_app/urls.py: "
+            "latency percentiles, query counts and allocations, optionally saved or compared as JSON")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,100000,1000000', help="Comma separated task counts")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed requests per URL")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--with-cache', action='store_true',
+                            help="Keep the configured cache instead of measuring uncached views")
+        parser.add_argument('--save', metavar='PATH', help="Write the results as a JSON baseline")
+        parser.add_argument('--compare', metavar='PATH', help="Fail on regressions against a saved baseline")
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help="Allowed p95 growth over the baseline (0.2 = 20%%)")
+        parser.add_argument('--min-delta', type=float, default=5.0,
+                            help="p95 changes smaller than this many ms are never regressions")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError("--sizes must be comma separated integers.")
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as source:
+                    baseline = json.load(source)['results']
+            except (OSError, ValueError, KeyError) as error:
+                raise CommandError(f"Cannot read baseline: {error}")
+
+        overrides = {'PERF_ENABLED': False}
+        if not options['with_cache']:
+            overrides['CACHES'] = NO_CACHE
+        results = {}
+        with override_settings(**overrides):
+            for size in sizes:
+                results[str(size)] = self.run_size(size, options)
+
+        if options['save']:
+            with open(options['save'], 'w') as output:
+                json.dump({'meta': self.meta(options), 'results': results}, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Saved baseline to {options['save']}."))
+
+        if baseline is not None:
+            regressions = compare(baseline, results, options['tolerance'], options['min_delta'])
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(regression))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions against {options['compare']}.")
+            self.stdout.write(self.style.SUCCESS("No regressions."))
+
+    def run_size(self, size, options):
+        with scratch_database() as connection:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Seeding {size:,} tasks..."))
+            generate(users=max(50, size // 100), projects=max(5, size // 500), tasks=size, seed=options['seed'])
+            analyze(connection)
+            user = User.objects.get(username='user0')
+            user.is_staff = user.is_superuser = True
+            user.save(update_fields=['is_staff', 'is_superuser'])
+
+            missing = uncovered_routes(cases(user))
+            if missing:
+                self.stdout.write(self.style.WARNING(f"Not benchmarked: {', '.join(missing)}"))
+            self.stdout.write(f"  {'case':<28} {'status':>6} {'p50':>9} {'p95':>9} {'p99':>9} "
+                              f"{'queries':>8} {'alloc KiB':>10}")
+            return run_views(user, options['repeat'], on_result=self.write_result)
+
+    def write_result(self, name, result):
+        self.stdout.write(
+            f"  {name:<28} {result['status']:>6} {result['p50']:>7.1f}ms {result['p95']:>7.1f}ms {result['p99']:>7.1f}ms "
+            f"{result['queries']:>8} {result['alloc_kib']:>10,.0f}"
+        )
+
+    def meta(self, options):
+        return {
+            'date': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'repeat': options['repeat'],
+            'seed': options['seed'],
+            'with_cache': options['with_cache'],
+        }
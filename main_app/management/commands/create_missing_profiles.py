@@ -0,0 +1,29 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from main_app.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = "Create empty profiles for the users who do not have one yet (profiles are otherwise created on first edit)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Profiles per INSERT")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        missing = User.objects.filter(userprofile__isnull=True).order_by('pk').values_list('pk', flat=True)
+        created = 0
+        last_pk = 0
+        while True:
+            # Keyset batches: the rows just created drop out of ``missing``, so offsets would skip users
+            user_ids = list(missing.filter(pk__gt=last_pk)[:batch_size])
+            if not user_ids:
+                break
+            UserProfile.objects.bulk_create(
+                [UserProfile(user_id=user_id) for user_id in user_ids], ignore_conflicts=True,
+            )
+            created += len(user_ids)
+            last_pk = user_ids[-1]
+        self.stdout.write(self.style.SUCCESS(f"Created {created} profiles."))
@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from main_app.benchmarks import analyze, mixed_workload, scratch_database
+from main_app.sample_data import generate
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class Command(BaseCommand):
+    help = ("Seed a throwaway database and measure throughput, latency and failed requests of concurrent "
+            "task list/detail reads mixed with task_update writes, under one or more DB_PROFILEs")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', help="Comma separated DB_PROFILEs to compare, e.g. "
+                                               "sqlite-default,sqlite,postgresql (default: the configured one)")
+        parser.add_argument('--tasks', type=int, default=10_000, help="Tasks to seed")
+        parser.add_argument('--operations', type=int, default=400, help="Requests per concurrency level")
+        parser.add_argument('--concurrency', default='1,4,16', help="Comma separated thread counts")
+        parser.add_argument('--write-ratio', type=float, default=0.2, help="Share of requests that are writes")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', action='store_true', help=
+                            "Print the results as JSON (used when comparing profiles)")
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options['concurrency'].split(',')]
+        except ValueError:
+            raise CommandError("--concurrency must be comma separated integers.")
+        if options['profiles']:
+            results = {profile: self.run_profile(profile, options)
+                       for profile in options['profiles'].split(',')}
+        else:
+            results = {settings.DB_PROFILE: self.run_levels(levels, options)}
+        if options['json']:
+            self.stdout.write(json.dumps(results))
+            return
+
+        self.stdout.write(f"  {'profile':<16} {'threads':>7} {'ops/s':>8} {'read p50':>9} {'read p95':>9} "
+                          f"{'write p50':>10} {'write p95':>10} {'errors':>7}")
+        for profile, by_level in results.items():
+            for level, result in by_level.items():
+                self.stdout.write(
+                    f"  {profile:<16} {level:>7} {result['ops_per_second']:>8.1f} "
+                    f"{result['read_p50']:>7.1f}ms {result['read_p95']:>7.1f}ms "
+                    f"{result['write_p50']:>8.1f}ms {result['write_p95']:>8.1f}ms {result['errors']:>7}"
+                )
+
+    def run_profile(self, profile, options):
+        """Run the benchmark in a new process, since DATABASES is fixed once Django has started."""
+        self.stderr.write(f"Benchmarking DB_PROFILE={profile}...")
+        command = [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'db_benchmark', '--json']
+        for name in ('tasks', 'operations', 'concurrency', 'write_ratio', 'seed'):
+            command += [f"--{name.replace('_', '-')}", str(options[name])]
+        completed = subprocess.run(command, env={**os.environ, 'DB_PROFILE': profile},
+                                   capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError(f"DB_PROFILE={profile} failed:\n{completed.stderr}")
+        return json.loads(completed.stdout.strip().splitlines()[-1])[profile]
+
+    def run_levels(self, levels, options):
+        with tempfile.TemporaryDirectory() as directory:
+            if connection.vendor == 'sqlite':
+                # A file, not the in-memory test database, so journaling and locking are real
+                connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+            with override_settings(PERF_ENABLED=False, CACHES=NO_CACHE), scratch_database() as db:
+                tasks = options['tasks']
+                self.stderr.write(f"Seeding {tasks:,} tasks...")
+                generate(users=max(50, tasks // 100), projects=max(5, tasks // 500), tasks=tasks, seed=options['seed'])
+                analyze(db)
+                user = User.objects.get(username='user0')
+                return {
+                    level: mixed_workload(user, options['operations'], level, options['write_ratio'], options['seed'])
+                    for level in levels
+                }
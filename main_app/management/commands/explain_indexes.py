@@ -0,0 +1,69 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from main_app.benchmarks import analyze, scratch_database, seed_rows, time_queryset
+from main_app.models import Task, Project
+
+# The migration that introduced the Task/Project composite indexes
+INDEX_MIGRATION = '0003_task_project_indexes'
+BEFORE_MIGRATION = '0002_statcounter'
+
+
+def access_paths(user_id):
+    """The filter and sort combinations used by the views, as they query the page."""
+    # Task.project is added after the index migration, so leave it out of the SELECT
+    tasks = Task.objects.defer('project')
+    return [
+        ('task_list', tasks.order_by('-created_at', '-id')),
+        ('task_list ?status', tasks.filter(status='pending').order_by('-created_at', '-id')),
+        ('task_list ?priority', tasks.filter(priority='high').order_by('-created_at', '-id')),
+        ('task_list ?status&priority',
+         tasks.filter(status='pending', priority='high').order_by('-created_at', '-id')),
+        ('dashboard / user_detail tasks',
+         tasks.filter(assigned_to_id=user_id).order_by('-created_at', '-id')),
+        ('project_list', Project.objects.order_by('-created_at', '-id')),
+        ('projects by manager', Project.objects.filter(manager_id=user_id).order_by('-created_at', '-id')),
+        ('projects ?is_active',
+         Project.objects.filter(Project.active_filter(True)).order_by('-created_at', '-id')),
+    ]
+
+
+class Command(BaseCommand):
+    help = ("Seed a throwaway database and compare EXPLAIN plans and timings of the "
+            "list queries without and with the composite indexes")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help="Number of tasks to seed")
+        parser.add_argument('--users', type=int, default=1000, help="Number of users to seed")
+        parser.add_argument('--page-size', type=int, default=11,
+                            help="Rows fetched per query (page size + 1, as the paginator does)")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with scratch_database() as connection:
+            call_command('migrate', 'main_app', BEFORE_MIGRATION, verbosity=0)
+            self.stdout.write(f"Seeding {options['rows']:,} tasks...")
+            user_ids = seed_rows(options['rows'], users=options['users'], seed=options['seed'])
+            analyze(connection)
+            before = self.measure(user_ids[0], options['page_size'])
+
+            call_command('migrate', 'main_app', INDEX_MIGRATION, verbosity=0)
+            analyze(connection)
+            after = self.measure(user_ids[0], options['page_size'])
+
+        for (name, plan_before, ms_before), (_, plan_after, ms_after) in zip(before, after):
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(f"  without indexes ({ms_before:.2f} ms):")
+            self.stdout.write(self.indent(plan_before))
+            self.stdout.write(f"  with indexes ({ms_after:.2f} ms):")
+            self.stdout.write(self.indent(plan_after))
+
+    def measure(self, user_id, page_size):
+        results = []
+        for name, queryset in access_paths(user_id):
+            page = queryset[:page_size]
+            results.append((name, page.explain(), time_queryset(page)))
+        return results
+
+    def indent(self, plan):
+        return '\n'.join(f'    {line}' for line in plan.splitlines())
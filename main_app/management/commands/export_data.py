@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main_app import transfer
+
+
+class Command(BaseCommand):
+    help = "Stream tasks or projects (with members) to a CSV or JSONL file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['tasks', 'projects'])
+        parser.add_argument('--format', choices=transfer.FORMATS, default='jsonl')
+        parser.add_argument('--output', help="File to write to (default: stdout)")
+        parser.add_argument('--chunk-size', type=int, default=transfer.CHUNK_SIZE,
+                            help="Rows fetched from the database cursor at a time")
+
+    def handle(self, *args, **options):
+        lines = transfer.export_lines(options['kind'], options['format'], options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        try:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                total = 0
+                for line in lines:
+                    output.write(line)
+                    total += 1
+        except OSError as error:
+            raise CommandError(error)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {total} lines to {options['output']}."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from main_app import thumbnails
+
+
+class Command(BaseCommand):
+    help = "Render WebP/JPEG thumbnails for profile pictures that do not have them yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Images rendered in parallel (0 renders them one by one in this thread)")
+        parser.add_argument('--all', action='store_true', help="Regenerate existing thumbnails too")
+
+    def handle(self, *args, **options):
+        generated, failed = thumbnails.backfill(options['workers'], regenerate=options['all'])
+        self.stdout.write(self.style.SUCCESS(f"Generated thumbnails for {generated} profile pictures."))
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} pictures could not be read; see the log."))
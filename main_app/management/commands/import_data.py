@@ -0,0 +1,46 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from main_app import transfer
+
+
+class Command(BaseCommand):
+    help = "Bulk import tasks or projects from a CSV or JSONL file written by export_data"
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['tasks', 'projects'])
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=transfer.FORMATS,
+                            help="Defaults to the file extension")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per bulk INSERT")
+        parser.add_argument('--created-by',
+                            help="Username recorded as creator of tasks whose row has none")
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or options['path'].rsplit('.', 1)[-1]
+        if fmt not in transfer.FORMATS:
+            raise CommandError(f"Cannot tell the format of {options['path']}; pass --format.")
+
+        creator = None
+        if options['created_by']:
+            try:
+                creator = User.objects.get(username=options['created_by'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {options['created_by']!r}.")
+
+        try:
+            with open(options['path'], newline='', encoding='utf-8') as source:
+                rows = transfer.read_rows(source, fmt)
+                if options['kind'] == 'tasks':
+                    result = transfer.import_tasks(rows, options['batch_size'], default_creator=creator)
+                else:
+                    result = transfer.import_projects(rows, options['batch_size'])
+        except (OSError, UnicodeDecodeError) as error:
+            # A file in the wrong encoding stops here; earlier batches stay imported
+            raise CommandError(error)
+
+        for error in result.errors:
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} {options['kind']}, skipped {result.skipped}."
+        ))
@@ -0,0 +1,124 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from main_app import async_views, views
+from main_app.benchmarks import analyze, scratch_database
+from main_app.models import Project
+from main_app.sample_data import generate
+from main_app.urls import urlconf
+
+
+class Command(BaseCommand):
+    help = ("Compare the throughput of the read-heavy pages served by the sync views through the WSGI "
+            "handler with the async views through the ASGI handler, at several concurrency levels")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=100_000, help="Tasks to seed")
+        parser.add_argument('--requests', type=int, default=500, help="Requests per mode and concurrency level")
+        parser.add_argument('--concurrency', default='1,10,50', help="Comma separated concurrency levels")
+        parser.add_argument('--with-cache', action='store_true',
+                            help="Keep the configured cache instead of measuring uncached views")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        overrides = {'PERF_ENABLED': False}
+        if not options['with_cache']:
+            overrides['CACHES'] = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        levels = [int(level) for level in options['concurrency'].split(',')]
+
+        with override_settings(**overrides), scratch_database() as connection:
+            self.stdout.write(f"Seeding {options['tasks']:,} tasks...")
+            tasks = options['tasks']
+            generate(users=max(50, tasks // 100), projects=max(5, tasks // 500), tasks=tasks, seed=options['seed'])
+            analyze(connection)
+            user = User.objects.get(username='user0')
+            urls = [
+                reverse('dashboard'),
+                reverse('task_list'),
+                reverse('task_list') + '?status=pending',
+                reverse('project_list'),
+                reverse('user_detail', args=[user.pk]),
+                reverse('project_detail', args=[Project.objects.order_by('pk').values_list('pk', flat=True)[0]]),
+            ]
+
+            # Counters are computed and stored on first read; do that before measuring
+            warm_up = Client()
+            warm_up.force_login(user)
+            for url in urls:
+                warm_up.get(url)
+
+            self.stdout.write(f"  {'mode':<6} {'concurrency':>11} {'req/s':>9} {'p50':>9} {'p95':>9}")
+            for level in levels:
+                with override_settings(ROOT_URLCONF=urlconf(views)):
+                    self.report('WSGI', level, *self.run_wsgi(user, urls, options['requests'], level))
+                with override_settings(ROOT_URLCONF=urlconf(async_views)):
+                    self.report('ASGI', level, *self.run_asgi(user, urls, options['requests'], level))
+
+    def run_wsgi(self, user, urls, total, concurrency):
+        """Sync views through the WSGI handler, one thread per concurrent client."""
+        per_client = total // concurrency
+        clients = self.logged_in(Client, user, concurrency)
+
+        def client_loop(offset):
+            client = clients[offset]
+            timings = []
+            for url, _ in zip(self.rotated(urls, offset), range(per_client)):
+                start = time.perf_counter()
+                client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+            return timings
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            timings = [t for result in executor.map(client_loop, range(concurrency)) for t in result]
+        return timings, time.perf_counter() - start
+
+    def run_asgi(self, user, urls, total, concurrency):
+        """Async views through the ASGI handler, one task per concurrent client on a single event loop."""
+        per_client = total // concurrency
+        clients = self.logged_in(AsyncClient, user, concurrency)
+
+        async def client_loop(client, offset):
+            timings = []
+            for url, _ in zip(self.rotated(urls, offset), range(per_client)):
+                start = time.perf_counter()
+                await client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+            return timings
+
+        async def run_all():
+            results = await asyncio.gather(*(client_loop(client, i) for i, client in enumerate(clients)))
+            return [t for result in results for t in result]
+
+        start = time.perf_counter()
+        timings = asyncio.run(run_all())
+        return timings, time.perf_counter() - start
+
+    def rotated(self, urls, offset):
+        """Cycle through the URLs, each client starting at a different one."""
+        offset %= len(urls)
+        return cycle(urls[offset:] + urls[:offset])
+
+    def logged_in(self, client_class, user, count):
+        # Logging in writes the session, so do it before the clients run concurrently
+        clients = [client_class() for _ in range(count)]
+        for client in clients:
+            client.force_login(user)
+        return clients
+
+    def report(self, mode, concurrency, timings, elapsed):
+        timings.sort()
+        p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+        self.stdout.write(
+            f"  {mode:<6} {concurrency:>11} {len(timings) / elapsed:>9.1f} "
+            f"{statistics.median(timings):>7.1f}ms {p95:>7.1f}ms"
+        )
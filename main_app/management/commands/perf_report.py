@@ -0,0 +1,43 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from main_app import perf
+
+
+class Command(BaseCommand):
+    help = "Show p50/p95/p99 request time, DB time, query count, template time and size per URL name"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--slow-queries', type=int, default=3, help="Slowest queries to list per view")
+        parser.add_argument('--reset', action='store_true', help="Clear the collected metrics afterwards")
+
+    def handle(self, *args, **options):
+        if isinstance(caches['default'], (LocMemCache, DummyCache)):
+            # The web processes flush their metrics to their own memory, not to this process
+            self.stderr.write(self.style.WARNING(
+                "The default cache is not shared between processes, so this command cannot see the "
+                "metrics of the web server. Set CACHE_BACKEND to Redis, Memcached, the database or file "
+                "cache, or open /perf/ instead."
+            ))
+        rows = perf.report()
+        if not rows:
+            self.stdout.write("No requests recorded yet.")
+        self.stdout.write(f"Percentiles are bucket upper bounds (within {perf.BUCKET_GROWTH - 1:.0%}).")
+        for row in rows:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{row['name']} ({row['requests']} requests)"))
+            for metric, unit in [('time', 'ms'), ('db_time', 'ms'), ('queries', ''),
+                                 ('template_time', 'ms'), ('size', 'B')]:
+                values = '  '.join(f"{q} {self.format(row[metric][q], unit)}" for q in ('p50', 'p95', 'p99'))
+                self.stdout.write(f"  {metric:<14} {values}")
+            for elapsed, sql in row['slow_queries'][:options['slow_queries']]:
+                self.stdout.write(self.style.WARNING(f"  slow query {elapsed:.1f} ms: {sql[:200]}"))
+        if options['reset']:
+            perf.reset()
+            self.stdout.write(self.style.SUCCESS("Metrics cleared."))
+
+    def format(self, value, unit):
+        if value is None:
+            return '-'
+        return f"{value:,.1f}{unit}" if unit == 'ms' else f"{value:,.0f}{unit}"
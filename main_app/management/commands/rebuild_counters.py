@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main_app import counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the materialized dashboard counters from the source tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Rows per INSERT when writing the counters")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = counters.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} counters."))
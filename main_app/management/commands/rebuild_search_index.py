@@ -0,0 +1,24 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from main_app import search
+
+
+class Command(BaseCommand):
+    help = ("Recreate the full-text search structures and reindex every row. Run this after "
+            "a migration that rebuilds a searched table, since SQLite drops its triggers.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        tables = {
+            apps.get_model(label)._meta.db_table: fields
+            for label, fields in search.SEARCH_FIELDS.items()
+        }
+        with transaction.atomic(using=connection.alias):
+            search.uninstall_indexes(connection, tables)
+            search.install_indexes(connection, tables)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt search index for {', '.join(tables)}."))
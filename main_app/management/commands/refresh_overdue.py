@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from main_app import workload
+
+
+class Command(BaseCommand):
+    help = "Count the tasks that became overdue since the workload summary was last updated"
+
+    def handle(self, *args, **options):
+        users = workload.refresh_overdue()
+        self.stdout.write(self.style.SUCCESS(f"Recounted the overdue tasks of {users} users."))
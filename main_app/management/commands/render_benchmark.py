@@ -0,0 +1,47 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from main_app.benchmarks import RENDER_PROFILES, analyze, run_renders, scratch_database
+from main_app.sample_data import generate
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class Command(BaseCommand):
+    help = ("Seed a throwaway database and compare the template render time of every page before "
+            "(templates parsed on every render, crispy forms) and after (cached loader, plain Bootstrap forms)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10_000, help="Tasks to seed")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed requests per page and profile")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        # No cache, so every request renders its fragments instead of reading them back
+        with override_settings(CACHES=NO_CACHE), scratch_database() as connection:
+            tasks = options['tasks']
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Seeding {tasks:,} tasks..."))
+            generate(users=max(50, tasks // 100), projects=max(5, tasks // 500), tasks=tasks, seed=options['seed'])
+            analyze(connection)
+            user = User.objects.get(username='user0')
+
+            results = {}
+            for profile, overrides in RENDER_PROFILES.items():
+                self.stdout.write(f"Rendering with the {profile!r} profile...")
+                with override_settings(**overrides):
+                    results[profile] = run_renders(user, options['repeat'])
+
+        before, after = results['before'], results['after']
+        self.stdout.write(f"  {'page':<34} {'before p50':>11} {'after p50':>10} {'after p95':>10} {'speedup':>8}")
+        for name, slow in before.items():
+            fast = after[name]
+            speedup = slow['p50'] / fast['p50'] if fast['p50'] else 0
+            self.stdout.write(
+                f"  {name:<34} {slow['p50']:>9.2f}ms {fast['p50']:>8.2f}ms {fast['p95']:>8.2f}ms {speedup:>7.1f}x"
+            )
+        total_before = sum(result['p50'] for result in before.values())
+        total_after = sum(result['p50'] for result in after.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Total p50 render time: {total_before:.1f}ms before, {total_after:.1f}ms after."
+        ))
@@ -0,0 +1,60 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from main_app import jobs, worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (thumbnails, workload summary, ...) in a pool of worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2, help="Worker processes (0 runs jobs in this process)")
+        parser.add_argument('--batch', type=int, default=10, help="Jobs claimed at a time by each process")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to wait when the queue is empty")
+        parser.add_argument('--once', action='store_true', help="Run the jobs that are due now, then exit")
+
+    def handle(self, *args, **options):
+        if options['once']:
+            succeeded, failed = jobs.run_pending(jobs.worker_name(), options['batch'])
+            self.stdout.write(self.style.SUCCESS(f"Ran {succeeded} jobs."))
+            if failed:
+                self.stdout.write(self.style.WARNING(f"{failed} jobs failed and will be retried or kept as failed."))
+            return
+
+        # The platform's start method: fork on Linux, spawn on Windows and macOS,
+        # where fork is missing or unsafe (worker.main sets Django up either way)
+        context = multiprocessing.get_context()
+        stop = context.Event()
+        # SIGTERM stops like Ctrl+C. Setting ``stop`` from the handler instead would
+        # deadlock when the signal arrives while this process waits on it.
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        if options['processes'] <= 0:
+            self.stdout.write(f"Running jobs in process {jobs.worker_name()}. Press Ctrl+C to stop.")
+            try:
+                jobs.work(stop, options['batch'], options['poll_interval'])
+            except KeyboardInterrupt:
+                pass
+            return
+
+        # Each process opens its own connection; a shared one would be corrupted
+        connections.close_all()
+        processes = [
+            context.Process(target=worker.main, args=(stop, options['batch'], options['poll_interval']),
+                            name=f'worker-{number}')
+            for number in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f"Started {len(processes)} worker processes. Press Ctrl+C to stop.")
+        try:
+            while any(process.is_alive() for process in processes) and not stop.is_set():
+                stop.wait(1)
+        except KeyboardInterrupt:
+            pass
+        stop.set()
+        self.stdout.write("Stopping after the jobs in progress...")
+        for process in processes:
+            process.join()
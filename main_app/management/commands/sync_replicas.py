@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from main_app.routers import copy_sqlite
+
+
+class Command(BaseCommand):
+    help = ("Copy the primary SQLite database over every replica in DB_REPLICAS, standing in for "
+            "replication when trying the read replicas locally (run it periodically, e.g. from cron)")
+
+    def handle(self, *args, **options):
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError("sync_replicas only copies SQLite files; use the database's own replication.")
+        if not settings.REPLICA_DATABASES:
+            raise CommandError("No replicas configured; set DB_REPLICAS, e.g. DB_REPLICAS=db.replica1.sqlite3.")
+        for alias in settings.REPLICA_DATABASES:
+            replica = connections[alias]
+            # Its open connection would keep reading the old file contents
+            replica.close()
+            copy_sqlite(str(primary.settings_dict['NAME']), str(replica.settings_dict['NAME']))
+            self.stdout.write(f"Copied {primary.settings_dict['NAME']} to {replica.settings_dict['NAME']} ({alias}).")
+        self.stdout.write(self.style.SUCCESS(f"Synced {len(settings.REPLICA_DATABASES)} replicas."))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from main_app import workload
+
+COLUMNS = ('pending', 'in_progress', 'completed', 'high', 'medium', 'low', 'overdue', 'total')
+
+
+class Command(BaseCommand):
+    help = "Show per-user task counts by status, open tasks by priority and overdue tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help="Recompute the workload summary from the tasks table first")
+        parser.add_argument('--limit', type=int, default=20, help="Users to show, most overdue first")
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            total = workload.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} workload rows."))
+        else:
+            workload.refresh_overdue()
+        rows = list(workload.report()[:options['limit']])
+        if not rows:
+            self.stdout.write("No assigned tasks yet.")
+            return
+        self.stdout.write(f"{'user':<20}" + ''.join(f"{column:>12}" for column in COLUMNS))
+        for row in rows:
+            self.stdout.write(f"{row['user__username'][:20]:<20}" + ''.join(f"{row[column]:>12,}" for column in COLUMNS))
@@ -0,0 +1,106 @@
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import perf, routers
+
+
+class PerformanceMiddleware:
+    """
+    Time every request, count its queries and template rendering, add a
+    Server-Timing header and record it under its URL name (see perf.py).
+    Runs natively under both WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.PERF_ENABLED:
+            return self.get_response(request)
+        with self.measure() as metrics:
+            response = self.get_response(request)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not settings.PERF_ENABLED:
+            return await self.get_response(request)
+        with self.measure() as metrics:
+            response = await self.get_response(request)
+        return self.finish(request, response, metrics)
+
+    @contextmanager
+    def measure(self):
+        metrics, token = perf.start()
+        try:
+            yield metrics
+        finally:
+            perf.finish(token)
+
+    def finish(self, request, response, metrics):
+        total = metrics.elapsed()
+        response['Server-Timing'] = metrics.server_timing(total)
+        match = request.resolver_match
+        name = match.view_name if match and match.url_name else 'unresolved'
+        size = None if response.streaming else len(response.content)
+        perf.record(name, metrics, total, size)
+        return response
+
+
+class ReplicaMiddleware:
+    """
+    Let GET/HEAD requests read from the replicas (see routers.py), except for
+    browsers that wrote something in the last REPLICA_STICKY_SECONDS.
+    """
+
+    sync_capable = True
+    async_capable = True
+    COOKIE = 'use_primary'
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.REPLICA_DATABASES:
+            return self.get_response(request)
+        token = routers.use_primary.set(self.needs_primary(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.use_primary.reset(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        if not settings.REPLICA_DATABASES:
+            return await self.get_response(request)
+        token = routers.use_primary.set(self.needs_primary(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            routers.use_primary.reset(token)
+        return self.finish(request, response)
+
+    def needs_primary(self, request):
+        return request.method not in self.SAFE_METHODS or self.COOKIE in request.COOKIES
+
+    def finish(self, request, response):
+        if request.method not in self.SAFE_METHODS:
+            # Read your writes: stay on the primary until the replicas have caught up
+            response.set_cookie(self.COOKIE, '1', max_age=settings.REPLICA_STICKY_SECONDS,
+                                httponly=True, samesite='Lax')
+        return response
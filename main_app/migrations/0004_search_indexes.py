@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.db import migrations
+
+from main_app import search
+
+# Frozen copy of search.SEARCH_FIELDS at the time of this migration
+SEARCH_FIELDS = {
+    ('main_app', 'Task'): ['title', 'description'],
+    ('main_app', 'Project'): ['name', 'description'],
+    ('auth', 'User'): ['username', 'first_name', 'last_name', 'email'],
+}
+
+
+def search_tables(apps):
+    return {
+        apps.get_model(app_label, model_name)._meta.db_table: fields
+        for (app_label, model_name), fields in SEARCH_FIELDS.items()
+    }
+
+
+def install(apps, schema_editor):
+    search.install_indexes(schema_editor.connection, search_tables(apps))
+
+
+def uninstall(apps, schema_editor):
+    search.uninstall_indexes(schema_editor.connection, search_tables(apps))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('main_app', '0003_task_project_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
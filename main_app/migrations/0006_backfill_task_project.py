@@ -0,0 +1,58 @@
+from django.db import migrations, transaction
+
+BATCH_SIZE = 1000
+
+
+def backfill_task_project(apps, schema_editor):
+    """
+    Attach existing tasks to a project.
+
+    A task goes to the most recently created project its assignee is a member
+    of, which is what project_detail used to show. Tasks are walked in primary
+    key batches so no single transaction or UPDATE grows with the table.
+    """
+    Task = apps.get_model('main_app', 'Task')
+    Membership = apps.get_model('main_app', 'Project').members.through
+    db_alias = schema_editor.connection.alias
+
+    # Later rows overwrite earlier ones, leaving each user's newest project
+    project_for_user = dict(
+        Membership.objects.using(db_alias)
+        .order_by('project__created_at', 'project_id')
+        .values_list('user_id', 'project_id')
+    )
+    if not project_for_user:
+        return
+
+    last_pk = 0
+    while True:
+        batch = list(
+            Task.objects.using(db_alias)
+            .filter(pk__gt=last_pk, project__isnull=True)
+            .order_by('pk')
+            .values_list('pk', 'assigned_to_id')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_pk = batch[-1][0]
+
+        by_project = {}
+        for pk, user_id in batch:
+            project_id = project_for_user.get(user_id)
+            if project_id is not None:
+                by_project.setdefault(project_id, []).append(pk)
+        with transaction.atomic(using=db_alias):
+            for project_id, pks in by_project.items():
+                Task.objects.using(db_alias).filter(pk__in=pks).update(project_id=project_id)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('main_app', '0005_task_project'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_task_project, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def build_workload(apps, schema_editor):
+    """Fill the summary table from one grouped pass over the existing tasks."""
+    Task = apps.get_model('main_app', 'Task')
+    UserWorkload = apps.get_model('main_app', 'UserWorkload')
+    db_alias = schema_editor.connection.alias
+    now = django.utils.timezone.now()
+    is_open = ~models.Q(status='completed')
+    rows = (
+        Task.objects.using(db_alias).order_by()
+        .values('assigned_to_id', 'status', 'priority')
+        .annotate(
+            tasks=models.Count('id'),
+            overdue=models.Count('id', filter=is_open & models.Q(due_date__lt=now)),
+            next_due_date=models.Min('due_date', filter=is_open & models.Q(due_date__gte=now)),
+        )
+    )
+    UserWorkload.objects.using(db_alias).bulk_create(
+        [
+            UserWorkload(user_id=row['assigned_to_id'], status=row['status'], priority=row['priority'],
+                         tasks=row['tasks'], overdue=row['overdue'], next_due_date=row['next_due_date'])
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('main_app', '0006_backfill_task_project'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserWorkload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=15)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], max_length=10)),
+                ('tasks', models.IntegerField(default=0)),
+                ('overdue', models.IntegerField(default=0)),
+                ('next_due_date', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workload', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['next_due_date'], name='workload_next_due_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='userworkload',
+            constraint=models.UniqueConstraint(fields=('user', 'status', 'priority'), name='workload_user_status_priority'),
+        ),
+        migrations.RunPython(build_workload, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db import migrations
+
+# Expression indexes for autocomplete.match_users(). auth_user belongs to
+# another app, so they are created here with SQL; the doubled parentheses
+# make the CREATE valid on SQLite, PostgreSQL and MySQL 8 alike. Only the
+# DROP differs: MySQL needs the table name.
+FIELDS = ('username', 'first_name', 'last_name')
+
+
+def create_indexes(apps, schema_editor):
+    for field in FIELDS:
+        schema_editor.execute(f'CREATE INDEX user_{field}_lower_idx ON auth_user ((LOWER({field})))')
+
+
+def drop_indexes(apps, schema_editor):
+    on_table = ' ON auth_user' if schema_editor.connection.vendor == 'mysql' else ''
+    for field in FIELDS:
+        schema_editor.execute(f'DROP INDEX user_{field}_lower_idx{on_table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('main_app', '0009_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
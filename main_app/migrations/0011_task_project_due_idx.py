@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0010_user_lower_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'due_date'], name='task_project_due_idx'),
+        ),
+    ]
@@ -1,18 +1,51 @@
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.contrib.auth.models import User
 from django.urls import reverse
+from django.utils import timezone
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     phone = models.CharField(max_length=15, blank=True)
     address = models.TextField(blank=True)
     profile_picture = models.ImageField(upload_to='profiles/', blank=True, null=True)
+    # Storage names of the resized copies, {size: {format: name}}; see thumbnails.py
+    thumbnails = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.user.username}'s Profile"
 
+    # Profiles are created lazily, the first time a user saves something in theirs
+    @classmethod
+    def for_user(cls, user):
+        """The user's profile, or an unsaved empty one if they have none yet."""
+        try:
+            return user.userprofile
+        except cls.DoesNotExist:
+            return cls(user=user)
+
+    @classmethod
+    async def afor_user(cls, user):
+        return await cls.objects.filter(user=user).afirst() or cls(user=user)
+
+    def thumbnail(self, size):
+        """{format: url} of a thumbnail size, or None until it has been generated."""
+        names = self.thumbnails.get(size)
+        if not names:
+            return None
+        return {fmt: default_storage.url(name) for fmt, name in names.items()}
+
+    @property
+    def small_thumbnail(self):
+        return self.thumbnail('small')
+
+    @property
+    def large_thumbnail(self):
+        return self.thumbnail('large')
+
 class Task(models.Model):
     PRIORITY_CHOICES = [
         ('low', 'Low'),
@@ -32,12 +65,23 @@ class Task(models.Model):
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='pending')
     assigned_to = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tasks')
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_tasks')
+    project = models.ForeignKey('Project', on_delete=models.SET_NULL, related_name='tasks', blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     due_date = models.DateTimeField(blank=True, null=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='task_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='task_status_created_idx'),
+            models.Index(fields=['priority', '-created_at', '-id'], name='task_priority_created_idx'),
+            models.Index(fields=['status', 'priority', '-created_at', '-id'], name='task_status_prio_created_idx'),
+            models.Index(fields=['assigned_to', '-created_at', '-id'], name='task_assignee_created_idx'),
+            models.Index(fields=['project', '-created_at', '-id'], name='task_project_created_idx'),
+            models.Index(fields=['project', 'status'], name='task_project_status_idx'),
+            models.Index(fields=['project', 'due_date'], name='task_project_due_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -57,9 +101,85 @@ class Project(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='project_created_idx'),
+            models.Index(fields=['manager', '-created_at', '-id'], name='project_manager_created_idx'),
+            models.Index(fields=['is_active', '-created_at', '-id'], name='project_active_created_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
     def get_absolute_url(self):
         return reverse('project_detail', kwargs={'pk': self.pk})
+
+    @staticmethod
+    def active_filter(active):
+        """
+        A filter on is_active that can use project_active_created_idx. Django
+        writes is_active=True as a bare "WHERE is_active", which SQLite cannot
+        look up in an index; comparing to a value it can.
+        """
+        return models.Q(is_active=models.Value(active))
+
+class StatCounter(models.Model):
+    """A materialized count read by the dashboard and kept current by signals."""
+    key = models.CharField(max_length=100, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+class UserWorkload(models.Model):
+    """
+    How many of a user's tasks have a given status and priority, and how many
+    of those are overdue. Kept current by signals; see workload.py.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='workload')
+    status = models.CharField(max_length=15, choices=Task.STATUS_CHOICES)
+    priority = models.CharField(max_length=10, choices=Task.PRIORITY_CHOICES)
+    tasks = models.IntegerField(default=0)
+    overdue = models.IntegerField(default=0)
+    # Earliest due date not yet counted in ``overdue``; the row is refreshed once it passes
+    next_due_date = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'status', 'priority'], name='workload_user_status_priority'),
+        ]
+        indexes = [
+            models.Index(fields=['next_due_date'], name='workload_next_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.status}/{self.priority}: {self.tasks}"
+
+class Job(models.Model):
+    """A function call queued for the background worker; see jobs.py."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name}{tuple(self.args)} ({self.status})"
@@ -0,0 +1,284 @@
+"""
+Keyset (cursor) pagination for the list views.
+
+Instead of OFFSET, every page is fetched with a WHERE clause that continues
+from the sort key of the last row seen, so page 5000 costs the same as page 1.
+The position is handed to the client as an opaque cursor token.
+"""
+
+import base64
+import binascii
+import datetime
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, FieldError, ValidationError
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+
+APPROXIMATE_COUNT_TIMEOUT = 60
+
+
+def _encode_value(value):
+    if isinstance(value, datetime.datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {'d': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return parse_datetime(value['dt'])
+        if 'd' in value:
+            return parse_date(value['d'])
+        raise ValueError("Unknown cursor value")
+    return value
+
+
+def encode_cursor(values, direction):
+    payload = json.dumps({'v': [_encode_value(v) for v in values], 'd': direction},
+                         separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (values, direction) for a cursor token, or None if it is invalid."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [_decode_value(v) for v in payload['v']]
+        direction = payload['d']
+    except (binascii.Error, ValueError, KeyError, TypeError, UnicodeDecodeError):
+        return None
+    if direction not in ('n', 'p') or any(v is None for v in values):
+        return None
+    return values, direction
+
+
+def approximate_count(queryset):
+    """
+    A cheap row count for display purposes.
+
+    Unfiltered tables on PostgreSQL use the planner's estimate; anything else
+    is counted exactly once and cached for APPROXIMATE_COUNT_TIMEOUT seconds.
+    """
+    query = queryset.query
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql' and not query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+
+    key = _count_key(queryset)
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, APPROXIMATE_COUNT_TIMEOUT)
+    return count
+
+
+async def aapproximate_count(queryset):
+    if connections[queryset.db].vendor == 'postgresql':
+        return await sync_to_async(approximate_count)(queryset)
+    key = _count_key(queryset)
+    count = await cache.aget(key)
+    if count is None:
+        count = await queryset.acount()
+        await cache.aset(key, count, APPROXIMATE_COUNT_TIMEOUT)
+    return count
+
+
+def _count_key(queryset):
+    # Only the rows matter: annotations that are not filtered on (like one
+    # comparing to the current time) must not change the key
+    sql, params = queryset.values('pk').query.sql_with_params()
+    digest = hashlib.md5(f"{sql}|{params}".encode()).hexdigest()
+    return f'pagination:count:{digest}'
+
+
+class CursorPage:
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.has_next_page = has_next
+        self.has_previous_page = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.has_next_page
+
+    def has_previous(self):
+        return self.has_previous_page
+
+    def has_other_pages(self):
+        return self.has_next_page or self.has_previous_page
+
+    @property
+    def next_cursor(self):
+        if self.has_next_page:
+            return self.paginator.cursor_for(self.object_list[-1], 'n')
+        return ''
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous_page:
+            return self.paginator.cursor_for(self.object_list[0], 'p')
+        return ''
+
+    @property
+    def count(self):
+        return self.paginator.count
+
+
+class CursorPaginator:
+    """
+    Paginate a queryset by a unique sort key.
+
+    ``ordering`` must end with a unique field (normally ``-id``) so that every
+    row has a distinct position. ``count_mode`` is None (no total), 'exact'
+    or 'approximate'.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id'), count_mode=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+        self.count_mode = count_mode
+        self._count = None
+
+    @property
+    def count(self):
+        if self.count_mode is None:
+            return None
+        if self._count is None:
+            if self.count_mode == 'approximate':
+                self._count = approximate_count(self.queryset)
+            else:
+                self._count = self.queryset.count()
+        return self._count
+
+    async def acount(self):
+        if self.count_mode is not None and self._count is None:
+            if self.count_mode == 'approximate':
+                self._count = await aapproximate_count(self.queryset)
+            else:
+                self._count = await self.queryset.acount()
+        return self._count
+
+    def cursor_for(self, obj, direction):
+        return encode_cursor([getattr(obj, name) for name, descending in self.ordering], direction)
+
+    def _order_by(self, reverse):
+        return [
+            ('-' if descending != reverse else '') + name
+            for name, descending in self.ordering
+        ]
+
+    def _after(self, values, reverse):
+        """Rows strictly after ``values`` in the (possibly reversed) ordering."""
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.ordering, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _field(self, name):
+        """The field sorted by ``name``: an annotation's output field or a model field, or None."""
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            try:
+                return annotation.output_field
+            except FieldError:
+                return None
+        model = self.queryset.model
+        field = None
+        for part in name.split('__'):
+            if model is None:
+                return None
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            model = field.related_model
+        return field
+
+    def _decode(self, cursor):
+        decoded = decode_cursor(cursor) if cursor else None
+        if decoded is None or len(decoded[0]) != len(self.ordering):
+            return None
+        values, direction = decoded
+        # A token is only base64 JSON; one edited to hold values of the wrong
+        # type would make the query raise, so it gets the first page instead
+        try:
+            for index, (name, descending) in enumerate(self.ordering):
+                field = self._field(name)
+                if field is not None:
+                    values[index] = field.to_python(values[index])
+        except (ValidationError, TypeError, ValueError):
+            return None
+        return values, direction
+
+    def _rows(self, decoded):
+        """The query for a page plus one row, which tells whether another page follows."""
+        if decoded is None:
+            return self.queryset.order_by(*self._order_by(False))[:self.per_page + 1]
+        values, direction = decoded
+        reverse = direction == 'p'
+        return (
+            self.queryset.filter(self._after(values, reverse))
+            .order_by(*self._order_by(reverse))[:self.per_page + 1]
+        )
+
+    def _page(self, rows, decoded):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if decoded is None:
+            return CursorPage(rows, self, has_more, False)
+        if decoded[1] == 'p':
+            rows.reverse()
+            return CursorPage(rows, self, True, has_more)
+        return CursorPage(rows, self, has_more, True)
+
+    def get_page(self, cursor=None):
+        """Return the page at ``cursor``; a missing or invalid cursor gives the first page."""
+        decoded = self._decode(cursor)
+        rows = list(self._rows(decoded))
+        if decoded and not rows:
+            return self.get_page()
+        return self._page(rows, decoded)
+
+    async def aget_page(self, cursor=None):
+        """Async get_page(). The count is fetched here too, so rendering the page needs no query."""
+        decoded = self._decode(cursor)
+        rows = await _alist(self._rows(decoded))
+        await self.acount()
+        if decoded and not rows:
+            return await self.aget_page()
+        return self._page(rows, decoded)
+
+
+async def _alist(queryset):
+    return [row async for row in queryset]
@@ -0,0 +1,264 @@
+"""
+Request performance metrics.
+
+PerformanceMiddleware (middleware.py) opens a RequestMetrics for every
+request. Database time is collected by an execute wrapper installed on every
+connection as it opens, and template time by the InstrumentedTemplates
+backend configured in settings. Both find the request's metrics through a
+ContextVar, which sync_to_async carries into the threads that run the ORM
+under ASGI.
+
+Finished requests are folded into histograms per URL name. Each process
+aggregates in memory and flushes to the cache every PERF_FLUSH_INTERVAL
+seconds with ``cache.incr``, so a shared cache (Redis, Memcached) combines
+all workers. Histogram buckets grow by 25%, which bounds the error of the
+reported percentiles.
+"""
+
+import math
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.template.exceptions import TemplateDoesNotExist
+
+METRICS = ('time', 'db_time', 'queries', 'template_time', 'size')
+BUCKET_GROWTH = 1.25
+BUCKETS = 100
+SLOW_QUERIES_KEPT = 10
+KEY_PREFIX = 'perf:'
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.slow_queries = []
+        # Async views can run queries in several threads at once
+        self.lock = threading.Lock()
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with self.lock:
+                self.queries += 1
+                self.db_time += elapsed
+                if elapsed >= settings.PERF_SLOW_QUERY_MS:
+                    self.slow_queries.append((round(elapsed, 2), sql))
+
+    def elapsed(self):
+        return (time.perf_counter() - self.start) * 1000
+
+    def server_timing(self, total):
+        return (f'app;dur={total:.1f}, db;dur={self.db_time:.1f};desc="{self.queries} queries", '
+                f'tpl;dur={self.template_time:.1f}')
+
+
+def start():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def finish(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+# Queries
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.record_query(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    # Each thread has its own connections, so the wrapper goes on all of them
+    # rather than on those of the thread running the middleware
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# Templates
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+        # Only the outermost render counts; crispy and friends render templates inside it
+        metrics.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_time += (time.perf_counter() - start) * 1000
+
+
+class InstrumentedTemplates(DjangoTemplates):
+    """The Django template backend, timing every render for the current request."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return InstrumentedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+# Histograms
+def bucket(value):
+    if value <= 1:
+        return 0
+    return min(BUCKETS - 1, math.ceil(math.log(value, BUCKET_GROWTH)))
+
+
+def bucket_bound(index):
+    return BUCKET_GROWTH ** index
+
+
+class Aggregator:
+    """Per-process totals since the last flush."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.counts = {}
+        self.slow_queries = {}
+        self.last_flush = time.monotonic()
+
+    def add(self, name, values, slow_queries):
+        with self.lock:
+            for metric, value in values.items():
+                key = (name, metric, bucket(value))
+                self.counts[key] = self.counts.get(key, 0) + 1
+            totals = (name, 'requests', None)
+            self.counts[totals] = self.counts.get(totals, 0) + 1
+            if slow_queries:
+                self.slow_queries.setdefault(name, []).extend(slow_queries)
+            due = time.monotonic() - self.last_flush >= settings.PERF_FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            counts, slow, names = self.counts, self.slow_queries, {key[0] for key in self.counts}
+            self.reset()
+        _flush(counts, slow, names)
+
+
+aggregator = Aggregator()
+
+
+def _bucket_key(name, metric, index):
+    if index is None:
+        return f'{KEY_PREFIX}{name}:{metric}'
+    return f'{KEY_PREFIX}{name}:{metric}:{index}'
+
+
+def _slow_key(name):
+    return f'{KEY_PREFIX}{name}:slow'
+
+
+def _keys(names):
+    """Every cache key holding data for the given URL names."""
+    keys = [_bucket_key(name, metric, index) for name in names for metric in METRICS for index in range(BUCKETS)]
+    keys += [_bucket_key(name, 'requests', None) for name in names]
+    keys += [_slow_key(name) for name in names]
+    return keys
+
+
+def _incr(key, delta):
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+def _flush(counts, slow_queries, names):
+    for (name, metric, index), delta in counts.items():
+        _incr(_bucket_key(name, metric, index), delta)
+    known = cache.get(f'{KEY_PREFIX}names', set())
+    if not names <= known:
+        cache.set(f'{KEY_PREFIX}names', known | names, None)
+    for name, queries in slow_queries.items():
+        key = _slow_key(name)
+        merged = sorted(cache.get(key, []) + queries, reverse=True)[:SLOW_QUERIES_KEPT]
+        cache.set(key, merged, None)
+
+
+def record(name, metrics, total, size):
+    """Fold a finished request into the histograms."""
+    values = {
+        'time': total,
+        'db_time': metrics.db_time,
+        'queries': metrics.queries,
+        'template_time': metrics.template_time,
+    }
+    if size is not None:
+        values['size'] = size
+    aggregator.add(name, values, metrics.slow_queries)
+
+
+# Reporting
+def percentiles(histogram, total, quantiles=(0.5, 0.95, 0.99)):
+    """Upper bounds of the buckets holding each quantile."""
+    results = []
+    for quantile in quantiles:
+        target, seen = quantile * total, 0
+        for index in sorted(histogram):
+            seen += histogram[index]
+            if seen >= target:
+                results.append(bucket_bound(index))
+                break
+        else:
+            results.append(None)
+    return results
+
+
+def report():
+    """p50/p95/p99 of every metric and the slowest queries, per URL name."""
+    aggregator.flush()
+    names = sorted(cache.get(f'{KEY_PREFIX}names', set()))
+    values = cache.get_many(_keys(names))
+
+    rows = []
+    for name in names:
+        requests = values.get(_bucket_key(name, 'requests', None), 0)
+        row = {'name': name, 'requests': requests, 'slow_queries': values.get(_slow_key(name), [])}
+        for metric in METRICS:
+            histogram = {index: values[_bucket_key(name, metric, index)] for index in range(BUCKETS)
+                         if _bucket_key(name, metric, index) in values}
+            p50, p95, p99 = percentiles(histogram, sum(histogram.values()))
+            row[metric] = {'p50': p50, 'p95': p95, 'p99': p99}
+        rows.append(row)
+    return sorted(rows, key=lambda row: row['time']['p95'] or 0, reverse=True)
+
+
+def reset():
+    aggregator.reset()
+    names = cache.get(f'{KEY_PREFIX}names', set())
+    cache.delete_many(_keys(names) + [f'{KEY_PREFIX}names'])
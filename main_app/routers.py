@@ -0,0 +1,79 @@
+"""
+Read replicas.
+
+With REPLICA_DATABASES set, ReplicaRouter sends the reads of GET/HEAD
+requests to a random replica and everything else to ``default``, the
+primary. Reads go to the primary when:
+
+* they happen outside a request (commands, the job worker, the shell),
+* the request is not a GET/HEAD (forms re-read what they are about to change),
+* the browser wrote something in the last REPLICA_STICKY_SECONDS, so users
+  see their own changes even if the replicas lag behind (ReplicaMiddleware
+  marks those sessions with a cookie),
+* a transaction is open on the primary,
+* the model must always be current: sessions and queued jobs,
+* the result goes into a cache (see primary()): a stale row cached from a
+  lagging replica would outlive the lag by the whole cache timeout.
+
+Locally, ``manage.py sync_replicas`` copies db.sqlite3 over replica files to
+stand in for replication.
+"""
+
+import random
+import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Nothing is read from a replica unless ReplicaMiddleware allows it
+use_primary = ContextVar('use_primary', default=True)
+
+PRIMARY_ONLY_MODELS = {'sessions.session', 'main_app.job'}
+
+
+@contextmanager
+def primary():
+    """Send every read inside the block to the primary."""
+    token = use_primary.set(True)
+    try:
+        yield
+    finally:
+        use_primary.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (
+            not settings.REPLICA_DATABASES
+            or use_primary.get()
+            or model._meta.label_lower in PRIMARY_ONLY_MODELS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.REPLICA_DATABASES)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
+
+
+def copy_sqlite(source, target):
+    """Copy the SQLite database ``source`` over ``target`` with the online backup API."""
+    primary = sqlite3.connect(source, uri=True)
+    replica = sqlite3.connect(target)
+    try:
+        primary.backup(replica)
+    finally:
+        replica.close()
+        primary.close()
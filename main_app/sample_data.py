@@ -0,0 +1,196 @@
+"""
+Synthetic data generator behind the ``create_sample_data`` command.
+
+Generates users, projects and tasks with skewed, production-like
+distributions. Users, profiles, projects and memberships are written with
+``bulk_create``; tasks, by far the largest table, go in as plain tuples
+through batched executemany() so a million of them load without building a
+million model instances. Large loads also drop the Task indexes and search
+triggers first and rebuild them once at the end. The same seed always produces the same data, and
+passwords share one precomputed hash so no hashing happens per user.
+"""
+
+import random
+from contextlib import contextmanager, nullcontext
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import caching, counters, search, workload
+from .benchmarks import insert_in_batches
+from .models import UserProfile, Task, Project
+
+FIRST_NAMES = ['John', 'Jane', 'Mike', 'Sarah', 'David', 'Maria', 'Jose', 'Ana', 'Mark', 'Grace',
+               'Paolo', 'Kim', 'Miguel', 'Bea', 'Carlo', 'Liza', 'Ramon', 'Joy', 'Nico', 'Ella']
+LAST_NAMES = ['Doe', 'Smith', 'Wilson', 'Jones', 'Brown', 'Santos', 'Reyes', 'Cruz', 'Garcia',
+              'Mendoza', 'Torres', 'Flores', 'Bautista', 'Villanueva', 'Ramos', 'Castillo']
+VERBS = ['Setup', 'Design', 'Implement', 'Review', 'Fix', 'Test', 'Document', 'Optimize',
+         'Refactor', 'Deploy', 'Migrate', 'Audit']
+NOUNS = ['authentication', 'user interface', 'database queries', 'API endpoints', 'payment flow',
+         'search', 'reports', 'notifications', 'deployment pipeline', 'admin pages', 'caching',
+         'mobile layout', 'onboarding', 'permissions', 'file uploads']
+PROJECT_KINDS = ['Website', 'Mobile App', 'Dashboard', 'Platform', 'Integration', 'Portal', 'Migration']
+
+# Weighted choices: most tasks are done, few are high priority
+STATUS_WEIGHTS = {'completed': 55, 'pending': 25, 'in_progress': 20}
+PRIORITY_WEIGHTS = {'medium': 50, 'low': 30, 'high': 20}
+
+HISTORY = timedelta(days=2 * 365)
+TASKS_IN_PROJECT = 0.85
+ASSIGNED_TO_MEMBER = 0.9
+WITH_DUE_DATE = 0.7
+
+# Loads at least this big, and bigger than the table already is, build the
+# Task indexes after inserting instead of updating them row by row
+DEFER_INDEXES_OVER = 10_000
+
+TASK_COLUMNS = ['title', 'description', 'status', 'priority', 'assigned_to', 'created_by', 'project',
+                'due_date', 'created_at', 'updated_at']
+
+
+@contextmanager
+def keep_timestamps(*models):
+    """
+    Let bulk_create write the given created_at/updated_at values.
+
+    auto_now/auto_now_add would otherwise stamp every generated row with the
+    current time, which makes the date-ordered indexes meaningless.
+    """
+    fields = [field for model in models for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+@contextmanager
+def deferred_indexes(model):
+    """Drop ``model``'s Meta.indexes and search structures, recreating them on exit."""
+    editor = connection.schema_editor()
+    tables = {model._meta.db_table: search.search_fields(model)}
+    search.uninstall_indexes(connection, tables)
+    for index in model._meta.indexes:
+        editor.execute(index.remove_sql(model, editor))
+    yield
+    for index in model._meta.indexes:
+        editor.execute(index.create_sql(model, editor))
+    search.install_indexes(connection, tables)
+
+
+def _batched(objects, batch_size):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Generator:
+    def __init__(self, seed=0, prefix='user', password='password123', batch_size=5000):
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.password = make_password(password)
+        self.batch_size = batch_size
+        self.now = timezone.now()
+
+    def weighted(self, weights):
+        values, cum_weights = list(weights), list(accumulate(weights.values()))
+        return lambda: self.rng.choices(values, cum_weights=cum_weights)[0]
+
+    def skewed(self, values):
+        """A picker favouring the first values, so a few users or projects get most tasks."""
+        cum_weights = list(accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(values))))
+        return lambda: self.rng.choices(values, cum_weights=cum_weights)[0]
+
+    def created_at(self):
+        return self.now - timedelta(seconds=self.rng.randrange(int(HISTORY.total_seconds())))
+
+    def users(self, total):
+        for i in range(total):
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            username = f'{self.prefix}{i}'
+            yield User(username=username, first_name=first, last_name=last,
+                       email=f'{username}@example.com', password=self.password,
+                       date_joined=self.created_at())
+
+    def projects(self, total, user_ids):
+        manager = self.skewed(user_ids)
+        for i in range(total):
+            created = self.created_at()
+            yield Project(
+                name=f'{self.rng.choice(NOUNS).title()} {self.rng.choice(PROJECT_KINDS)} {i}',
+                description='Generated sample project',
+                manager_id=manager(),
+                deadline=created + timedelta(days=self.rng.randint(30, 365)),
+                is_active=self.rng.random() < 0.7,
+                created_at=created,
+                updated_at=created,
+            )
+
+    def members(self, manager_id, user_ids):
+        # Mostly small teams with a long tail of big ones; the manager is always in
+        size = min(len(user_ids), max(1, int(self.rng.lognormvariate(1.6, 0.6))))
+        return {manager_id, *self.rng.sample(user_ids, size)}
+
+    def tasks(self, total, user_ids, project_members):
+        status, priority = self.weighted(STATUS_WEIGHTS), self.weighted(PRIORITY_WEIGHTS)
+        assignee = self.skewed(user_ids)
+        project = self.skewed(list(project_members)) if project_members else None
+        for _ in range(total):
+            created = self.created_at()
+            project_id = project() if project and self.rng.random() < TASKS_IN_PROJECT else None
+            if project_id and self.rng.random() < ASSIGNED_TO_MEMBER:
+                assigned_to_id = self.rng.choice(project_members[project_id])
+            else:
+                assigned_to_id = assignee()
+            due_date = None
+            if self.rng.random() < WITH_DUE_DATE:
+                due_date = created + timedelta(days=self.rng.randint(1, 60))
+            yield (f'{self.rng.choice(VERBS)} {self.rng.choice(NOUNS)}', 'Generated sample task',
+                   status(), priority(), assigned_to_id, assignee(), project_id, due_date, created, created)
+
+    def run(self, users, projects, tasks):
+        """Generate everything in one transaction and return the row counts written."""
+        Membership = Project.members.through
+        with transaction.atomic(), keep_timestamps(Project):
+            user_ids = []
+            for batch in _batched(self.users(users), self.batch_size):
+                created = User.objects.bulk_create(batch)
+                user_ids.extend(user.pk for user in created)
+                # Profiles are otherwise created on first edit; sample users look like they have edited theirs
+                UserProfile.objects.bulk_create([UserProfile(user_id=user.pk) for user in created])
+
+            project_members = {}
+            for batch in _batched(self.projects(projects, user_ids), self.batch_size):
+                memberships = []
+                for project in Project.objects.bulk_create(batch):
+                    members = sorted(self.members(project.manager_id, user_ids))
+                    project_members[project.pk] = members
+                    memberships.extend(Membership(project_id=project.pk, user_id=user_id) for user_id in members)
+                Membership.objects.bulk_create(memberships, batch_size=self.batch_size)
+
+            defer = tasks >= DEFER_INDEXES_OVER and tasks > Task.objects.count()
+            with deferred_indexes(Task) if defer else nullcontext():
+                insert_in_batches(connection, Task, TASK_COLUMNS,
+                                  self.tasks(tasks, user_ids, project_members), self.batch_size)
+
+            counters.rebuild()
+            workload.rebuild()
+        caching.bump('tasks', 'projects', 'users')
+        return {'users': len(user_ids), 'projects': len(project_members), 'tasks': tasks}
+
+
+def generate(users, projects, tasks, seed=0, prefix='user', password='password123', batch_size=5000):
+    return Generator(seed, prefix, password, batch_size).run(users, projects, tasks)
@@ -0,0 +1,206 @@
+"""
+Full-text search for tasks, projects and users.
+
+Views call ``search(queryset, query)`` and get back a filtered queryset. The
+work is done by a backend picked from the database vendor (or the
+SEARCH_BACKEND setting):
+
+* SQLite: an external-content FTS5 table per model, kept in sync by triggers.
+* PostgreSQL: a GIN expression index over ``to_tsvector`` of the fields.
+* Anything else: the old ``icontains`` OR-chain.
+
+Every search term is prefix matched and all terms must match. With
+``ranked=True`` the results carry a ``search_rank`` annotation (higher is
+better) and are ordered by it.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+# Searchable fields per model, keyed by model label
+SEARCH_FIELDS = {
+    'main_app.task': ['title', 'description'],
+    'main_app.project': ['name', 'description'],
+    'auth.user': ['username', 'first_name', 'last_name', 'email'],
+}
+
+TERM_RE = re.compile(r'\w+')
+MAX_TERMS = 8
+
+
+def parse_terms(query):
+    return TERM_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def search_fields(model):
+    return SEARCH_FIELDS[model._meta.label_lower]
+
+
+class ContainsBackend:
+    """Fallback that ANDs an ``icontains`` OR-chain per term; no ranking."""
+
+    def filter(self, queryset, terms, ranked=False):
+        for term in terms:
+            condition = Q()
+            for field in search_fields(queryset.model):
+                condition |= Q(**{f'{field}__icontains': term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+    def install(self, connection, table, fields):
+        pass
+
+    def uninstall(self, connection, table, fields):
+        pass
+
+    def rebuild(self, connection, table, fields):
+        pass
+
+
+class SQLiteFTSBackend:
+    """FTS5 external-content tables named ``<table>_fts`` with sync triggers."""
+
+    def fts_table(self, table):
+        return f'{table}_fts'
+
+    def match_expression(self, terms):
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def filter(self, queryset, terms, ranked=False):
+        meta = queryset.model._meta
+        fts = self.fts_table(meta.db_table)
+        match = self.match_expression(terms)
+        queryset = queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM "{fts}" WHERE "{fts}" MATCH %s', [match])
+        )
+        if ranked:
+            # bm25() is lower for better matches, so flip the sign. The first
+            # field (title, name, username) outweighs the rest.
+            weights = ', '.join(['10.0'] + ['1.0'] * (len(search_fields(queryset.model)) - 1))
+            rank = RawSQL(
+                f'SELECT -bm25("{fts}", {weights}) FROM "{fts}" WHERE "{fts}" MATCH %s '
+                f'AND rowid = "{meta.db_table}"."{meta.pk.column}"',
+                [match],
+                output_field=FloatField(),
+            )
+            queryset = queryset.annotate(search_rank=rank).order_by('-search_rank', '-pk')
+        return queryset
+
+    def install(self, connection, table, fields):
+        fts = self.fts_table(table)
+        columns = ', '.join(fields)
+        new_values = ', '.join(f'new.{field}' for field in fields)
+        old_values = ', '.join(f'old.{field}' for field in fields)
+        delete_old = (f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+                      f"VALUES ('delete', old.id, {old_values});")
+        insert_new = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});"
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='{table}', "
+            f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table} "
+            f"BEGIN {delete_old} {insert_new} END",
+        ]
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+        self.rebuild(connection, table, fields)
+
+    def uninstall(self, connection, table, fields):
+        fts = self.fts_table(table)
+        with connection.cursor() as cursor:
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+            cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+
+    def rebuild(self, connection, table, fields):
+        fts = self.fts_table(table)
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+class PostgresSearchBackend:
+    """A GIN index on ``to_tsvector`` of the concatenated fields, queried with prefix tsqueries."""
+
+    config = 'simple'
+
+    def index_name(self, table):
+        return f'{table}_search_idx'
+
+    def vector(self, fields, table=None):
+        prefix = f'"{table}".' if table else ''
+        document = " || ' ' || ".join(f"coalesce({prefix}\"{field}\", '')" for field in fields)
+        return f"to_tsvector('{self.config}', {document})"
+
+    def filter(self, queryset, terms, ranked=False):
+        meta = queryset.model._meta
+        fields = search_fields(queryset.model)
+        vector = self.vector(fields, meta.db_table)
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        query = f"to_tsquery('{self.config}', %s)"
+        queryset = queryset.filter(
+            RawSQL(f'{vector} @@ {query}', [tsquery], output_field=BooleanField())
+        )
+        if ranked:
+            # Weight the first field (title, name, username) above the rest
+            weighted = f"setweight({self.vector(fields[:1], meta.db_table)}, 'A')"
+            if fields[1:]:
+                weighted += f" || {self.vector(fields[1:], meta.db_table)}"
+            rank = RawSQL(f'ts_rank({weighted}, {query})', [tsquery], output_field=FloatField())
+            queryset = queryset.annotate(search_rank=rank).order_by('-search_rank', '-pk')
+        return queryset
+
+    def install(self, connection, table, fields):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS "{self.index_name(table)}" '
+                f'ON "{table}" USING GIN ({self.vector(fields)})'
+            )
+
+    def uninstall(self, connection, table, fields):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP INDEX IF EXISTS "{self.index_name(table)}"')
+
+    def rebuild(self, connection, table, fields):
+        with connection.cursor() as cursor:
+            cursor.execute(f'REINDEX INDEX "{self.index_name(table)}"')
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_backend(using='default'):
+    backend_path = getattr(settings, 'SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)()
+    return BACKENDS.get(connections[using].vendor, ContainsBackend)()
+
+
+def search(queryset, query, ranked=False):
+    """Filter ``queryset`` down to rows matching every term of ``query``."""
+    terms = parse_terms(query)
+    if not terms:
+        return queryset.none()
+    return get_backend(queryset.db).filter(queryset, terms, ranked=ranked)
+
+
+def install_indexes(connection, tables):
+    """Create the search structures for ``{table: fields}`` on ``connection``."""
+    backend = get_backend(connection.alias)
+    for table, fields in tables.items():
+        backend.install(connection, table, fields)
+
+
+def uninstall_indexes(connection, tables):
+    backend = get_backend(connection.alias)
+    for table, fields in tables.items():
+        backend.uninstall(connection, table, fields)
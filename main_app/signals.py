@@ -1,14 +1,219 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import Signal, receiver
+from django.utils import timezone
 from django.contrib.auth.models import User
-from .models import UserProfile
+from .models import UserProfile, Task, Project
+from . import backends, caching, counters, jobs, thumbnails, workload
+
+# Profiles are created lazily (UserProfile.for_user), not with the user, and
+# saving a user never writes to them
+def _is_login(update_fields):
+    return update_fields is not None and set(update_fields) <= {'last_login'}
+
+# Dashboard counters and workload summary
+COUNTER_FIELDS = ('status', 'assigned_to_id', 'project_id')
+WORKLOAD_FIELDS = ('assigned_to_id', 'status', 'priority', 'due_date')
+
+def _task_snapshot(task, fields=COUNTER_FIELDS):
+    """The values of ``fields`` on a task, or None if any were deferred."""
+    if any(field not in task.__dict__ for field in fields):
+        return None
+    return tuple(task.__dict__[field] for field in fields)
+
+@receiver(post_init, sender=Task)
+def remember_task_counters(sender, instance, **kwargs):
+    instance._counter_snapshot = _task_snapshot(instance)
+    instance._workload_snapshot = _task_snapshot(instance, WORKLOAD_FIELDS)
+
+@receiver(pre_save, sender=Task)
+@receiver(pre_delete, sender=Task)
+def load_task_counters(sender, instance, **kwargs):
+    # Kapag deferred ang fields, kunin ang naka-save na values bago magbago
+    if instance.pk and None in (instance._counter_snapshot, instance._workload_snapshot):
+        row = Task.objects.filter(pk=instance.pk).values_list(*COUNTER_FIELDS, *WORKLOAD_FIELDS).first()
+        instance._counter_snapshot = row and row[:len(COUNTER_FIELDS)]
+        instance._workload_snapshot = row and row[len(COUNTER_FIELDS):]
+
+def _refresh_workload(*snapshots):
+    # Recounted by a background job: (assignee, status, priority) of each snapshot
+    groups = sorted({snapshot[:3] for snapshot in snapshots if snapshot is not None})
+    if groups:
+        jobs.enqueue(workload.refresh_groups, groups, unique=True)
+
+@receiver(post_save, sender=Task)
+def update_task_workload(sender, instance, created, **kwargs):
+    old = None if created else instance._workload_snapshot
+    new = _task_snapshot(instance, WORKLOAD_FIELDS)
+    if old != new:
+        _refresh_workload(old, new)
+    instance._workload_snapshot = new
+
+@receiver(post_delete, sender=Task)
+def remove_task_workload(sender, instance, **kwargs):
+    _refresh_workload(instance._workload_snapshot)
+
+@receiver(post_save, sender=Task)
+def update_task_counters(sender, instance, created, **kwargs):
+    new = (instance.status, instance.assigned_to_id, instance.project_id)
+    old = instance._counter_snapshot
+    if created or old is None:
+        counters.increment(counters.task_keys(*new))
+    elif old != new:
+        counters.move_task(old, new)
+    bump_on_commit(*_task_scopes(new), *_task_scopes(old))
+    instance._counter_snapshot = new
+
+@receiver(post_delete, sender=Task)
+def decrement_task_counters(sender, instance, **kwargs):
+    if instance._counter_snapshot is not None:
+        counters.increment(counters.task_keys(*instance._counter_snapshot), -1)
+        bump_on_commit(*_task_scopes(instance._counter_snapshot))
+
+@receiver(post_save, sender=Project)
+def increment_project_counter(sender, instance, created, **kwargs):
+    if created:
+        counters.increment([counters.PROJECTS])
+
+@receiver(post_delete, sender=Project)
+def decrement_project_counter(sender, instance, **kwargs):
+    counters.increment([counters.PROJECTS], -1)
+    counters.invalidate_project(instance.pk)
 
 @receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
+def increment_user_counter(sender, instance, created, **kwargs):
     if created:
-        UserProfile.objects.create(user=instance)
+        counters.increment([counters.USERS])
+
+@receiver(post_delete, sender=User)
+def decrement_user_counter(sender, instance, **kwargs):
+    counters.increment([counters.USERS], -1)
+    counters.invalidate_user(instance.pk)
+
+# Bulk task changes
+# Sent once by bulk.py for a whole bulk update or delete, which skip the
+# per-task signals. ``groups`` holds (old snapshot, new snapshot or None if
+# deleted, number of tasks) for every distinct (status, assignee, project).
+tasks_bulk_changed = Signal()
+
+@receiver(tasks_bulk_changed, sender=Task)
+def update_bulk_task_counters(sender, groups, **kwargs):
+    deltas = {}
+    scopes = set()
+    for old, new, count in groups:
+        for key in counters.task_keys(*old):
+            deltas[key] = deltas.get(key, 0) - count
+        scopes.update(_task_scopes(old))
+        if new is not None:
+            for key in counters.task_keys(*new):
+                deltas[key] = deltas.get(key, 0) + count
+            scopes.update(_task_scopes(new))
+    counters.apply(deltas)
+    user_ids = {old[1] for old, new, count in groups} | {new[1] for old, new, count in groups if new}
+    jobs.enqueue(workload.refresh_users, sorted(user_ids))
+    bump_on_commit(*scopes)
+
+# Cache invalidation
+bump_on_commit = caching.bump_on_commit
+
+def _task_scopes(snapshot):
+    if snapshot is None:
+        return []
+    status, assigned_to_id, project_id = snapshot
+    scopes = ['tasks', f'user:{assigned_to_id}']
+    if project_id is not None:
+        scopes.append(f'project:{project_id}')
+    return scopes
+
+def _user_project_scopes(user_id):
+    project_ids = (
+        Project.objects.filter(Q(manager_id=user_id) | Q(members=user_id))
+        .values_list('id', flat=True).distinct()
+    )
+    return [f'project:{project_id}' for project_id in project_ids]
+
+@receiver(post_init, sender=Project)
+def remember_project_manager(sender, instance, **kwargs):
+    instance._manager_snapshot = instance.__dict__.get('manager_id')
+
+@receiver(pre_delete, sender=Project)
+def remember_project_members(sender, instance, **kwargs):
+    instance._member_ids = list(instance.members.values_list('id', flat=True))
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_project_caches(sender, instance, **kwargs):
+    member_ids = getattr(instance, '_member_ids', None)
+    if member_ids is None:
+        member_ids = list(instance.members.values_list('id', flat=True))
+    user_ids = set(member_ids) | {instance.manager_id, instance._manager_snapshot} - {None}
+    bump_on_commit('projects', f'project:{instance.pk}', *[f'user:{user_id}' for user_id in user_ids])
+    instance._manager_snapshot = instance.manager_id
+
+@receiver(m2m_changed, sender=Project.members.through)
+def invalidate_membership_caches(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        related = instance.projects if reverse else instance.members
+        instance._cleared_ids = list(related.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    ids = instance._cleared_ids if action == 'post_clear' else pk_set
+    if reverse:
+        # Binago mula sa user side: instance ay User, ids ay projects
+        project_ids = list(ids)
+        scopes = [f'user:{instance.pk}'] + [f'project:{pk}' for pk in ids]
+    else:
+        project_ids = [instance.pk]
+        scopes = [f'project:{instance.pk}'] + [f'user:{pk}' for pk in ids]
+    # The API's ETags and Last-Modified come from updated_at, which must cover the members too
+    Project.objects.filter(pk__in=project_ids).update(updated_at=timezone.now())
+    bump_on_commit('projects', *scopes)
+
+# Profile picture thumbnails
+@receiver(post_init, sender=UserProfile)
+def remember_profile_picture(sender, instance, **kwargs):
+    instance._picture_snapshot = instance.__dict__.get('profile_picture')
+
+@receiver(post_save, sender=UserProfile)
+def schedule_thumbnails(sender, instance, **kwargs):
+    picture = instance.profile_picture.name or ''
+    if picture == (getattr(instance._picture_snapshot, 'name', instance._picture_snapshot) or ''):
+        return
+    instance._picture_snapshot = picture
+    if picture:
+        thumbnails.schedule(instance.pk)
+    elif instance.thumbnails:
+        instance.thumbnails = {}
+        UserProfile.objects.filter(pk=instance.pk).update(thumbnails={})
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_profile_caches(sender, instance, created=False, **kwargs):
+    scopes = [f'user:{instance.user_id}']
+    if not created:
+        scopes += _user_project_scopes(instance.user_id)
+    bump_on_commit(*scopes)
+
+@receiver(post_save, sender=User)
+def invalidate_user_caches(sender, instance, created, update_fields=None, **kwargs):
+    if _is_login(update_fields):
+        return
+    scopes = ['users', f'user:{instance.pk}']
+    if not created:
+        scopes += _user_project_scopes(instance.pk)
+    bump_on_commit(*scopes)
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user_caches(sender, instance, **kwargs):
+    bump_on_commit('users', f'user:{instance.pk}')
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    if hasattr(instance, 'userprofile'):
-        instance.userprofile.save()
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    # Now and after commit, so a request racing the transaction can't keep the old row cached
+    backends.forget_user(instance.pk)
+    transaction.on_commit(partial(backends.forget_user, instance.pk))
@@ -0,0 +1,36 @@
+"""
+SQLite tuned for a web server with several workers.
+
+Use as ``'ENGINE': 'main_app.sqlite'``. Two extra OPTIONS are understood:
+
+* ``pragmas``: PRAGMAs run on every new connection, e.g. WAL so readers no
+  longer wait for a writer, ``synchronous=NORMAL`` (safe with WAL), a larger
+  page cache and memory-mapped reads.
+* ``transaction_mode``: how ``atomic()`` starts its transactions. With the
+  default deferred BEGIN, a transaction that reads and then writes fails at
+  once with "database is locked" when another connection wrote in between,
+  whatever the busy timeout. ``IMMEDIATE`` takes the write lock at BEGIN, so
+  concurrent writers wait their turn (up to ``busy_timeout``) instead.
+"""
+
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = params.pop('pragmas', {})
+        self.transaction_mode = params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
+        else:
+            super()._start_transaction_under_autocommit()
@@ -1,7 +1,41 @@
-from django.test import TestCase
+import hashlib
+import json
+import re
+import sqlite3
+import tempfile
+from datetime import timedelta
+from importlib import import_module
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
 from django.urls import reverse
-from .models import UserProfile, Task, Project
+from django.utils import timezone
+from .models import UserProfile, Task, Project, StatCounter, UserWorkload, Job
+from . import async_views, benchmarks, bulk, caching, counters, forms, jobs, perf, routers, thumbnails, transfer, views, workload
+from .backends import CachedModelBackend
+from .middleware import ReplicaMiddleware
+from .sample_data import generate
+from .urls import urlconf
+from .pagination import CursorPaginator, encode_cursor
+from .search import search
+from .sqlite import base as sqlite_backend
+from PIL import Image
 
 class UserProfileTestCase(TestCase):
     def setUp(self):
@@ -11,10 +45,48 @@ class UserProfileTestCase(TestCase):
             password='testpass123'
         )
 
-    def test_user_profile_creation(self):
-        """Test that a user profile is created when a user is created"""
-        self.assertTrue(hasattr(self.user, 'userprofile'))
-        self.assertEqual(self.user.userprofile.user, self.user)
+    def test_profile_created_on_first_edit(self):
+        """Test that a profile is created the first time its owner changes it, not with the user"""
+        self.assertFalse(UserProfile.objects.exists())
+        self.client.login(username='testuser', password='testpass123')
+        self.client.get(reverse('profile'))
+        self.client.get(reverse('user_detail', args=[self.user.pk]))
+        self.client.post(reverse('profile'), {'phone': '', 'address': ''})
+        self.assertFalse(UserProfile.objects.exists())
+
+        self.client.post(reverse('profile'), {'phone': '555-0100', 'address': ''})
+        self.assertEqual(UserProfile.objects.get().phone, '555-0100')
+
+    def test_login_writes_once(self):
+        """Test that logging in writes only last_login, besides the session"""
+        UserProfile.objects.create(user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('login'), {'username': 'testuser', 'password': 'testpass123'})
+        self.assertEqual(response.status_code, 302)
+        writes = [
+            query['sql'] for query in queries
+            if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE')) and 'django_session' not in query['sql']
+        ]
+        self.assertEqual(len(writes), 1, writes)
+        self.assertIn('"last_login"', writes[0])
+
+    def test_user_saves_leave_profiles_alone(self):
+        """Test that saving a user, including a password rehash, writes only the user row and creates no profile"""
+        for update_fields in (None, ['password']):
+            with CaptureQueriesContext(connection) as queries:
+                self.user.save(update_fields=update_fields)
+            writes = [query['sql'] for query in queries if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+            self.assertEqual(len(writes), 1, writes)
+            self.assertIn('"auth_user"', writes[0])
+        self.assertFalse(UserProfile.objects.exists())
+
+    def test_create_missing_profiles(self):
+        """Test that the command creates the missing profiles in batches and keeps existing ones"""
+        User.objects.bulk_create([User(username=f'user{i}') for i in range(5)])
+        UserProfile.objects.create(user=self.user, phone='555-0100')
+        call_command('create_missing_profiles', batch_size=2, stdout=StringIO())
+        self.assertEqual(UserProfile.objects.count(), 6)
+        self.assertEqual(UserProfile.objects.get(user=self.user).phone, '555-0100')
 
 class TaskTestCase(TestCase):
     def setUp(self):
@@ -54,3 +126,1210 @@ class ProjectTestCase(TestCase):
         self.assertEqual(self.project.name, 'Test Project')
         self.assertEqual(self.project.manager, self.user)
         self.assertTrue(self.project.is_active)
+
+class StatCounterTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='otheruser', password='testpass123')
+        counters.rebuild()
+
+    def make_task(self, **kwargs):
+        kwargs.setdefault('assigned_to', self.user)
+        return Task.objects.create(title='Task', description='Description', created_by=self.user, **kwargs)
+
+    def test_counters_follow_task_changes(self):
+        """Test that counters are adjusted on create, update and delete"""
+        task = self.make_task()
+        keys = [counters.TASKS, counters.task_status_key('pending'), counters.task_status_key('completed'),
+                counters.user_tasks_key(self.user.pk), counters.user_tasks_key(self.other.pk)]
+        counters.get_counts(keys)
+
+        task.status = 'completed'
+        task.assigned_to = self.other
+        task.save()
+        self.make_task()
+        Task.objects.only('title').get(pk=task.pk).delete()
+
+        self.assertEqual(counters.get_counts(keys), {key: counters.compute(key) for key in keys})
+        self.assertEqual(counters.get_counts(keys)[counters.TASKS], 1)
+
+    def test_rebuild_matches_source_tables(self):
+        """Test that a rebuild produces the same values as counting directly"""
+        self.make_task(status='in_progress')
+        self.make_task(assigned_to=self.other)
+        counters.rebuild()
+        for key, value in StatCounter.objects.values_list('key', 'value'):
+            self.assertEqual(value, counters.compute(key))
+
+    def test_dashboard_reads_counters(self):
+        """Test that the dashboard shows the stored counts"""
+        self.make_task()
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['total_tasks'], 1)
+        self.assertEqual(response.context['total_users'], 2)
+        self.assertEqual(response.context['user_tasks'], 1)
+
+class CursorPaginatorTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        Task.objects.bulk_create([
+            Task(title=f'Task {i}', description='Description', assigned_to=self.user, created_by=self.user)
+            for i in range(25)
+        ])
+        # Same created_at para ma-test ang tie-breaker sa id
+        Task.objects.filter(pk__in=Task.objects.values('pk')[:10]).update(created_at=timezone.now())
+
+    def test_walks_every_row_once(self):
+        """Test that following next cursors visits every task exactly once in order"""
+        paginator = CursorPaginator(Task.objects.all(), 10, count_mode='exact')
+        page = paginator.get_page()
+        seen = list(page)
+        while page.has_next():
+            page = paginator.get_page(page.next_cursor)
+            seen.extend(page)
+        expected = list(Task.objects.order_by('-created_at', '-id'))
+        self.assertEqual(seen, expected)
+        self.assertEqual(page.count, 25)
+
+    def test_previous_cursor_returns_earlier_page(self):
+        """Test that the previous cursor leads back to the page before"""
+        paginator = CursorPaginator(Task.objects.all(), 10)
+        first = paginator.get_page()
+        second = paginator.get_page(first.next_cursor)
+        back = paginator.get_page(second.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_invalid_cursor_gives_first_page(self):
+        """Test that a tampered cursor falls back to the first page"""
+        paginator = CursorPaginator(Task.objects.all(), 10)
+        self.assertEqual(list(paginator.get_page('not-a-cursor')), list(paginator.get_page()))
+
+    def test_cursor_with_wrong_value_types_gives_first_page(self):
+        """Test that a well-formed cursor holding values of the wrong type falls back to the first page"""
+        self.client.login(username='testuser', password='testpass123')
+        first = list(CursorPaginator(Task.objects.all(), 10).get_page())
+        for values in (['abc', 1], [1, 'x'], [[1], 2], [{'dt': 'not a date'}, 1]):
+            cursor = encode_cursor(values, 'n')
+            with self.subTest(values=values):
+                self.assertEqual(list(CursorPaginator(Task.objects.all(), 10).get_page(cursor)), first)
+                for url in (reverse('task_list'), reverse('project_list'), reverse('user_list'),
+                            reverse('api_list', args=['tasks'])):
+                    self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, 200)
+
+    def test_list_views_accept_cursor(self):
+        """Test that the list views paginate with cursors"""
+        self.client.login(username='testuser', password='testpass123')
+        first = self.client.get(reverse('task_list')).context['page_obj']
+        response = self.client.get(reverse('task_list'), {'cursor': first.next_cursor})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(first[0], list(response.context['page_obj']))
+        for name in ('project_list', 'user_list'):
+            self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+
+class SearchTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', first_name='Maria', password='testpass123')
+        self.task = Task.objects.create(title='Database migration', description='Move the reports to PostgreSQL',
+                                        assigned_to=self.user, created_by=self.user)
+        Task.objects.create(title='Frontend polish', description='Tweak the database dashboard colours',
+                            assigned_to=self.user, created_by=self.user)
+
+    def test_prefix_matching(self):
+        """Test that partial words match and every term must match"""
+        self.assertEqual(search(Task.objects.all(), 'data').count(), 2)
+        self.assertEqual(list(search(Task.objects.all(), 'migr postgre')), [self.task])
+        self.assertEqual(list(search(User.objects.all(), 'mar')), [self.user])
+
+    def test_ranked_results(self):
+        """Test that ranked search puts the best match first"""
+        results = list(search(Task.objects.all(), 'database', ranked=True))
+        self.assertEqual(results[0], self.task)
+        self.assertGreater(results[0].search_rank, results[1].search_rank)
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test that edits and deletes are reflected in the search index"""
+        self.task.title = 'Schema cleanup'
+        self.task.save()
+        self.assertEqual(search(Task.objects.all(), 'schema').get(), self.task)
+        self.task.delete()
+        self.assertFalse(search(Task.objects.all(), 'schema').exists())
+
+    def test_task_list_search(self):
+        """Test that the task list uses the search backend"""
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('task_list'), {'search': 'migra'})
+        self.assertEqual(list(response.context['page_obj']), [self.task])
+
+class QueryBudgetMixin:
+    """
+    Assert that a view stays within a fixed number of queries.
+
+    ``assertQueryBudget`` fails if the response needs more than ``budget``
+    queries. Combine it with growing fixtures to catch queries that scale with
+    the number of rows (N+1).
+    """
+
+    def assertQueryBudget(self, budget, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = '\n'.join(query['sql'] for query in context.captured_queries)
+            self.fail(f"{url} ran {executed} queries, budget is {budget}:\n{queries}")
+        return executed
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class QueryBudgetTestCase(QueryBudgetMixin, TestCase):
+    # Session, user, and the view's own queries; none of them may grow with the data
+    BUDGETS = {
+        'dashboard': 5,
+        'task_list': 4,
+        'task_detail': 3,
+        'project_list': 4,
+        'project_detail': 6,
+        'user_list': 4,
+        'user_detail': 8,
+        'profile': 5,
+    }
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.login(username='testuser', password='testpass123')
+
+    def seed(self, total):
+        """Grow the fixtures to ``total`` tasks spread over users and projects."""
+        existing = Task.objects.count()
+        start = User.objects.count()
+        users = User.objects.bulk_create([
+            User(username=f'user{i}', first_name='Member') for i in range(start, start + max(1, total // 100))
+        ])
+        users.append(self.user)
+        UserProfile.objects.bulk_create([UserProfile(user=user) for user in users[:-1]])
+        projects = Project.objects.bulk_create([
+            Project(name=f'Project {i}', description='Description', manager=users[i % len(users)])
+            for i in range(max(1, total // 100))
+        ])
+        Task.objects.bulk_create([
+            Task(title=f'Task {i}', description='Description', assigned_to=users[i % len(users)],
+                 created_by=self.user, project=projects[i % len(projects)])
+            for i in range(existing, total)
+        ], batch_size=1000)
+        Membership = Project.members.through
+        Membership.objects.bulk_create([
+            Membership(project=project, user=user) for project in projects for user in users[:20]
+        ], ignore_conflicts=True)
+        counters.rebuild()
+
+    def urls(self):
+        task = Task.objects.first()
+        project = Project.objects.annotate(n=Count('members')).order_by('-n').first()
+        return {
+            'dashboard': reverse('dashboard'),
+            'task_list': reverse('task_list'),
+            'task_detail': reverse('task_detail', args=[task.pk]),
+            'project_list': reverse('project_list'),
+            'project_detail': reverse('project_detail', args=[project.pk]),
+            'user_list': reverse('user_list'),
+            'user_detail': reverse('user_detail', args=[self.user.pk]),
+            'profile': reverse('profile'),
+        }
+
+    def test_views_stay_within_budget_as_data_grows(self):
+        """Test that every view stays within its budget with 10 and with 10,000 tasks"""
+        for total in (10, 10_000):
+            self.seed(total)
+            for name, url in self.urls().items():
+                self.client.get(url)  # warm up lazily computed counters
+                with self.subTest(view=name, tasks=total):
+                    self.assertQueryBudget(self.BUDGETS[name], url)
+
+class FragmentCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.project = Project.objects.create(name='Project', description='Description', manager=self.user)
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_repeat_views_skip_the_database(self):
+        """Test that a second visit is served from the cache"""
+        urls = [reverse('dashboard'), reverse('user_detail', args=[self.user.pk]),
+                reverse('project_detail', args=[self.project.pk])]
+        for url in urls:
+            self.client.get(url)
+            # The session and user come from the cache too
+            with self.assertNumQueries(0):
+                self.client.get(url)
+
+    def test_changes_invalidate_cached_pages(self):
+        """Test that saving a task or project shows up on the next request"""
+        url = reverse('project_detail', args=[self.project.pk])
+        self.assertNotContains(self.client.get(url), 'Write the report')
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(title='Write the report', description='Description', assigned_to=self.user,
+                                created_by=self.user, project=self.project)
+        self.assertContains(self.client.get(url), 'Write the report')
+
+        member = User.objects.create_user(username='newmember', password='testpass123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.members.add(member)
+        self.assertContains(self.client.get(url), 'newmember')
+        self.assertContains(self.client.get(reverse('user_detail', args=[member.pk])), 'Project')
+
+class TransferTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.member = User.objects.create_user(username='member', password='testpass123')
+        self.project = Project.objects.create(name='Project', description='Description', manager=self.user)
+        self.project.members.add(self.member)
+        for i in range(3):
+            Task.objects.create(title=f'Task {i}', description='Description', status='in_progress',
+                                assigned_to=self.member, created_by=self.user, project=self.project,
+                                due_date=timezone.now())
+
+    def round_trip(self, kind, fmt):
+        lines = list(transfer.export_lines(kind, fmt, chunk_size=2))
+        if kind == 'tasks':
+            Task.objects.all().delete()
+            return transfer.import_tasks(transfer.read_rows(lines, fmt), batch_size=2)
+        Project.objects.all().delete()
+        return transfer.import_projects(transfer.read_rows(lines, fmt), batch_size=2)
+
+    def test_tasks_round_trip(self):
+        """Test that exported tasks import back with their users and project, adjusting only their counters"""
+        counters.get_counts([counters.USERS])
+        users_counter = StatCounter.objects.get(key=counters.USERS).pk
+        counters.get_counts(counters.task_keys('in_progress', self.member.pk, self.project.pk))
+        for fmt in transfer.FORMATS:
+            with self.subTest(format=fmt):
+                result = self.round_trip('tasks', fmt)
+                self.assertTrue(StatCounter.objects.filter(pk=users_counter).exists())
+                keys = counters.task_keys('in_progress', self.member.pk, self.project.pk)
+                self.assertEqual(counters.get_counts(keys), {key: counters.compute(key) for key in keys})
+                self.assertEqual((result.created, result.skipped), (3, 0))
+                task = Task.objects.get(title='Task 0')
+                self.assertEqual(task.assigned_to, self.member)
+                self.assertEqual(task.project, self.project)
+                self.assertIsNotNone(task.due_date)
+                self.assertEqual(counters.get_counts([counters.user_tasks_key(self.member.pk)]),
+                                 {counters.user_tasks_key(self.member.pk): 3})
+
+    def test_projects_round_trip(self):
+        """Test that exported projects import back with their manager and members"""
+        for fmt in transfer.FORMATS:
+            with self.subTest(format=fmt):
+                result = self.round_trip('projects', fmt)
+                self.assertEqual(counters.get_counts([counters.PROJECTS]), {counters.PROJECTS: 1})
+                self.assertEqual(result.created, 1)
+                project = Project.objects.get(name='Project')
+                self.assertEqual(project.manager, self.user)
+                self.assertEqual(list(project.members.all()), [self.member])
+
+    def test_invalid_rows_are_skipped(self):
+        """Test that rows failing the form rules or naming unknown users are reported"""
+        rows = [
+            (2, {'title': '', 'description': 'x', 'priority': 'low', 'status': 'pending', 'assigned_to': 'member'}),
+            (3, {'title': 'A', 'description': 'x', 'priority': 'urgent', 'status': 'pending', 'assigned_to': 'member'}),
+            (4, {'title': 'B', 'description': 'x', 'priority': 'low', 'status': 'pending', 'assigned_to': 'nobody'}),
+            (5, {'title': 'C', 'description': 'x', 'priority': 'low', 'status': 'pending', 'assigned_to': 'member'}),
+        ]
+        result = transfer.import_tasks(rows, default_creator=self.user)
+        self.assertEqual((result.created, result.skipped), (1, 3))
+        self.assertTrue(result.errors[2].startswith('line 4:'))
+
+    def test_malformed_lines_are_skipped(self):
+        """Test that JSONL lines that are not JSON objects are reported and the rest still import"""
+        row = {'title': 'A', 'description': 'x', 'priority': 'low', 'status': 'pending', 'assigned_to': 'member'}
+        lines = [json.dumps(row), '{"title": "B",\n', '[1, 2]\n', json.dumps({**row, 'title': 'C'})]
+        result = transfer.import_tasks(transfer.read_rows(lines, 'jsonl'), default_creator=self.user)
+        self.assertEqual((result.created, result.skipped), (2, 2))
+        self.assertEqual([error.split(':')[0] for error in result.errors], ['line 2', 'line 3'])
+
+        result = transfer.import_projects(transfer.read_rows(['not json\n'], 'jsonl'))
+        self.assertEqual((result.created, result.skipped), (0, 1))
+
+    def test_export_view_streams(self):
+        """Test that the export view streams a CSV file"""
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('export_data', args=['tasks']), {'format': 'csv'})
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(content.splitlines()[0], ','.join(transfer.TASK_COLUMNS))
+        self.assertIn('Task 2', content)
+
+class SampleDataTestCase(TestCase):
+    def test_generates_consistent_data(self):
+        """Test that the generator writes users with profiles, staffed projects and spread-out tasks"""
+        totals = generate(users=30, projects=5, tasks=300, seed=1)
+        self.assertEqual(totals, {'users': 30, 'projects': 5, 'tasks': 300})
+        self.assertEqual(UserProfile.objects.count(), 30)
+        for project in Project.objects.all():
+            self.assertIn(project.manager, project.members.all())
+        self.assertGreater(Task.objects.filter(created_at__lt=timezone.now() - timedelta(days=30)).count(), 0)
+        self.assertEqual(counters.get_counts([counters.TASKS]), {counters.TASKS: 300})
+
+        # Stored timestamps round-trip through the ORM like any other row
+        task = Task.objects.order_by('?').first()
+        self.assertTrue(Task.objects.filter(pk=task.pk, created_at=task.created_at).exists())
+
+    def test_same_seed_same_data(self):
+        """Test that a seed always produces the same rows"""
+        generate(users=10, projects=2, tasks=50, seed=7, prefix='a')
+        generate(users=10, projects=2, tasks=50, seed=7, prefix='b')
+        first = list(Task.objects.filter(created_by__username__startswith='a')
+                     .order_by('pk').values_list('title', 'status', 'priority'))
+        second = list(Task.objects.filter(created_by__username__startswith='b')
+                      .order_by('pk').values_list('title', 'status', 'priority'))
+        self.assertEqual(first, second)
+
+@override_settings(PERF_FLUSH_INTERVAL=0, PERF_SLOW_QUERY_MS=0)
+class PerformanceMiddlewareTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        perf.aggregator.reset()
+        self.user = User.objects.create_user(username='testuser', password='testpass123', is_staff=True)
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_server_timing_header(self):
+        """Test that responses report app, db and template time"""
+        response = self.client.get(reverse('task_list'))
+        self.assertRegex(response['Server-Timing'], r'app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+')
+
+    @override_settings(ROOT_URLCONF=urlconf(async_views))
+    async def test_queries_counted_under_asgi(self):
+        """Test that queries run in sync_to_async threads under ASGI are counted, for async and sync views"""
+        await sync_to_async(self.async_client.force_login)(self.user)
+        for url in (reverse('task_list'), reverse('user_list')):
+            with self.subTest(url=url):
+                response = await self.async_client.get(url)
+                queries = int(re.search(r'desc="(\d+) queries"', response['Server-Timing']).group(1))
+                self.assertGreater(queries, 0)
+
+    def test_report_per_url_name(self):
+        """Test that requests are aggregated per URL name with their slowest queries"""
+        for _ in range(3):
+            self.client.get(reverse('task_list'))
+        rows = {row['name']: row for row in perf.report()}
+        self.assertEqual(rows['task_list']['requests'], 3)
+        self.assertGreaterEqual(rows['task_list']['queries']['p50'], 1)
+        self.assertGreater(rows['task_list']['size']['p50'], 0)
+        self.assertTrue(rows['task_list']['slow_queries'])
+
+        response = self.client.get(reverse('perf_report'))
+        self.assertIn('task_list', [row['name'] for row in response.json()['views']])
+
+    def test_command_warns_without_shared_cache(self):
+        """Test that perf_report warns when the cache cannot hold other processes' metrics"""
+        stderr = StringIO()
+        call_command('perf_report', stdout=StringIO(), stderr=stderr)
+        self.assertIn('CACHE_BACKEND', stderr.getvalue())
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                                                   'LOCATION': directory.name}}):
+            stderr = StringIO()
+            call_command('perf_report', stdout=StringIO(), stderr=stderr)
+        self.assertEqual(stderr.getvalue(), '')
+
+    def test_report_is_staff_only(self):
+        """Test that non-staff users cannot see the report"""
+        User.objects.create_user(username='regular', password='testpass123')
+        self.client.login(username='regular', password='testpass123')
+        response = self.client.get(reverse('perf_report'))
+        self.assertEqual(response.status_code, 302)
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class BenchmarkTestCase(TestCase):
+    def setUp(self):
+        generate(users=20, projects=3, tasks=40)
+        self.user = User.objects.get(username='user0')
+        self.user.is_staff = True
+        self.user.save()
+
+    def test_every_route_is_benchmarked(self):
+        """Test that the benchmark cases cover every URL in main_app/urls.py"""
+        self.assertEqual(benchmarks.uncovered_routes(benchmarks.cases(self.user)), [])
+
+    def test_run_views(self):
+        """Test that every case is measured and answers without errors"""
+        results = benchmarks.run_views(self.user, repeat=1)
+        for name, result in results.items():
+            with self.subTest(case=name):
+                self.assertIn(result['status'], (200, 302))
+                self.assertLessEqual(result['p50'], result['p99'])
+
+    def test_compare_flags_regressions(self):
+        """Test that slower p95s and extra queries are reported against a baseline"""
+        baseline = {'1000': {'task_list': {'p95': 10.0, 'queries': 4}}}
+        self.assertEqual(benchmarks.compare(baseline, {'1000': {'task_list': {'p95': 12.0, 'queries': 4}}}), [])
+        regressions = benchmarks.compare(baseline, {'1000': {'task_list': {'p95': 20.0, 'queries': 5}}})
+        self.assertEqual(len(regressions), 2)
+
+    def test_run_renders(self):
+        """Test that both rendering profiles measure the HTML pages"""
+        for profile, overrides in benchmarks.RENDER_PROFILES.items():
+            with self.subTest(profile=profile), override_settings(**overrides):
+                results = benchmarks.run_renders(self.user, repeat=1)
+                self.assertIn('task_create', results)
+                self.assertNotIn('user_autocomplete', results)
+                self.assertGreater(results['task_list']['p50'], 0)
+
+class AsyncViewsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.project = Project.objects.create(name='Async Project', description='Description', manager=self.user)
+        self.project.members.add(self.user)
+        self.task = Task.objects.create(title='Async Task', description='Description', assigned_to=self.user,
+                                        created_by=self.user, project=self.project)
+        self.urls = [reverse('dashboard'), reverse('task_list') + '?status=pending', reverse('project_list'),
+                     reverse('user_detail', args=[self.user.pk]), reverse('project_detail', args=[self.project.pk])]
+
+    def test_same_pages_as_sync_views(self):
+        """Test that the async views render the same content as the sync ones"""
+        self.client.login(username='testuser', password='testpass123')
+        for url in self.urls:
+            with self.subTest(url=url):
+                with override_settings(ROOT_URLCONF=urlconf(views)):
+                    cache.clear()
+                    sync_response = self.client.get(url)
+                with override_settings(ROOT_URLCONF=urlconf(async_views)):
+                    cache.clear()
+                    async_response = self.client.get(url)
+                self.assertEqual(async_response.status_code, 200)
+                for text in ('Async Task', 'Async Project'):
+                    self.assertEqual(text in sync_response.content.decode(), text in async_response.content.decode())
+
+    @override_settings(ROOT_URLCONF=urlconf(async_views))
+    async def test_asgi_requests(self):
+        """Test that the async views serve ASGI requests and redirect anonymous users"""
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 302)
+        await sync_to_async(self.async_client.force_login)(self.user)
+        for url in self.urls:
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.resolver_match.func.__module__, async_views.__name__)
+        response = await self.async_client.get(reverse('project_detail', args=[self.project.pk + 100]))
+        self.assertEqual(response.status_code, 404)
+
+class ApiTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.project = Project.objects.create(name='API Project', description='Description', manager=self.user)
+        self.tasks = [
+            Task.objects.create(title=f'API Task {i}', description='Description', assigned_to=self.user,
+                                created_by=self.user, project=self.project)
+            for i in range(3)
+        ]
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_sparse_fields_and_pagination(self):
+        """Test that ?fields limits the output and the loaded columns, and cursors walk every page"""
+        url = reverse('api_list', args=['tasks'])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'id,title', 'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['results'], [{'id': task.pk, 'title': task.title} for task in self.tasks[:0:-1]])
+        self.assertFalse(any('"description"' in query['sql'] for query in queries.captured_queries))
+        self.assertIsNone(data['previous'])
+        data = self.client.get(data['next']).json()
+        self.assertEqual([row['id'] for row in data['results']], [self.tasks[0].pk])
+        self.assertIsNone(data['next'])
+
+        self.assertEqual(self.client.get(url, {'fields': 'id,password'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'limit': 0}).status_code, 400)
+        user = self.client.get(reverse('api_detail', args=['users', self.user.pk]), {'fields': 'username,phone'})
+        self.assertEqual(user.json(), {'username': 'testuser', 'phone': ''})
+        project = self.client.get(reverse('api_detail', args=['projects', self.project.pk])).json()
+        self.assertEqual(project['members'], [])
+
+    def test_conditional_get(self):
+        """Test that an unchanged resource answers 304 without being loaded, and a change gives a new ETag"""
+        for url in (reverse('api_detail', args=['tasks', self.tasks[0].pk]), reverse('api_list', args=['tasks'])):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                etag = response['ETag']
+                self.assertIn('Last-Modified', response)
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertFalse(any('"description"' in query['sql'] for query in queries.captured_queries))
+
+                Task.objects.filter(pk=self.tasks[0].pk).update(updated_at=timezone.now() + timedelta(seconds=1))
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+        url = reverse('api_detail', args=['projects', self.project.pk])
+        etag = self.client.get(url)['ETag']
+        self.project.members.add(self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()['members'], [self.user.pk])
+
+        # Users have no timestamp of their own, so their fields are in the ETag
+        url = reverse('api_detail', args=['users', self.user.pk])
+        response = self.client.get(url)
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        User.objects.filter(pk=self.user.pk).update(first_name='Renamed')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.json()['first_name'], 'Renamed')
+
+    def test_writes_use_forms(self):
+        """Test that tasks can be created, patched and deleted with JSON, validated by TaskForm"""
+        url = reverse('api_list', args=['tasks'])
+        response = self.client.post(url, {'title': 'New', 'description': 'Body', 'priority': 'high',
+                                           'status': 'pending', 'assigned_to': self.user.pk},
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        task = Task.objects.get(pk=response.json()['id'])
+        self.assertEqual(task.created_by, self.user)
+
+        detail = reverse('api_detail', args=['tasks', task.pk])
+        response = self.client.patch(detail, {'status': 'completed'}, content_type='application/json')
+        self.assertEqual(response.json()['status'], 'completed')
+        self.assertEqual(response.json()['title'], 'New')
+        response = self.client.patch(detail, {'priority': 'urgent'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('priority', response.json()['errors'])
+        self.assertEqual(self.client.delete(detail).status_code, 204)
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+
+        response = self.client.post(reverse('api_list', args=['users']), {}, content_type='application/json')
+        self.assertEqual(response.status_code, 405)
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+class BulkTaskTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='otheruser', password='testpass123')
+        self.project = Project.objects.create(name='Bulk Project', description='Description', manager=self.user)
+        self.tasks = [
+            Task.objects.create(title=f'Task {i}', description='Description', assigned_to=self.user,
+                                created_by=self.user, status=status, project=self.project if i else None)
+            for i, status in enumerate(['pending', 'in_progress', 'completed', 'pending'])
+        ]
+        counters.rebuild()
+        self.keys = [key for key in StatCounter.objects.values_list('key', flat=True)] + [
+            counters.user_tasks_key(self.other.pk), counters.project_task_status_key(self.project.pk, 'completed'),
+        ]
+        self.client.login(username='testuser', password='testpass123')
+
+    def task_writes(self, queries):
+        return [query['sql'] for query in queries.captured_queries
+                if query['sql'].startswith(('UPDATE "main_app_task"', 'DELETE FROM "main_app_task"'))]
+
+    def test_bulk_update(self):
+        """Test that a bulk update is one UPDATE and keeps the counters right"""
+        ids = [task.pk for task in self.tasks[:3]]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('task_bulk'), {
+                'action': 'update', 'task_ids': ids, 'status': 'completed', 'assigned_to': 'otheruser',
+                'next': reverse('task_list') + '?status=pending',
+            })
+        self.assertEqual(len(self.task_writes(queries)), 1)
+        self.assertRedirects(response, reverse('task_list') + '?status=pending')
+        self.assertEqual(Task.objects.filter(status='completed', assigned_to=self.other).count(), 3)
+        self.assertEqual(counters.get_counts(self.keys), {key: counters.compute(key) for key in self.keys})
+
+    def test_bulk_delete(self):
+        """Test that a bulk delete is one DELETE and keeps the counters right"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('task_bulk'), {'action': 'delete', 'task_ids': [self.tasks[1].pk]},
+                                        content_type='application/json')
+        self.assertEqual(response.json(), {'action': 'delete', 'count': 1})
+        writes = self.task_writes(queries)
+        self.assertEqual(len(writes), 1)
+        # MySQL rejects a DELETE with a subquery on the same table
+        self.assertNotIn('SELECT', writes[0])
+        self.assertFalse(Task.objects.filter(pk=self.tasks[1].pk).exists())
+        self.assertEqual(counters.get_counts(self.keys), {key: counters.compute(key) for key in self.keys})
+
+    def test_invalid_bulk_action(self):
+        """Test that an update without changes or with bad ids is rejected"""
+        response = self.client.post(reverse('task_bulk'), {'action': 'update', 'task_ids': [self.tasks[0].pk]},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(reverse('task_bulk'), {'action': 'update', 'task_ids': 'x', 'status': 'completed'})
+        self.assertRedirects(response, reverse('task_list'), fetch_redirect_response=False)
+        self.assertEqual(Task.objects.filter(status='completed').count(), 1)
+        self.assertEqual(self.client.get(reverse('task_bulk')).status_code, 405)
+
+class WorkloadTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='otheruser', password='testpass123')
+        self.past = timezone.now() - timedelta(days=1)
+
+    def make_task(self, **kwargs):
+        kwargs.setdefault('assigned_to', self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(title='Task', description='Description', created_by=self.user, **kwargs)
+        jobs.run_pending()
+        return task
+
+    def assert_matches_rebuild(self):
+        kept = sorted(UserWorkload.objects.filter(tasks__gt=0).values_list(
+            'user_id', 'status', 'priority', 'tasks', 'overdue'))
+        workload.rebuild()
+        self.assertEqual(kept, sorted(UserWorkload.objects.values_list(
+            'user_id', 'status', 'priority', 'tasks', 'overdue')))
+
+    def test_signals_keep_summary_current(self):
+        """Test that saves, deletes and bulk changes keep the summary equal to a rebuild"""
+        overdue = self.make_task(priority='high', due_date=self.past)
+        task = self.make_task(due_date=timezone.now() + timedelta(days=3))
+        self.make_task(assigned_to=self.other, status='completed', due_date=self.past)
+        self.assert_matches_rebuild()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            overdue.status = 'completed'
+            overdue.save()
+            task.assigned_to = self.other
+            task.priority = 'low'
+            task.save()
+            Task.objects.only('title').get(pk=overdue.pk).delete()
+        self.assertEqual(jobs.run_pending(), (3, 0))
+        self.assert_matches_rebuild()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk.update_tasks([task.pk], status='in_progress', assigned_to=self.user.pk)
+        jobs.run_pending()
+        self.assert_matches_rebuild()
+
+    def test_tasks_becoming_overdue(self):
+        """Test that tasks whose due date passes are counted as overdue by refresh_overdue, not by the report"""
+        task = self.make_task(due_date=timezone.now() + timedelta(days=3))
+        self.assertEqual(workload.report()[0]['overdue'], 0)
+        Task.objects.filter(pk=task.pk).update(due_date=self.past)
+        UserWorkload.objects.update(next_due_date=self.past)
+        self.client.login(username='testuser', password='testpass123')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('workload_report'))
+        self.assertFalse([query['sql'] for query in queries if 'main_app_userworkload' in query['sql']
+                          and query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))])
+        self.assertEqual(workload.report()[0]['overdue'], 0)
+        call_command('refresh_overdue', stdout=StringIO())
+        self.assertEqual(workload.report()[0]['overdue'], 1)
+
+    def test_report_page(self):
+        """Test that the report shows per-user totals in a constant number of queries"""
+        self.make_task(priority='high', due_date=self.past)
+        self.make_task(status='completed')
+        self.client.login(username='testuser', password='testpass123')
+        self.client.get(reverse('workload_report'))
+        # Warm: the session and user come from the cache
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('workload_report'))
+        row = response.context['page_obj'][0]
+        self.assertEqual((row['user__username'], row['total'], row['high'], row['completed'], row['overdue']),
+                         ('testuser', 2, 1, 1, 1))
+        for _ in range(5):
+            self.make_task(due_date=self.past)
+        with self.assertNumQueries(2):
+            self.client.get(reverse('workload_report'))
+
+class ThumbnailTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.login(username='testuser', password='testpass123')
+
+    def make_picture(self, size=(1200, 800)):
+        image = Image.new('RGB', size, 'red')
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotated 90 degrees
+        exif[0x010F] = 'Camera Maker'
+        buffer = BytesIO()
+        image.save(buffer, 'JPEG', exif=exif)
+        return SimpleUploadedFile('avatar.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def test_upload_generates_thumbnails(self):
+        """Test that uploading a picture stores square, metadata-free, content-hashed thumbnails and invalidates pages after commit"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('profile'), {'phone': '', 'address': '', 'profile_picture': self.make_picture()})
+        version = caching.versions(f'user:{self.user.pk}')
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(jobs.run_pending(), (1, 0))
+        # Pages are invalidated only once the job's transaction commits
+        self.assertEqual(caching.versions(f'user:{self.user.pk}'), version)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(caching.versions(f'user:{self.user.pk}'), version)
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEqual(set(profile.thumbnails), set(thumbnails.SIZES))
+        for size, names in profile.thumbnails.items():
+            for fmt, name in names.items():
+                with default_storage.open(name) as stored:
+                    content = stored.read()
+                self.assertIn(hashlib.sha256(content).hexdigest()[:20], name)
+                with Image.open(BytesIO(content)) as image:
+                    self.assertEqual(image.size, (thumbnails.SIZES[size],) * 2)
+                    self.assertEqual(image.format, thumbnails.FORMATS[fmt][0])
+                    self.assertFalse(image.getexif())
+
+        response = self.client.get(reverse('user_list'))
+        self.assertContains(response, profile.small_thumbnail['webp'])
+        self.assertNotContains(response, profile.profile_picture.url)
+
+    def test_backfill(self):
+        """Test that the backfill renders pictures saved without thumbnails and skips finished ones"""
+        profile = UserProfile.objects.create(user=self.user)
+        profile.profile_picture.save('old.jpg', self.make_picture(), save=False)
+        UserProfile.objects.filter(pk=profile.pk).update(profile_picture=profile.profile_picture.name)
+        self.assertEqual(thumbnails.backfill(workers=0), (1, 0))
+        self.assertTrue(UserProfile.objects.get(pk=profile.pk).large_thumbnail)
+        self.assertEqual(thumbnails.backfill(workers=0), (0, 0))
+
+@jobs.job
+def record_job(key):
+    StatCounter.objects.create(key=key, value=1)
+
+@jobs.job
+def failing_job():
+    raise ValueError('Job failed on purpose')
+
+@override_settings(JOB_MAX_ATTEMPTS=2, JOB_RETRY_DELAY=10)
+class JobTestCase(TestCase):
+    def test_enqueue_on_commit(self):
+        """Test that jobs are queued only when the transaction commits and run exactly once"""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    jobs.enqueue(record_job, 'rolled-back')
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(len(callbacks), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            jobs.enqueue(record_job, 'committed')
+            jobs.enqueue(record_job, 'committed', unique=True)
+        self.assertEqual(Job.objects.get().args, ['committed'])
+        self.assertEqual(jobs.run_pending(), (1, 0))
+        self.assertEqual(jobs.run_pending(), (0, 0))
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(StatCounter.objects.get(key='committed').value, 1)
+
+    def test_retries_with_backoff(self):
+        """Test that a failing job is retried later, then kept as failed with its error"""
+        with self.captureOnCommitCallbacks(execute=True):
+            jobs.enqueue(failing_job)
+        with self.assertLogs('main_app.jobs', 'ERROR'):
+            self.assertEqual(jobs.run_pending(), (0, 1))
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertGreaterEqual(job.run_at, timezone.now() + timedelta(seconds=9))
+        self.assertIn('Job failed on purpose', job.last_error)
+        self.assertEqual(jobs.run_pending(), (0, 0))
+
+        Job.objects.update(run_at=timezone.now())
+        with self.assertLogs('main_app.jobs', 'ERROR'):
+            self.assertEqual(jobs.run_pending(), (0, 1))
+        self.assertEqual(Job.objects.get().status, Job.FAILED)
+
+    def test_claim_and_stale_jobs(self):
+        """Test that a claimed job is not given to another worker until its worker is presumed dead"""
+        with self.captureOnCommitCallbacks(execute=True):
+            jobs.enqueue(record_job, 'claimed')
+        self.assertEqual(len(jobs.claim('first')), 1)
+        self.assertEqual(jobs.claim('second'), [])
+        self.assertEqual(jobs.requeue_stale(), 0)
+
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.requeue_stale(), 1)
+        claimed = jobs.claim('second')
+        self.assertEqual((claimed[0].locked_by, claimed[0].attempts), ('second', 2))
+        self.assertTrue(jobs.run(claimed[0]))
+        self.assertTrue(StatCounter.objects.filter(key='claimed').exists())
+
+class UserPickerTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.alice = User.objects.create_user(username='alice', first_name='Alice', last_name='Reyes')
+        self.bob = User.objects.create_user(username='bob_s', first_name='Roberto', last_name='Alcantara')
+        User.objects.bulk_create([User(username=f'user{i}') for i in range(30)])
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_autocomplete(self):
+        """Test that users are matched by a case-insensitive prefix of their username or name"""
+        url = reverse('user_autocomplete')
+        results = self.client.get(url, {'q': 'AL'}).json()['results']
+        self.assertEqual([user['username'] for user in results], ['alice', 'bob_s'])
+        self.assertEqual(results[0]['label'], 'Alice Reyes (alice)')
+        self.assertEqual(len(self.client.get(url, {'q': 'user', 'limit': 5}).json()['results']), 5)
+        self.assertEqual(self.client.get(url, {'q': 'bob_'}).json()['results'][0]['username'], 'bob_s')
+        self.assertEqual(self.client.get(url, {'q': 'b_'}).json()['results'], [])
+        self.assertEqual(self.client.get(url).json()['results'], [])
+
+    def test_forms_render_only_selected_users(self):
+        """Test that the create and update pages render the chosen users, not every user"""
+        response = self.client.get(reverse('project_create'))
+        self.assertNotContains(response, 'user29')
+        self.assertContains(response, f'data-autocomplete-url="{reverse("user_autocomplete")}"')
+
+        project = Project.objects.create(name='Project', description='Description', manager=self.user)
+        project.members.add(self.alice)
+        response = self.client.get(reverse('project_update', args=[project.pk]))
+        self.assertContains(response, 'Alice Reyes (alice)')
+        self.assertNotContains(response, 'Roberto')
+        self.assertNotContains(response, 'user29')
+
+    def test_submitted_ids_are_validated(self):
+        """Test that member ids are checked in one query and unknown ids are rejected"""
+        data = {'name': 'Project', 'description': 'Description', 'is_active': 'on'}
+        response = self.client.post(reverse('project_create'), dict(data, members=[self.alice.pk, 999999]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Project.objects.exists())
+
+        form = forms.ProjectForm(dict(data, members=[self.alice.pk, self.bob.pk]))
+        with self.assertNumQueries(1):
+            self.assertTrue(form.is_valid())
+        self.assertEqual({user.pk for user in form.cleaned_data['members']}, {self.alice.pk, self.bob.pk})
+
+        task_data = {'title': 'Task', 'description': 'Description', 'priority': 'low', 'status': 'pending'}
+        response = self.client.post(reverse('task_create'), dict(task_data, assigned_to=self.bob.pk))
+        self.assertRedirects(response, reverse('task_list'))
+        self.assertEqual(Task.objects.get().assigned_to, self.bob)
+
+    def test_task_form_renders_only_selected_project(self):
+        """Test that the task form renders the chosen project, not every project, and checks the submitted id"""
+        projects = Project.objects.bulk_create([
+            Project(name=f'Project {i}', description='Description', manager=self.user) for i in range(30)
+        ])
+        response = self.client.get(reverse('task_create'), {'project': projects[3].pk})
+        self.assertContains(response, 'Project 3')
+        self.assertNotContains(response, 'Project 29')
+        self.assertContains(response, 'data-autocomplete-param="search"')
+
+        field = forms.TaskForm().fields['project']
+        with self.assertNumQueries(1):
+            self.assertEqual(field.clean(str(projects[5].pk)), projects[5])
+        task_data = {'title': 'Task', 'description': 'Description', 'priority': 'low', 'status': 'pending',
+                     'assigned_to': self.bob.pk}
+        self.assertTrue(forms.TaskForm(dict(task_data, project=projects[5].pk)).is_valid())
+        self.assertFalse(forms.TaskForm(dict(task_data, project=999999)).is_valid())
+
+class SessionAuthTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def warm_request_queries(self, url):
+        """Queries of a repeat request by a freshly logged-in client under the current settings."""
+        client = Client()
+        client.login(username='testuser', password='testpass123')
+        client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        return len(queries)
+
+    def test_profiles_skip_session_and_user_queries(self):
+        """Test that the cached and cookie profiles serve the session and user without queries"""
+        url = reverse('task_list')
+        with override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db',
+                               AUTHENTICATION_BACKENDS=['django.contrib.auth.backends.ModelBackend']):
+            db = self.warm_request_queries(url)
+        cached = self.warm_request_queries(url)
+        with override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies'):
+            cookie = self.warm_request_queries(url)
+        self.assertEqual((db - cached, cookie), (2, cached))
+
+    def test_user_changes_reach_the_next_request(self):
+        """Test that saving a user replaces their cached copy"""
+        self.client.login(username='testuser', password='testpass123')
+        self.client.get(reverse('dashboard'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = 'Nik'
+            self.user.save()
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.wsgi_request.user.first_name, 'Nik')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertRedirects(self.client.get(reverse('dashboard')), f"{reverse('login')}?next={reverse('dashboard')}")
+
+    def test_fast_hasher(self):
+        """Test that the suite hashes passwords with the fast hasher and still accepts the default one"""
+        self.assertTrue(self.user.password.startswith('md5$'))
+        self.user.password = make_password('testpass123', hasher='pbkdf2_sha256')
+        self.assertTrue(self.user.check_password('testpass123'))
+
+class LiveSearchTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        Task.objects.bulk_create([
+            Task(title=f'Deploy service {i}', description='Release', assigned_to=self.user, created_by=self.user,
+                 priority='high' if i % 2 else 'low')
+            for i in range(15)
+        ] + [Task(title='Fix login', description='Auth bug', assigned_to=self.user, created_by=self.user)])
+        Project.objects.create(name='Website', description='Public site', manager=self.user)
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_rows(self):
+        """Test that only the top matching rows are returned, as HTML or JSON"""
+        url = reverse('live_search', args=['tasks'])
+        response = self.client.get(url, {'search': 'deplo'})
+        self.assertEqual(response.content.decode().count('<tr>'), views.LIVE_SEARCH_LIMIT)
+        self.assertNotContains(response, '<html')
+        self.assertNotContains(response, 'Fix login')
+
+        results = self.client.get(url, {'search': 'fix', 'format': 'json'}).json()['results']
+        task = Task.objects.get(title='Fix login')
+        self.assertEqual(results, [{'id': task.pk, 'label': 'Fix login', 'url': reverse('task_detail', args=[task.pk])}])
+
+        response = self.client.get(url, {'search': 'deploy', 'priority': 'low'})
+        self.assertEqual(response.content.decode().count('<tr>'), 8)
+        self.assertContains(self.client.get(url, {'search': 'nothing'}), 'No tasks match your search.')
+        self.assertContains(self.client.get(reverse('live_search', args=['projects']), {'search': 'web'}), 'Website')
+        self.assertContains(self.client.get(reverse('live_search', args=['users']), {'search': 'test'}), 'testuser')
+        self.assertEqual(self.client.get(reverse('live_search', args=['jobs']), {'search': 'x'}).status_code, 404)
+
+    def test_cached_per_normalized_query(self):
+        """Test that repeated keystrokes are served from the cache until the tasks change"""
+        url = reverse('live_search', args=['tasks'])
+        self.client.get(url, {'search': 'Fix  Login'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'search': 'fix login'})
+        self.assertEqual(len(queries), 0)
+        self.assertContains(response, 'Fix login')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.filter(title='Fix login').first().delete()
+        self.assertNotContains(self.client.get(url, {'search': 'fix login'}), 'Fix login')
+
+class FormRenderingTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_fast_forms(self):
+        """Test that the task and project forms render Bootstrap markup without crispy"""
+        for url in (reverse('task_create'), reverse('project_create')):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTemplateUsed(response, 'forms/bootstrap.html')
+                self.assertTemplateNotUsed(response, 'bootstrap5/field.html')
+                self.assertContains(response, 'class="form-label requiredField"')
+                self.assertContains(response, 'class="form-select"')
+
+        response = self.client.post(reverse('task_create'), {'title': ''})
+        self.assertContains(response, 'invalid-feedback')
+        self.assertContains(response, 'This field is required.')
+
+    def test_crispy_forms(self):
+        """Test that FORM_RENDERING='crispy' renders the forms through crispy_forms"""
+        with override_settings(FORM_RENDERING='crispy'):
+            response = self.client.get(reverse('task_create'))
+        self.assertTemplateUsed(response, 'bootstrap5/field.html')
+        self.assertTemplateNotUsed(response, 'forms/bootstrap.html')
+
+class SQLiteTuningTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings_dict = {**connection.settings_dict, **settings.SQLITE_DATABASE,
+                         'NAME': f'{self.directory.name}/tuned.sqlite3'}
+        self.tuned = sqlite_backend.DatabaseWrapper(settings_dict, alias='tuned')
+        self.addCleanup(self.tuned.close)
+
+    def test_pragmas(self):
+        """Test that every new connection switches to WAL and applies the other PRAGMAs"""
+        with self.tuned.cursor() as cursor:
+            values = {name: cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                      for name in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size')}
+        self.assertEqual(values, {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000, 'cache_size': -64000})
+
+    def test_transactions_take_the_write_lock(self):
+        """Test that atomic blocks begin IMMEDIATE, so a second writer waits instead of failing mid-transaction"""
+        self.tuned.ensure_connection()
+        self.tuned._start_transaction_under_autocommit()
+        other = sqlite3.connect(self.tuned.settings_dict['NAME'], timeout=0)
+        self.addCleanup(other.close)
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'database is locked'):
+            other.execute('BEGIN IMMEDIATE')
+        self.tuned.connection.rollback()
+        other.execute('BEGIN IMMEDIATE')
+
+@override_settings(REPLICA_DATABASES=['replica1'])
+class ReplicaRoutingTestCase(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+
+    def routed_request(self, method, cookies=None):
+        """What the router sees during a request, and the response."""
+        seen = []
+
+        def get_response(request):
+            seen.append(self.router.db_for_read(Task))
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)('/tasks/')
+        request.COOKIES.update(cookies or {})
+        response = ReplicaMiddleware(get_response)(request)
+        return seen[0], response
+
+    def test_router(self):
+        """Test that only reads allowed by the middleware go to a replica, and never for sessions or jobs"""
+        self.assertEqual(self.router.db_for_read(Task), 'default')
+        token = routers.use_primary.set(False)
+        try:
+            self.assertEqual(self.router.db_for_read(Task), 'replica1')
+            self.assertEqual(self.router.db_for_read(Session), 'default')
+            self.assertEqual(self.router.db_for_read(Job), 'default')
+            self.assertEqual(self.router.db_for_write(Task), 'default')
+        finally:
+            routers.use_primary.reset(token)
+        self.assertFalse(self.router.allow_migrate('replica1', 'main_app'))
+        self.assertIsNone(self.router.allow_migrate('default', 'main_app'))
+
+    def test_read_your_writes(self):
+        """Test that GETs read from a replica until the browser writes, then stick to the primary"""
+        self.assertEqual(self.routed_request('get')[0], 'replica1')
+        database, response = self.routed_request('post')
+        self.assertEqual(database, 'default')
+        cookie = response.cookies[ReplicaMiddleware.COOKIE]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_STICKY_SECONDS)
+        self.assertEqual(self.routed_request('get', {ReplicaMiddleware.COOKIE: cookie.value})[0], 'default')
+        with override_settings(REPLICA_DATABASES=[]):
+            self.assertEqual(self.routed_request('get')[0], 'default')
+
+    def test_cached_reads_use_the_primary(self):
+        """Test that reads which fill a cache go to the primary even when the request reads from replicas"""
+        cache.clear()
+        seen = []
+
+        def builder():
+            seen.append(self.router.db_for_read(Task))
+            return 'built'
+
+        async def abuilder():
+            return await sync_to_async(builder)()
+
+        def get_user(backend, user_id):
+            seen.append(self.router.db_for_read(User))
+
+        token = routers.use_primary.set(False)
+        try:
+            caching.cached_context('stale', 1, builder)
+            async_to_sync(caching.acached_context)('astale', 1, abuilder)
+            with patch.object(ModelBackend, 'get_user', get_user):
+                CachedModelBackend().get_user(1)
+            self.assertEqual(self.router.db_for_read(Task), 'replica1')
+        finally:
+            routers.use_primary.reset(token)
+        self.assertEqual(seen, ['default', 'default', 'default'])
+
+    def test_copy_sqlite(self):
+        """Test that sync_replicas' copy brings a replica file up to date with the primary"""
+        with tempfile.TemporaryDirectory() as directory:
+            primary = sqlite3.connect(f'{directory}/primary.sqlite3')
+            primary.execute('CREATE TABLE item (name TEXT)')
+            primary.execute("INSERT INTO item VALUES ('written')")
+            primary.commit()
+            primary.close()
+            routers.copy_sqlite(f'{directory}/primary.sqlite3', f'{directory}/replica.sqlite3')
+            replica = sqlite3.connect(f'{directory}/replica.sqlite3')
+            self.assertEqual(replica.execute('SELECT name FROM item').fetchall(), [('written',)])
+            replica.close()
+
+class ProjectListTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='another')
+        now = timezone.now()
+        self.projects = []
+        for i in range(12):
+            project = Project.objects.create(name=f'Project {i:02}', description='Description',
+                                             manager=self.other if i % 3 else self.user, is_active=i != 5,
+                                             deadline=now + timedelta(days=i) if i % 2 else None)
+            self.projects.append(project)
+        self.projects[0].members.add(self.user, self.other)
+        Task.objects.bulk_create([
+            Task(title='Open', description='D', assigned_to=self.user, created_by=self.user,
+                 project=self.projects[0], due_date=now + timedelta(days=3)),
+            Task(title='Open soon', description='D', assigned_to=self.user, created_by=self.user,
+                 project=self.projects[0], status='in_progress', due_date=now + timedelta(days=1)),
+            Task(title='Overdue', description='D', assigned_to=self.user, created_by=self.user,
+                 project=self.projects[0], due_date=now - timedelta(days=1)),
+            Task(title='Done', description='D', assigned_to=self.user, created_by=self.user,
+                 project=self.projects[0], status='completed', due_date=now),
+            Task(title='Other', description='D', assigned_to=self.user, created_by=self.user, project=self.projects[1]),
+        ])
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_counts_from_one_query(self):
+        """Test that manager, member count, open task count and next due date come from the page query"""
+        url = reverse('project_list') + '?sort=name'
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(queries), 1)
+        project = response.context['page_obj'][0]
+        self.assertEqual((project.name, project.manager.username), ('Project 00', 'testuser'))
+        self.assertEqual((project.member_count, project.open_task_count), (2, 3))
+        self.assertEqual(project.next_due_date, Task.objects.get(title='Open soon').due_date)
+        self.assertContains(response, '3 open tasks')
+
+    def test_every_sort_pages_through_all_projects(self):
+        """Test that each sort, either way, walks every project exactly once across cursor pages"""
+        for key in views.PROJECT_SORTS:
+            for sort in (key, f'-{key}'):
+                with self.subTest(sort=sort):
+                    seen, cursor = [], ''
+                    while True:
+                        page = self.client.get(reverse('project_list'), {'sort': sort, 'cursor': cursor}).context['page_obj']
+                        seen += [project.pk for project in page]
+                        cursor = page.next_cursor
+                        if not cursor:
+                            break
+                    self.assertEqual(sorted(seen), sorted(project.pk for project in self.projects))
+        first = lambda sort: self.client.get(reverse('project_list'), {'sort': sort}).context['page_obj'][0]
+        self.assertEqual(first('-open_tasks'), self.projects[0])
+        self.assertEqual(first('-members'), self.projects[0])
+        self.assertEqual(first('next_due'), self.projects[0])
+        self.assertEqual(first('deadline'), self.projects[1])
+
+    def test_tampered_cursor_on_annotated_sorts(self):
+        """Test that a cursor with values of the wrong type gives the first page for every sort"""
+        for key in views.PROJECT_SORTS:
+            for sort in (key, f'-{key}'):
+                first = list(self.client.get(reverse('project_list'), {'sort': sort}).context['page_obj'])
+                for values in (['abc', 1], [1, 'x'], [[1], 2], [{'dt': 'not a date'}, 1]):
+                    with self.subTest(sort=sort, values=values):
+                        response = self.client.get(reverse('project_list'),
+                                                   {'sort': sort, 'cursor': encode_cursor(values, 'n')})
+                        self.assertEqual(response.status_code, 200)
+                        if not isinstance(values[0], str) or key not in ('name', 'manager'):
+                            # A string is a valid position in the text sorts
+                            self.assertEqual(list(response.context['page_obj']), first)
+
+    def test_active_filter(self):
+        """Test that is_active filters the list through the is_active index"""
+        response = self.client.get(reverse('project_list'), {'is_active': '0'})
+        self.assertEqual([project.name for project in response.context['page_obj']], ['Project 05'])
+        self.assertEqual(len(self.client.get(reverse('project_list'), {'is_active': '1'}).context['page_obj']), 10)
+        plan = Project.objects.filter(Project.active_filter(True)).order_by('-created_at', '-id')[:11].explain()
+        self.assertIn('project_active_created_idx', plan)
@@ -0,0 +1,154 @@
+"""
+Thumbnails of profile pictures.
+
+Templates show avatars at 40-150px, so serving the uploaded original means
+megabytes per page. When a picture is uploaded, a background job renders
+it at each size in SIZES as WebP and JPEG. The copies are cropped square,
+rotated according to EXIF, and saved without any metadata. Their names
+carry a hash of their content, so the media server can let browsers cache
+them forever. Until the copies exist, templates fall back to the original.
+
+The ``generate_thumbnails`` command backfills pictures uploaded earlier.
+"""
+
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from . import caching, jobs
+from .models import UserProfile, Project
+
+logger = logging.getLogger(__name__)
+
+# Twice the largest size each is displayed at, for high-density screens
+SIZES = {
+    'small': 160,
+    'large': 300,
+}
+FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 6}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+DIRECTORY = 'profiles/thumbs'
+
+
+def _open(source):
+    image = Image.open(source)
+    # Let the JPEG decoder scale down while decoding instead of loading every pixel
+    largest = max(SIZES.values())
+    image.draft('RGB', (largest, largest))
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render(source):
+    """{size: {format: bytes}} of every thumbnail of an image file, without metadata."""
+    image = _open(source)
+    rendered = {}
+    for size, pixels in SIZES.items():
+        thumb = ImageOps.fit(image, (pixels, pixels), Image.LANCZOS)
+        rendered[size] = {}
+        for fmt, (pil_format, extension, options) in FORMATS.items():
+            buffer = BytesIO()
+            thumb.save(buffer, pil_format, **options)
+            rendered[size][fmt] = buffer.getvalue()
+    return rendered
+
+
+def _store(content, extension):
+    digest = hashlib.sha256(content).hexdigest()[:20]
+    name = f'{DIRECTORY}/{digest}.{extension}'
+    # Same content, same name: an existing file is already the right one
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(content))
+    return name
+
+
+@jobs.job
+def generate(profile_id):
+    """Render and store the thumbnails of a profile's current picture."""
+    profile = UserProfile.objects.only('user_id', 'profile_picture').filter(pk=profile_id).first()
+    if profile is None or not profile.profile_picture:
+        return False
+    picture = profile.profile_picture.name
+    try:
+        with profile.profile_picture.open('rb') as source:
+            rendered = render(source)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        logger.warning("Could not make thumbnails of %s", picture, exc_info=True)
+        return False
+
+    names = {
+        size: {fmt: _store(content, FORMATS[fmt][1]) for fmt, content in formats.items()}
+        for size, formats in rendered.items()
+    }
+    # Only if the picture was not replaced in the meantime
+    updated = UserProfile.objects.filter(pk=profile_id, profile_picture=picture).update(
+        thumbnails=names, updated_at=timezone.now(),
+    )
+    if updated:
+        bump_profile(profile.user_id)
+    return bool(updated)
+
+
+def bump_profile(user_id):
+    # update() skips the profile signals, so invalidate what they would, after
+    # the job's transaction commits
+    project_ids = (
+        Project.objects.filter(Q(manager_id=user_id) | Q(members=user_id))
+        .values_list('id', flat=True).distinct()
+    )
+    caching.bump_on_commit(f'user:{user_id}', *[f'project:{project_id}' for project_id in project_ids])
+
+
+def _generate_logged(profile_id):
+    try:
+        return generate(profile_id)
+    except Exception:
+        logger.exception("Thumbnail generation failed for profile %s", profile_id)
+        return False
+
+
+def _run(profile_id):
+    # Worker threads have their own connections, which nothing else closes
+    close_old_connections()
+    try:
+        return _generate_logged(profile_id)
+    finally:
+        close_old_connections()
+
+
+def backfill(workers=4, regenerate=False):
+    """
+    Generate missing (or, with ``regenerate``, all) thumbnails in ``workers``
+    threads, or in this one if 0. Returns (generated, failed).
+    """
+    profiles = UserProfile.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+    if not regenerate:
+        profiles = profiles.filter(thumbnails={})
+    profile_ids = profiles.order_by('pk').values_list('pk', flat=True)
+    if workers:
+        with ThreadPoolExecutor(workers, thread_name_prefix='thumbnails') as pool:
+            results = list(pool.map(_run, profile_ids.iterator()))
+    else:
+        results = [_generate_logged(profile_id) for profile_id in profile_ids]
+    generated = sum(results)
+    return generated, len(results) - generated
+
+
+def schedule(profile_id):
+    """Queue the generation of a profile's thumbnails once the current transaction commits."""
+    jobs.enqueue(generate, profile_id, unique=True)
@@ -0,0 +1,273 @@
+"""
+Streaming import and export of tasks and projects as CSV or JSONL.
+
+Exports read the database with ``.iterator(chunk_size=...)`` and yield one
+line at a time, so they can feed a StreamingHttpResponse or a file without
+holding the table in memory. Imports read rows lazily, validate them with the
+TaskForm/ProjectForm rules, resolve users and projects through maps loaded
+once, and write them with ``bulk_create`` in fixed-size batches.
+"""
+
+import csv
+import json
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Prefetch
+
+from . import caching, counters, workload
+from .forms import TaskForm, ProjectForm
+from .models import Task, Project
+
+FORMATS = ('csv', 'jsonl')
+CHUNK_SIZE = 2000
+MAX_ERRORS = 50
+
+TASK_COLUMNS = ['title', 'description', 'priority', 'status', 'assigned_to', 'created_by',
+                'project', 'due_date', 'created_at']
+PROJECT_COLUMNS = ['name', 'description', 'manager', 'members', 'deadline', 'is_active', 'created_at']
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.skipped = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(f"line {line}: {message}")
+
+
+# Export
+def task_rows(chunk_size=CHUNK_SIZE):
+    rows = (
+        Task.objects.order_by('pk')
+        .values('title', 'description', 'priority', 'status', 'assigned_to__username',
+                'created_by__username', 'project__name', 'due_date', 'created_at')
+        .iterator(chunk_size=chunk_size)
+    )
+    for row in rows:
+        row['assigned_to'] = row.pop('assigned_to__username')
+        row['created_by'] = row.pop('created_by__username')
+        row['project'] = row.pop('project__name')
+        yield row
+
+
+def project_rows(chunk_size=CHUNK_SIZE):
+    projects = (
+        Project.objects.order_by('pk')
+        .select_related('manager')
+        .prefetch_related(Prefetch('members', queryset=User.objects.only('username')))
+        .iterator(chunk_size=chunk_size)
+    )
+    for project in projects:
+        yield {
+            'name': project.name,
+            'description': project.description,
+            'manager': project.manager.username,
+            'members': [member.username for member in project.members.all()],
+            'deadline': project.deadline,
+            'is_active': project.is_active,
+            'created_at': project.created_at,
+        }
+
+
+class _Echo:
+    """A file-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return ' '.join(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return '' if value is None else value
+
+
+def csv_lines(rows, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_csv_value(row[column]) for column in columns])
+
+
+def jsonl_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def export_lines(kind, fmt, chunk_size=CHUNK_SIZE):
+    """Yield the lines of a ``tasks`` or ``projects`` export in ``fmt``."""
+    if kind == 'tasks':
+        rows, columns = task_rows(chunk_size), TASK_COLUMNS
+    elif kind == 'projects':
+        rows, columns = project_rows(chunk_size), PROJECT_COLUMNS
+    else:
+        raise ValueError(f"Unknown export: {kind!r}")
+    if fmt == 'csv':
+        return csv_lines(rows, columns)
+    if fmt == 'jsonl':
+        return jsonl_lines(rows)
+    raise ValueError(f"Unknown format: {fmt!r}")
+
+
+# Import
+def read_rows(lines, fmt):
+    """
+    Yield (line number, row dict) from an iterable of text lines. A line that
+    is not a JSON object yields a ValueError instead, for the import to report.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for number, line in enumerate(lines, start=1):
+            if line.strip():
+                yield number, _json_row(line)
+    else:
+        raise ValueError(f"Unknown format: {fmt!r}")
+
+
+def _json_row(line):
+    try:
+        row = json.loads(line)
+    except ValueError as error:
+        return ValueError(f"invalid JSON: {getattr(error, 'msg', error)}")
+    return row if isinstance(row, dict) else ValueError("not a JSON object")
+
+
+def _clean(form_class, data, foreign_keys):
+    """Validate ``data`` with a model form's rules, leaving the foreign keys to the caller."""
+    form = form_class(data)
+    for name in foreign_keys:
+        form.fields.pop(name, None)
+    if not form.is_valid():
+        errors = '; '.join(f"{field}: {' '.join(messages)}" for field, messages in form.errors.items())
+        return None, errors
+    return form.cleaned_data, None
+
+
+def _users_by_username():
+    return dict(User.objects.values_list('username', 'id'))
+
+
+def _batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_tasks(rows, batch_size=1000, default_creator=None):
+    """
+    Create tasks from (line, row) pairs. Rows naming an unknown user are skipped.
+
+    ``default_creator`` is used for rows without a ``created_by`` username.
+    """
+    result = ImportResult()
+    user_ids = _users_by_username()
+    # Later projects win when names repeat
+    project_ids = dict(Project.objects.order_by('pk').values_list('name', 'id'))
+    touched_users, touched_projects = set(), set()
+
+    def build(line, row):
+        if isinstance(row, ValueError):
+            return result.add_error(line, row)
+        cleaned, errors = _clean(TaskForm, row, ('assigned_to', 'project'))
+        if errors:
+            return result.add_error(line, errors)
+        assigned_to_id = user_ids.get(row.get('assigned_to') or '')
+        created_by_id = user_ids.get(row.get('created_by') or '') or (default_creator and default_creator.pk)
+        if assigned_to_id is None:
+            return result.add_error(line, f"unknown user {row.get('assigned_to')!r}")
+        if created_by_id is None:
+            return result.add_error(line, "no creator")
+        project_id = None
+        if row.get('project'):
+            project_id = project_ids.get(row['project'])
+            if project_id is None:
+                return result.add_error(line, f"unknown project {row['project']!r}")
+        touched_users.add(assigned_to_id)
+        if project_id:
+            touched_projects.add(project_id)
+        return Task(assigned_to_id=assigned_to_id, created_by_id=created_by_id, project_id=project_id, **cleaned)
+
+    for batch in _batches(rows, batch_size):
+        tasks = [task for task in (build(line, row) for line, row in batch) if task is not None]
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+            counters.apply(_task_deltas(tasks))
+        result.created += len(tasks)
+
+    _after_import(touched_users, touched_projects)
+    return result
+
+
+def import_projects(rows, batch_size=1000):
+    """Create projects and their memberships from (line, row) pairs."""
+    result = ImportResult()
+    user_ids = _users_by_username()
+    Membership = Project.members.through
+    touched_users, touched_projects = set(), set()
+
+    def build(line, row):
+        if isinstance(row, ValueError):
+            result.add_error(line, row)
+            return None
+        cleaned, errors = _clean(ProjectForm, row, ('members',))
+        if errors:
+            result.add_error(line, errors)
+            return None
+        manager_id = user_ids.get(row.get('manager') or '')
+        if manager_id is None:
+            result.add_error(line, f"unknown user {row.get('manager')!r}")
+            return None
+        members = row.get('members') or []
+        if isinstance(members, str):
+            members = members.split()
+        member_ids = [user_ids[username] for username in members if username in user_ids]
+        touched_users.update(member_ids + [manager_id])
+        return Project(manager_id=manager_id, **cleaned), member_ids
+
+    for batch in _batches(rows, batch_size):
+        built = [item for item in (build(line, row) for line, row in batch) if item is not None]
+        with transaction.atomic():
+            projects = Project.objects.bulk_create([project for project, member_ids in built])
+            Membership.objects.bulk_create([
+                Membership(project_id=project.pk, user_id=user_id)
+                for project, member_ids in built for user_id in member_ids
+            ], ignore_conflicts=True)
+            counters.increment([counters.PROJECTS], len(projects))
+        touched_projects.update(project.pk for project in projects)
+        result.created += len(projects)
+
+    _after_import(touched_users, touched_projects)
+    return result
+
+
+def _task_deltas(tasks):
+    """{counter key: number of ``tasks`` it counts}, to adjust like the per-task signals would."""
+    deltas = {}
+    for task in tasks:
+        for key in counters.task_keys(task.status, task.assigned_to_id, task.project_id):
+            deltas[key] = deltas.get(key, 0) + 1
+    return deltas
+
+
+def _after_import(user_ids, project_ids):
+    # bulk_create skips signals, so refresh what they would have maintained
+    # (the counters were adjusted with each batch)
+    workload.refresh_users(user_ids)
+    caching.bump('tasks', 'projects', *[f'user:{pk}' for pk in user_ids],
+                 *[f'project:{pk}' for pk in project_ids])
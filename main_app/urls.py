@@ -1,31 +1,63 @@
+from types import ModuleType
+
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from . import views
-
-urlpatterns = [
-    # Home and Authentication URLs
-    path('', views.home, name='home'),
-    path('dashboard/', views.dashboard, name='dashboard'),
-    path('login/', auth_views.LoginView.as_view(), name='login'),
-    path('logout/', views.custom_logout, name='logout'),
-    path('register/', views.register, name='register'),
-    path('profile/', views.profile, name='profile'),
+from . import api, async_views, views
+
+def build_urlpatterns(read_views):
+    """The app's URLs, with the read-heavy pages served by ``read_views`` (views or async_views)."""
+    return [
+        # Home and Authentication URLs
+        path('', views.home, name='home'),
+        path('dashboard/', read_views.dashboard, name='dashboard'),
+        path('login/', auth_views.LoginView.as_view(), name='login'),
+        path('logout/', views.custom_logout, name='logout'),
+        path('register/', views.register, name='register'),
+        path('profile/', views.profile, name='profile'),
     
-    # User Management URLs
-    path('users/', views.user_list, name='user_list'),
-    path('users/<int:pk>/', views.user_detail, name='user_detail'),
+        # User Management URLs
+        path('users/', views.user_list, name='user_list'),
+        path('users/autocomplete/', views.user_autocomplete, name='user_autocomplete'),
+        path('users/<int:pk>/', read_views.user_detail, name='user_detail'),
     
-    # Task Management URLs
-    path('tasks/', views.task_list, name='task_list'),
-    path('tasks/create/', views.task_create, name='task_create'),
-    path('tasks/<int:pk>/', views.task_detail, name='task_detail'),
-    path('tasks/<int:pk>/update/', views.task_update, name='task_update'),
-    path('tasks/<int:pk>/delete/', views.task_delete, name='task_delete'),
+        # Task Management URLs
+        path('tasks/', read_views.task_list, name='task_list'),
+        path('tasks/create/', views.task_create, name='task_create'),
+        path('tasks/bulk/', views.task_bulk, name='task_bulk'),
+        path('tasks/<int:pk>/', views.task_detail, name='task_detail'),
+        path('tasks/<int:pk>/update/', views.task_update, name='task_update'),
+        path('tasks/<int:pk>/delete/', views.task_delete, name='task_delete'),
     
-    # Project Management URLs
-    path('projects/', views.project_list, name='project_list'),
-    path('projects/create/', views.project_create, name='project_create'),
-    path('projects/<int:pk>/', views.project_detail, name='project_detail'),
-    path('projects/<int:pk>/update/', views.project_update, name='project_update'),
-    path('projects/<int:pk>/delete/', views.project_delete, name='project_delete'),
-]
+        # Project Management URLs
+        path('projects/', read_views.project_list, name='project_list'),
+        path('projects/create/', views.project_create, name='project_create'),
+        path('projects/<int:pk>/', read_views.project_detail, name='project_detail'),
+        path('projects/<int:pk>/update/', views.project_update, name='project_update'),
+        path('projects/<int:pk>/delete/', views.project_delete, name='project_delete'),
+
+        # Search-as-you-type URLs
+        path('search/<str:kind>/', views.live_search, name='live_search'),
+
+        # Import/Export URLs
+        path('export/<str:kind>/', views.export_data, name='export_data'),
+
+        # Report URLs
+        path('reports/workload/', views.workload_report, name='workload_report'),
+
+        # JSON API URLs
+        path('api/<str:resource>/', api.resource_list, name='api_list'),
+        path('api/<str:resource>/<int:pk>/', api.resource_detail, name='api_detail'),
+
+        # Performance URLs
+        path('perf/', views.perf_report, name='perf_report'),
+    ]
+
+def urlconf(read_views):
+    """A URLconf module serving the app with ``read_views``, for comparing the two."""
+    module = ModuleType(f'{__name__}.{read_views.__name__}')
+    module.urlpatterns = build_urlpatterns(read_views)
+    return module
+
+# The async views only pay off under ASGI, where asgi.py turns them on
+urlpatterns = build_urlpatterns(async_views if settings.ASYNC_VIEWS else views)
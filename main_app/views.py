@@ -1,14 +1,178 @@
+import hashlib
+import json
+from collections import namedtuple
+from datetime import datetime, timezone as dt_timezone
+from operator import attrgetter
+from urllib.parse import urlencode
+
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.db.models import F, Func, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_POST
+from django.utils import timezone
+from django.utils.http import url_has_allowed_host_and_scheme
 from .models import UserProfile, Task, Project
-from .forms import CustomUserCreationForm, UserProfileForm, TaskForm, ProjectForm
+from .forms import CustomUserCreationForm, UserProfileForm, TaskForm, ProjectForm, TaskBulkForm
+from . import autocomplete, bulk, caching, counters, perf, transfer, workload
+from .pagination import CursorPaginator
+from .search import parse_terms, search
+
+def count_subquery(queryset):
+    """A correlated COUNT(*) of ``queryset`` usable as an annotation."""
+    counted = queryset.order_by().annotate(count=Func('pk', function='COUNT')).values('count')
+    return Coalesce(Subquery(counted), 0)
+
+def user_projects(user):
+    """Projects the user manages or is a member of."""
+    return Project.objects.filter(Q(manager=user) | Q(members=user)).distinct()
+
+def dashboard_counter_keys(user):
+    status_keys = [counters.task_status_key(status) for status, label in Task.STATUS_CHOICES]
+    return [counters.USERS, counters.TASKS, counters.PROJECTS, counters.user_tasks_key(user.pk)] + status_keys
+
+def dashboard_stats(stats, user):
+    """The dashboard's statistics context from the counter values."""
+    return {
+        'total_users': stats[counters.USERS],
+        'total_tasks': stats[counters.TASKS],
+        'total_projects': stats[counters.PROJECTS],
+        'user_tasks': stats[counters.user_tasks_key(user.pk)],
+        'task_status_counts': [
+            (label, stats[counters.task_status_key(status)]) for status, label in Task.STATUS_CHOICES
+        ],
+    }
+
+def filtered_tasks(request):
+    """The task_list queryset and filter values for the request's search, status and priority."""
+    filters = {
+        'search_query': request.GET.get('search', ''),
+        'status_filter': request.GET.get('status', ''),
+        'priority_filter': request.GET.get('priority', ''),
+    }
+    tasks = Task.objects.select_related('assigned_to')
+    
+    if filters['search_query']:
+        tasks = search(tasks, filters['search_query'])
+    
+    if filters['status_filter']:
+        tasks = tasks.filter(status=filters['status_filter'])
+    
+    if filters['priority_filter']:
+        tasks = tasks.filter(priority=filters['priority_filter'])
+    return tasks, filters
+
+def project_annotations():
+    """Per-project member count, open task count and next open task due date, as correlated subqueries."""
+    open_tasks = Task.objects.filter(workload.OPEN, project=OuterRef('pk'))
+    return {
+        'member_count': count_subquery(Project.members.through.objects.filter(project=OuterRef('pk'))),
+        'open_task_count': count_subquery(open_tasks),
+        'next_due_date': Subquery(
+            open_tasks.filter(due_date__gte=timezone.now()).order_by('due_date').values('due_date')[:1]
+        ),
+    }
+
+# ?sort= keys (prefix with - to reverse) and the column each sorts by. Empty
+# dates sort as the far future, so the cursor never holds a NULL.
+NEVER = Value(datetime.max.replace(tzinfo=dt_timezone.utc))
+PROJECT_SORTS = {
+    'created': ('created_at', None),
+    'name': ('name', None),
+    'manager': ('manager_username', F('manager__username')),
+    'members': ('member_count', None),
+    'open_tasks': ('open_task_count', None),
+    'next_due': ('next_due_sort', Coalesce('next_due_date', NEVER)),
+    'deadline': ('deadline_sort', Coalesce('deadline', NEVER)),
+}
+PROJECT_SORT_CHOICES = [
+    ('-created', 'Newest'),
+    ('name', 'Name'),
+    ('manager', 'Manager'),
+    ('-members', 'Most members'),
+    ('-open_tasks', 'Most open tasks'),
+    ('next_due', 'Next task due'),
+    ('deadline', 'Deadline'),
+]
+
+def filtered_projects(request):
+    """The project_list queryset, its cursor ordering and the filter values for the request."""
+    filters = {
+        'search_query': request.GET.get('search', ''),
+        'active_filter': request.GET.get('is_active', ''),
+        'sort': request.GET.get('sort', ''),
+    }
+    projects = Project.objects.select_related('manager').annotate(**project_annotations())
+
+    if filters['search_query']:
+        projects = search(projects, filters['search_query'])
+
+    if filters['active_filter'] in ('0', '1'):
+        projects = projects.filter(Project.active_filter(filters['active_filter'] == '1'))
+
+    if filters['sort'].lstrip('-') not in PROJECT_SORTS:
+        filters['sort'] = '-created'
+    descending = filters['sort'].startswith('-')
+    column, expression = PROJECT_SORTS[filters['sort'].lstrip('-')]
+    if expression is not None:
+        projects = projects.annotate(**{column: expression})
+    # The id breaks ties, so every row has its own cursor position
+    ordering = [column, 'id'] if not descending else [f'-{column}', '-id']
+    return projects, ordering, filters
+
+# Search-as-you-type: the top matches only, with just the columns the rows show
+LIVE_SEARCH_LIMIT = 10
+PERSON_COLUMNS = ('id', 'username', 'first_name', 'last_name')
+
+def _person_columns(relation):
+    return [f'{relation}__{column}' for column in PERSON_COLUMNS]
+
+def live_tasks(params):
+    tasks = Task.objects.select_related('assigned_to').only(
+        'id', 'title', 'description', 'priority', 'status', 'created_at', *_person_columns('assigned_to'),
+    )
+    for name in ('status', 'priority'):
+        if params.get(name):
+            tasks = tasks.filter(**{name: params[name]})
+    return tasks
+
+def live_projects(params):
+    projects = Project.objects.select_related('manager').only(
+        'id', 'name', 'description', 'is_active', 'deadline', 'created_at', *_person_columns('manager'),
+    ).annotate(**project_annotations())
+    if params.get('is_active') in ('0', '1'):
+        projects = projects.filter(Project.active_filter(params['is_active'] == '1'))
+    return projects
+
+def live_users(params):
+    return User.objects.select_related('userprofile').only(
+        *PERSON_COLUMNS, 'email', 'date_joined', 'userprofile__profile_picture', 'userprofile__thumbnails',
+    ).annotate(
+        task_count=count_subquery(Task.objects.filter(assigned_to=OuterRef('pk'))),
+        project_count=count_subquery(Project.objects.filter(manager=OuterRef('pk'))),
+    )
+
+# queryset(params), rows template, cache scopes the rows depend on, and label/URL for JSON
+LiveSearch = namedtuple('LiveSearch', 'queryset template scopes filters label url_name')
+LIVE_SEARCHES = {
+    'tasks': LiveSearch(live_tasks, 'tasks/task_rows.html', ('tasks', 'users'),
+                        ('status', 'priority'), attrgetter('title'), 'task_detail'),
+    'projects': LiveSearch(live_projects, 'projects/project_cards.html', ('projects', 'tasks', 'users'),
+                           ('is_active',), attrgetter('name'), 'project_detail'),
+    'users': LiveSearch(live_users, 'users/user_cards.html', ('users', 'tasks', 'projects'),
+                        (), autocomplete.label, 'user_detail'),
+}
 
 def home(request):
     """Home view that shows welcome page or redirects to dashboard"""
@@ -43,37 +207,38 @@ def custom_logout(request):
 
 @login_required
 def dashboard(request):
-    # Get statistics
-    total_users = User.objects.count()
-    total_tasks = Task.objects.count()
-    total_projects = Project.objects.count()
-    user_tasks = Task.objects.filter(assigned_to=request.user).count()
-    
-    # Recent tasks
-    recent_tasks = Task.objects.filter(assigned_to=request.user)[:5]
-    
-    # Recent projects
-    recent_projects = Project.objects.filter(
-        Q(manager=request.user) | Q(members=request.user)
-    ).distinct()[:5]
-    
+    user = request.user
+    stats_version = caching.versions('tasks', 'projects', 'users', f'user:{user.pk}')
+    recent_version = caching.versions(f'user:{user.pk}')
+
+    def get_stats():
+        # Get statistics from the materialized counters
+        return dashboard_stats(counters.get_counts(dashboard_counter_keys(user)), user)
+
+    def get_recent():
+        return {
+            'recent_tasks': list(Task.objects.filter(assigned_to=user)[:5]),
+            'recent_projects': list(user_projects(user)[:5]),
+        }
+
     context = {
-        'total_users': total_users,
-        'total_tasks': total_tasks,
-        'total_projects': total_projects,
-        'user_tasks': user_tasks,
-        'recent_tasks': recent_tasks,
-        'recent_projects': recent_projects,
+        'cache_timeout': settings.FRAGMENT_CACHE_TIMEOUT,
+        'stats_version': stats_version,
+        'recent_version': recent_version,
     }
+    context.update(caching.cached_context(f'dashboard:stats:{user.pk}', stats_version, get_stats))
+    context.update(caching.cached_context(f'dashboard:recent:{user.pk}', recent_version, get_recent))
     return render(request, 'dashboard.html', context)
 
 @login_required
 def profile(request):
-    profile, created = UserProfile.objects.get_or_create(user=request.user)
+    profile = UserProfile.for_user(request.user)
     if request.method == 'POST':
         form = UserProfileForm(request.POST, request.FILES, instance=profile)
         if form.is_valid():
-            form.save()
+            # Walang binago, walang isusulat (this is also what creates the profile)
+            if form.has_changed():
+                form.save()
             messages.success(request, 'Profile updated successfully!')
             return redirect('profile')
     else:
@@ -84,19 +249,16 @@ def profile(request):
 @login_required
 def user_list(request):
     search_query = request.GET.get('search', '')
-    users = User.objects.all()
+    users = User.objects.select_related('userprofile').annotate(
+        task_count=count_subquery(Task.objects.filter(assigned_to=OuterRef('pk'))),
+        project_count=count_subquery(Project.objects.filter(manager=OuterRef('pk'))),
+    )
     
     if search_query:
-        users = users.filter(
-            Q(username__icontains=search_query) |
-            Q(first_name__icontains=search_query) |
-            Q(last_name__icontains=search_query) |
-            Q(email__icontains=search_query)
-        )
+        users = search(users, search_query)
     
-    paginator = Paginator(users, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = CursorPaginator(users, 10, ordering=('-date_joined', '-id'), count_mode='approximate')
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     return render(request, 'users/user_list.html', {
         'page_obj': page_obj,
@@ -105,53 +267,82 @@ def user_list(request):
 
 @login_required
 def user_detail(request, pk):
-    user = get_object_or_404(User, pk=pk)
-    profile, created = UserProfile.objects.get_or_create(user=user)
-    user_tasks = Task.objects.filter(assigned_to=user)[:10]
-    user_projects = Project.objects.filter(
-        Q(manager=user) | Q(members=user)
-    ).distinct()[:10]
-    
-    return render(request, 'users/user_detail.html', {
-        'user': user,
-        'profile': profile,
-        'user_tasks': user_tasks,
-        'user_projects': user_projects,
+    version = caching.versions(f'user:{pk}')
+
+    def get_context():
+        user = get_object_or_404(User, pk=pk)
+        profile = UserProfile.for_user(user)
+        projects = user_projects(user)
+        user_tasks_key = counters.user_tasks_key(user.pk)
+        return {
+            'user': user,
+            'profile': profile,
+            'user_tasks': list(Task.objects.filter(assigned_to=user)[:10]),
+            'user_projects': list(projects[:10]),
+            'task_count': counters.get_counts([user_tasks_key])[user_tasks_key],
+            'project_count': projects.count(),
+        }
+
+    context = caching.cached_context(f'user_detail:{pk}', version, get_context)
+    return render(request, 'users/user_detail.html', dict(
+        context, cache_timeout=settings.FRAGMENT_CACHE_TIMEOUT, cache_version=version,
+    ))
+
+@login_required
+def user_autocomplete(request):
+    """Users matching ?q= by username or name prefix, as JSON for the user pickers"""
+    try:
+        limit = min(int(request.GET.get('limit', autocomplete.DEFAULT_LIMIT)), autocomplete.MAX_LIMIT)
+    except ValueError:
+        limit = autocomplete.DEFAULT_LIMIT
+    users = autocomplete.match_users(request.GET.get('q', ''), max(limit, 1))
+    return JsonResponse({
+        'results': [{'id': user.pk, 'username': user.username, 'label': autocomplete.label(user)} for user in users],
     })
 
+@login_required
+def live_search(request, kind):
+    """The best matches of ?search= as list rows (HTML), or ?format=json, for search-as-you-type"""
+    if kind not in LIVE_SEARCHES:
+        raise Http404(f"Nothing to search named {kind!r}.")
+    config = LIVE_SEARCHES[kind]
+    terms = parse_terms(request.GET.get('search', ''))
+    as_json = request.GET.get('format') == 'json'
+    params = {name: request.GET.get(name, '') for name in config.filters}
+    # "Fix  Auth" and "fix auth" match the same rows, so they share one cache entry
+    normalized = urlencode(sorted({'search': ' '.join(terms), 'json': as_json, **params}.items()))
+
+    def get_content():
+        rows = []
+        if terms:
+            rows = list(search(config.queryset(params), ' '.join(terms), ranked=True)[:LIVE_SEARCH_LIMIT])
+        if as_json:
+            return json.dumps({'results': [
+                {'id': row.pk, 'label': config.label(row), 'url': reverse(config.url_name, args=[row.pk])}
+                for row in rows
+            ]})
+        return render_to_string(config.template, {kind: rows}, request=request)
+
+    content = caching.cached_context(
+        f'live_search:{kind}:{hashlib.md5(normalized.encode()).hexdigest()}',
+        caching.versions(*config.scopes), get_content, timeout=settings.LIVE_SEARCH_CACHE_TIMEOUT,
+    )
+    return HttpResponse(content, content_type='application/json' if as_json else 'text/html; charset=utf-8')
+
 # Task Management Views
 @login_required
 def task_list(request):
-    search_query = request.GET.get('search', '')
-    status_filter = request.GET.get('status', '')
-    priority_filter = request.GET.get('priority', '')
-    
-    tasks = Task.objects.all()
-    
-    if search_query:
-        tasks = tasks.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query)
-        )
-    
-    if status_filter:
-        tasks = tasks.filter(status=status_filter)
-    
-    if priority_filter:
-        tasks = tasks.filter(priority=priority_filter)
-    
-    paginator = Paginator(tasks, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    tasks, filters = filtered_tasks(request)
+    paginator = CursorPaginator(tasks, 10, count_mode='approximate')
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
-    return render(request, 'tasks/task_list.html', {
-        'page_obj': page_obj,
-        'search_query': search_query,
-        'status_filter': status_filter,
-        'priority_filter': priority_filter,
-        'status_choices': Task.STATUS_CHOICES,
-        'priority_choices': Task.PRIORITY_CHOICES,
-    })
+    return render(request, 'tasks/task_list.html', dict(
+        filters,
+        page_obj=page_obj,
+        bulk_form=TaskBulkForm(),
+        status_choices=Task.STATUS_CHOICES,
+        priority_choices=Task.PRIORITY_CHOICES,
+    ))
 
 @login_required
 def task_create(request):
@@ -164,12 +355,12 @@ def task_create(request):
             messages.success(request, 'Task created successfully!')
             return redirect('task_list')
     else:
-        form = TaskForm()
+        form = TaskForm(initial={'project': request.GET.get('project')})
     return render(request, 'tasks/task_form.html', {'form': form, 'title': 'Create Task'})
 
 @login_required
 def task_detail(request, pk):
-    task = get_object_or_404(Task, pk=pk)
+    task = get_object_or_404(Task.objects.select_related('assigned_to', 'created_by', 'project'), pk=pk)
     return render(request, 'tasks/task_detail.html', {'task': task})
 
 @login_required
@@ -187,33 +378,62 @@ def task_update(request, pk):
 
 @login_required
 def task_delete(request, pk):
-    task = get_object_or_404(Task, pk=pk)
+    task = get_object_or_404(Task.objects.select_related('assigned_to'), pk=pk)
     if request.method == 'POST':
         task.delete()
         messages.success(request, 'Task deleted successfully!')
         return redirect('task_list')
     return render(request, 'tasks/task_confirm_delete.html', {'task': task})
 
+@login_required
+@require_POST
+def task_bulk(request):
+    """Change the status/priority/assignee of, or delete, many tasks at once"""
+    as_json = request.content_type == 'application/json'
+    if as_json:
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return JsonResponse({'error': 'The request body must be a JSON object.'}, status=400)
+    else:
+        data = request.POST
+    form = TaskBulkForm(data)
+
+    if not form.is_valid():
+        if as_json:
+            return JsonResponse({'error': 'Invalid data.', 'errors': form.errors.get_json_data()}, status=400)
+        messages.error(request, ' '.join(error for errors in form.errors.values() for error in errors))
+    elif form.cleaned_data['action'] == 'delete':
+        count = bulk.delete_tasks(form.cleaned_data['task_ids'])
+        if as_json:
+            return JsonResponse({'action': 'delete', 'count': count})
+        messages.success(request, f'{count} task(s) deleted successfully!')
+    else:
+        count = bulk.update_tasks(form.cleaned_data['task_ids'], **form.changes())
+        if as_json:
+            return JsonResponse({'action': 'update', 'count': count})
+        messages.success(request, f'{count} task(s) updated successfully!')
+
+    # Balik sa parehong page at filters
+    next_url = request.POST.get('next', '')
+    if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        next_url = 'task_list'
+    return redirect(next_url)
+
 # Project Management Views
 @login_required
 def project_list(request):
-    search_query = request.GET.get('search', '')
-    projects = Project.objects.all()
-    
-    if search_query:
-        projects = projects.filter(
-            Q(name__icontains=search_query) |
-            Q(description__icontains=search_query)
-        )
-    
-    paginator = Paginator(projects, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    projects, ordering, filters = filtered_projects(request)
+    paginator = CursorPaginator(projects, 10, ordering=ordering, count_mode='approximate')
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
-    return render(request, 'projects/project_list.html', {
-        'page_obj': page_obj,
-        'search_query': search_query
-    })
+    return render(request, 'projects/project_list.html', dict(
+        filters,
+        page_obj=page_obj,
+        sort_choices=PROJECT_SORT_CHOICES,
+    ))
 
 @login_required
 def project_create(request):
@@ -232,12 +452,23 @@ def project_create(request):
 
 @login_required
 def project_detail(request, pk):
-    project = get_object_or_404(Project, pk=pk)
-    project_tasks = Task.objects.filter(assigned_to__in=project.members.all())[:10]
-    return render(request, 'projects/project_detail.html', {
-        'project': project,
-        'project_tasks': project_tasks
-    })
+    version = caching.versions(f'project:{pk}')
+
+    def get_context():
+        project = get_object_or_404(Project.objects.select_related('manager'), pk=pk)
+        members = list(project.members.select_related('userprofile'))
+        return {
+            'project': project,
+            'members': members,
+            'member_count': len(members),
+            'project_tasks': list(project.tasks.select_related('assigned_to')[:10]),
+            'task_status_counts': counters.project_status_counts(project.pk),
+        }
+
+    context = caching.cached_context(f'project_detail:{pk}', version, get_context)
+    return render(request, 'projects/project_detail.html', dict(
+        context, cache_timeout=settings.FRAGMENT_CACHE_TIMEOUT, cache_version=version,
+    ))
 
 @login_required
 def project_update(request, pk):
@@ -254,9 +485,33 @@ def project_update(request, pk):
 
 @login_required
 def project_delete(request, pk):
-    project = get_object_or_404(Project, pk=pk)
+    project = get_object_or_404(Project.objects.select_related('manager'), pk=pk)
     if request.method == 'POST':
         project.delete()
         messages.success(request, 'Project deleted successfully!')
         return redirect('project_list')
     return render(request, 'projects/project_confirm_delete.html', {'project': project})
+
+@login_required
+def export_data(request, kind):
+    """Stream every task or project as CSV or JSONL (?format=csv|jsonl)"""
+    fmt = request.GET.get('format', 'csv')
+    if kind not in ('tasks', 'projects') or fmt not in transfer.FORMATS:
+        raise Http404
+    content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = StreamingHttpResponse(transfer.export_lines(kind, fmt), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{kind}.{fmt}"'
+    return response
+
+@login_required
+def workload_report(request):
+    """Per-user task counts by status and priority, with overdue tasks, from the workload summary"""
+    paginator = Paginator(workload.report(), 25)
+    return render(request, 'reports/workload.html', {
+        'page_obj': paginator.get_page(request.GET.get('page')),
+    })
+
+@staff_member_required
+def perf_report(request):
+    """Request time, query and template percentiles per URL name, slowest first"""
+    return JsonResponse({'bucket_growth': perf.BUCKET_GROWTH, 'views': perf.report()})
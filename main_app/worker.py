@@ -0,0 +1,16 @@
+"""
+Entry point of the worker processes started by ``manage.py run_worker``.
+
+This module imports no models: where processes are spawned rather than forked
+(Windows, macOS) a worker starts with nothing loaded and has to set Django up
+before the job code can be imported.
+"""
+
+import django
+
+
+def main(stop, batch, poll_interval):
+    django.setup()
+    from . import jobs
+
+    jobs.work_in_process(stop, batch, poll_interval)
@@ -0,0 +1,129 @@
+"""
+Per-user workload summary for the workload report.
+
+UserWorkload holds one row per (assignee, status, priority) with its number
+of tasks and of overdue tasks (open, with ``due_date`` in the past). The rows
+are built with a single grouped pass over Task. After that the Task signal
+handlers queue a background job recounting just the groups a saved or
+deleted task left and joined, so reading the report costs the same however
+many tasks there are. A recount gives the same result whenever and however
+often it runs, so jobs may be retried or run out of order.
+
+Tasks also become overdue just by time passing. Each row remembers the
+earliest due date it has not counted yet (``next_due_date``), and
+``manage.py refresh_overdue``, run from cron, recounts the rows whose date
+has passed. The report page only reads, so it can be served from a replica.
+"""
+
+from django.db import transaction
+from django.db.models import Count, Min, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import jobs
+from .models import Task, UserWorkload
+
+OPEN = ~Q(status='completed')
+REFRESH_BATCH = 500
+
+
+def grouped(tasks, now):
+    """One row of totals per (assignee, status, priority) of ``tasks``."""
+    return (
+        tasks.order_by()
+        .values('assigned_to_id', 'status', 'priority')
+        .annotate(
+            tasks=Count('id'),
+            overdue=Count('id', filter=OPEN & Q(due_date__lt=now)),
+            next_due_date=Min('due_date', filter=OPEN & Q(due_date__gte=now)),
+        )
+    )
+
+
+def _rows(tasks, now):
+    return [
+        UserWorkload(user_id=row['assigned_to_id'], status=row['status'], priority=row['priority'],
+                     tasks=row['tasks'], overdue=row['overdue'], next_due_date=row['next_due_date'])
+        for row in grouped(tasks, now)
+    ]
+
+
+def rebuild(batch_size=1000):
+    """Replace the whole summary table from one grouped pass over the tasks."""
+    rows = _rows(Task.objects.all(), timezone.now())
+    with transaction.atomic():
+        UserWorkload.objects.all().delete()
+        UserWorkload.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+@jobs.job
+def refresh_users(user_ids):
+    """Recount every row of the given users, e.g. after a bulk change to their tasks."""
+    user_ids = list(user_ids)
+    rows = _rows(Task.objects.filter(assigned_to_id__in=user_ids), timezone.now())
+    with transaction.atomic():
+        UserWorkload.objects.filter(user_id__in=user_ids).delete()
+        UserWorkload.objects.bulk_create(rows)
+
+
+@jobs.job
+def refresh_groups(groups):
+    """Recount the rows of the given [assignee, status, priority] groups."""
+    if not groups:
+        return
+    tasks = Q()
+    rows = Q()
+    for user_id, status, priority in groups:
+        tasks |= Q(assigned_to_id=user_id, status=status, priority=priority)
+        rows |= Q(user_id=user_id, status=status, priority=priority)
+    counted = _rows(Task.objects.filter(tasks), timezone.now())
+    with transaction.atomic():
+        UserWorkload.objects.filter(rows).delete()
+        UserWorkload.objects.bulk_create(counted)
+
+
+def refresh_overdue():
+    """Recount the rows holding tasks that became overdue since they were last counted."""
+    now = timezone.now()
+    stale_users = list(
+        UserWorkload.objects.filter(next_due_date__lte=now).order_by()
+        .values_list('user_id', flat=True).distinct()
+    )
+    for start in range(0, len(stale_users), REFRESH_BATCH):
+        user_ids = stale_users[start:start + REFRESH_BATCH]
+        counts = {
+            (row['assigned_to_id'], row['status'], row['priority']): row
+            for row in grouped(Task.objects.filter(OPEN, assigned_to_id__in=user_ids), now)
+        }
+        rows = list(UserWorkload.objects.filter(OPEN, user_id__in=user_ids))
+        for row in rows:
+            counted = counts.get((row.user_id, row.status, row.priority), {})
+            row.overdue = counted.get('overdue', 0)
+            row.next_due_date = counted.get('next_due_date')
+        UserWorkload.objects.bulk_update(rows, ['overdue', 'next_due_date'])
+    return len(stale_users)
+
+
+def _total(condition):
+    return Coalesce(Sum('tasks', filter=condition), 0)
+
+
+def report():
+    """Per-user totals by status, open tasks by priority and overdue tasks, most overdue first."""
+    return (
+        UserWorkload.objects
+        .values('user_id', 'user__username', 'user__first_name', 'user__last_name')
+        .annotate(
+            total=Coalesce(Sum('tasks'), 0),
+            pending=_total(Q(status='pending')),
+            in_progress=_total(Q(status='in_progress')),
+            completed=_total(Q(status='completed')),
+            high=_total(OPEN & Q(priority='high')),
+            medium=_total(OPEN & Q(priority='medium')),
+            low=_total(OPEN & Q(priority='low')),
+            overdue=Coalesce(Sum('overdue'), 0),
+        )
+        .filter(total__gt=0)
+        .order_by('-overdue', '-high', 'user__username')
+    )
@@ -7,5 +7,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nikjin_project.settings')
+# Under ASGI the read-heavy pages use the async views unless ASYNC_VIEWS=False
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
@@ -4,6 +4,9 @@ Django settings for nikjin_project project.
 
 from pathlib import Path
 import os
+import sys
+from decouple import Csv, config
+from django.conf import global_settings
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -35,12 +38,16 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    # Widget templates for FORM_RENDERER below
+    'django.forms',
     'crispy_forms',
     'crispy_bootstrap5',
     'main_app',
 ]
 
 MIDDLEWARE = [
+    'main_app.middleware.PerformanceMiddleware',
+    'main_app.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,12 +59,22 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'nikjin_project.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+# Keep parsed templates in memory (runserver still reloads them when a file
+# changes); TEMPLATE_CACHE=False parses every template on every render
+if config('TEMPLATE_CACHE', default=True, cast=bool):
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to PerformanceMiddleware
+        'BACKEND': 'main_app.perf.InstrumentedTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -71,13 +88,118 @@ TEMPLATES = [
 WSGI_APPLICATION = 'nikjin_project.wsgi.application'
 
 # Database
+#   sqlite         - SQLite tuned for concurrent workers (main_app/sqlite): WAL,
+#                    synchronous=NORMAL, a 64 MiB page cache, 256 MiB of mmap and
+#                    writers that queue on BEGIN IMMEDIATE instead of failing
+#   sqlite-default - Django's stock SQLite settings, to compare against
+#   postgresql     - PostgreSQL from the DB_* variables
+DB_PROFILE = config('DB_PROFILE', default='sqlite')
+# Seconds a connection is kept open between requests (0 closes it after each
+# one); health checks replace a connection that died while it was idle
+CONN_MAX_AGE = config('CONN_MAX_AGE', default=60, cast=int)
+SQLITE_DATABASE = {
+    'ENGINE': 'main_app.sqlite',
+    'NAME': BASE_DIR / 'db.sqlite3',
+    'CONN_MAX_AGE': CONN_MAX_AGE,
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),
+            'cache_size': -64000,
+            'mmap_size': 256 * 1024 * 1024,
+            'temp_store': 'MEMORY',
+        },
+        'transaction_mode': 'IMMEDIATE',
+    },
+}
+POSTGRESQL_DATABASE = {
+    'ENGINE': 'django.db.backends.postgresql',
+    'NAME': config('DB_NAME', default='nikjin'),
+    'USER': config('DB_USER', default='nikjin'),
+    'PASSWORD': config('DB_PASSWORD', default=''),
+    'HOST': config('DB_HOST', default='127.0.0.1'),
+    'PORT': config('DB_PORT', default='5432'),
+    'CONN_MAX_AGE': CONN_MAX_AGE,
+    'CONN_HEALTH_CHECKS': True,
+    # Behind PgBouncer in transaction mode a cursor cannot outlive its transaction
+    'DISABLE_SERVER_SIDE_CURSORS': config('DB_PGBOUNCER', default=False, cast=bool),
+    'OPTIONS': {
+        'connect_timeout': config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+    },
+}
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'sqlite': SQLITE_DATABASE,
+        'sqlite-default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'db.sqlite3'},
+        'postgresql': POSTGRESQL_DATABASE,
+    }[DB_PROFILE],
+}
+
+# Read replicas, comma separated: SQLite files (kept in sync locally with
+# sync_replicas) or PostgreSQL hosts. GET/HEAD requests read from them,
+# except for browsers that wrote in the last REPLICA_STICKY_SECONDS.
+REPLICA_DATABASES = []
+for number, replica in enumerate(config('DB_REPLICAS', default='', cast=Csv()), start=1):
+    location = {'HOST': replica} if DATABASES['default']['ENGINE'].endswith('postgresql') else {'NAME': BASE_DIR / replica}
+    DATABASES[f'replica{number}'] = {**DATABASES['default'], **location, 'TEST': {'MIRROR': 'default'}}
+    REPLICA_DATABASES.append(f'replica{number}')
+DATABASE_ROUTERS = ['main_app.routers.ReplicaRouter']
+# Seconds a browser keeps reading from the primary after a write; longer than the replication lag
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
+
+# Cache
+# Use locmem for a single process, FileBasedCache or RedisCache to share between workers, e.g.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://127.0.0.1:6379
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='nikjin-cache'),
     }
 }
 
+# Session and authentication hot path:
+#   db     - Django's defaults: every request reads its session and user from the database
+#   cached - cached_db sessions and request.user served from the cache (no queries once warm)
+#   cookie - signed-cookie sessions (nothing stored server side) and cached users
+AUTH_PROFILE = config('AUTH_PROFILE', default='cached')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached': 'django.contrib.sessions.backends.cached_db',
+    'cookie': 'django.contrib.sessions.backends.signed_cookies',
+}[AUTH_PROFILE]
+AUTHENTICATION_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
+if AUTH_PROFILE != 'db':
+    # ModelBackend stays listed so sessions started under it keep working
+    AUTHENTICATION_BACKENDS.insert(0, 'main_app.backends.CachedModelBackend')
+# Seconds a logged-in user stays cached; saving the user forgets it at once
+USER_CACHE_TIMEOUT = config('USER_CACHE_TIMEOUT', default=300, cast=int)
+
+# Seconds a rendered fragment or view context stays cached; signals invalidate it sooner
+FRAGMENT_CACHE_TIMEOUT = config('FRAGMENT_CACHE_TIMEOUT', default=600, cast=int)
+# Seconds search-as-you-type results are cached per normalized query
+LIVE_SEARCH_CACHE_TIMEOUT = config('LIVE_SEARCH_CACHE_TIMEOUT', default=30, cast=int)
+
+# Serve dashboard, task/project lists and user/project detail with the async
+# views in main_app/async_views.py. Only worth it under ASGI; asgi.py enables it.
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
+# Request performance metrics (main_app/perf.py)
+PERF_ENABLED = config('PERF_ENABLED', default=True, cast=bool)
+# Seconds each process collects metrics before adding them to the cache
+PERF_FLUSH_INTERVAL = config('PERF_FLUSH_INTERVAL', default=10, cast=int)
+# Queries slower than this (ms) are kept for the report
+PERF_SLOW_QUERY_MS = config('PERF_SLOW_QUERY_MS', default=50, cast=float)
+
+# Password hashing is slow on purpose. The test suite and the load generators only
+# create throwaway accounts, so they hash with MD5 first; never enable this in production
+FAST_PASSWORD_HASHER = config(
+    'FAST_PASSWORD_HASHER', default=sys.argv[1:2] in (['test'], ['benchmark'], ['loadtest']), cast=bool,
+)
+if FAST_PASSWORD_HASHER:
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher', *global_settings.PASSWORD_HASHERS]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -111,12 +233,26 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Background jobs (main_app/jobs.py), run by `manage.py run_worker`
+# JOBS_EAGER runs them in the web process right after commit instead, for development without a worker
+JOBS_EAGER = config('JOBS_EAGER', default=False, cast=bool)
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=5, cast=int)
+# Seconds before the first retry; doubled after every failure
+JOB_RETRY_DELAY = config('JOB_RETRY_DELAY', default=10, cast=int)
+# Seconds after which a running job is assumed to have lost its worker
+JOB_TIMEOUT = config('JOB_TIMEOUT', default=600, cast=int)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Crispy Forms
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
+# How the task and project forms render: 'fast' uses the plain Bootstrap
+# template forms/bootstrap.html, 'crispy' goes through crispy_forms
+FORM_RENDERING = config('FORM_RENDERING', default='fast')
+# Render form and widget templates with the engine above, so they are cached too
+FORM_RENDERER = 'django.forms.renderers.TemplatesSetting'
 
 # Login/Logout URLs
 LOGIN_URL = 'login'
@@ -22,29 +22,32 @@ document.addEventListener('DOMContentLoaded', function() {
         }, 5000);
     });
 
-    // Confirm delete actions
-    const deleteButtons = document.querySelectorAll('a[href*="delete"], button[data-action="delete"]');
-    deleteButtons.forEach(function(button) {
-        button.addEventListener('click', function(e) {
-            if (!button.classList.contains('confirmed')) {
-                e.preventDefault();
-                if (confirm('Are you sure you want to delete this item? This action cannot be undone.')) {
-                    button.classList.add('confirmed');
-                    button.click();
-                }
+    // Confirm delete actions (delegated, so rows loaded by live search are covered too)
+    document.addEventListener('click', function(e) {
+        const button = e.target.closest('a[href*="delete"], button[data-action="delete"]');
+        if (button && !button.classList.contains('confirmed')) {
+            e.preventDefault();
+            if (confirm('Are you sure you want to delete this item? This action cannot be undone.')) {
+                button.classList.add('confirmed');
+                button.click();
             }
-        });
+        }
     });
 
     // Search functionality with debounce
     const searchInputs = document.querySelectorAll('input[name="search"]');
     searchInputs.forEach(function(input) {
+        const form = input.closest('form');
+        const results = document.querySelector('[data-live-results]');
+        if (input.dataset.liveSearch && form && results) {
+            initLiveSearch(input, form, results);
+            return;
+        }
         let timeout;
         input.addEventListener('input', function() {
             clearTimeout(timeout);
             timeout = setTimeout(function() {
                 // Auto-submit search form after 500ms of no typing
-                const form = input.closest('form');
                 if (form && input.value.length > 2) {
                     form.submit();
                 }
@@ -52,6 +55,64 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
+    // Search as you type: fetch only the matching rows and swap them in.
+    // Each keystroke aborts the request before it, so a slow stale response
+    // can never overwrite newer results.
+    function initLiveSearch(input, form, results) {
+        const original = results.innerHTML;
+        const hidden = document.querySelectorAll('[data-live-hide]');
+        let timeout;
+        let controller;
+
+        function show(html, searching) {
+            results.innerHTML = html;
+            hidden.forEach(function(element) {
+                element.classList.toggle('d-none', searching);
+            });
+            updateBulkActions();
+        }
+
+        function update() {
+            if (controller) {
+                controller.abort();
+            }
+            if (!input.value.trim()) {
+                controller = null;
+                show(original, false);
+                return;
+            }
+            controller = new AbortController();
+            const params = new URLSearchParams(new FormData(form));
+            fetch(`${input.dataset.liveSearch}?${params}`, {signal: controller.signal})
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(`Search failed with ${response.status}`);
+                    }
+                    return response.text();
+                })
+                .then(html => show(html, true))
+                .catch(error => {
+                    if (error.name !== 'AbortError') {
+                        console.error('Error searching:', error);
+                    }
+                });
+        }
+
+        input.addEventListener('input', function() {
+            clearTimeout(timeout);
+            timeout = setTimeout(update, 250);
+        });
+        // The filters narrow the live results too
+        form.querySelectorAll('select').forEach(function(select) {
+            select.addEventListener('change', function() {
+                if (input.value.trim()) {
+                    clearTimeout(timeout);
+                    update();
+                }
+            });
+        });
+    }
+
     // Form validation
     const forms = document.querySelectorAll('.needs-validation');
     forms.forEach(function(form) {
@@ -125,6 +186,22 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // Bulk actions
     const selectAllCheckbox = document.querySelector('#select-all');
+    const bulkForm = document.querySelector('#bulk-form');
+
+    function updateBulkActions() {
+        if (!bulkForm) {
+            return;
+        }
+        const selected = bulkForm.querySelectorAll('tbody input[type="checkbox"]:checked').length;
+        const count = bulkForm.querySelector('#bulk-count');
+        if (count) {
+            count.textContent = selected;
+        }
+        bulkForm.querySelectorAll('#bulk-actions button').forEach(function(button) {
+            button.disabled = selected === 0;
+        });
+    }
+
     if (selectAllCheckbox) {
         selectAllCheckbox.addEventListener('change', function() {
             const checkboxes = document.querySelectorAll('tbody input[type="checkbox"]');
@@ -135,9 +212,26 @@ document.addEventListener('DOMContentLoaded', function() {
                     row.classList.toggle('table-active', checkbox.checked);
                 }
             });
+            updateBulkActions();
         });
     }
 
+    if (bulkForm) {
+        // Delegated, so rows swapped in by live search work too
+        bulkForm.addEventListener('change', function(e) {
+            const checkbox = e.target;
+            if (!checkbox.matches('tbody input[type="checkbox"]')) {
+                return;
+            }
+            checkbox.closest('tr').classList.toggle('table-active', checkbox.checked);
+            if (selectAllCheckbox && !checkbox.checked) {
+                selectAllCheckbox.checked = false;
+            }
+            updateBulkActions();
+        });
+        updateBulkActions();
+    }
+
     // Dynamic content loading
     const loadMoreButtons = document.querySelectorAll('[data-load-more]');
     loadMoreButtons.forEach(function(button) {
@@ -222,8 +316,94 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         });
     });
+
+    // User and project pickers: the select only holds the chosen rows; search the rest as you type
+    document.querySelectorAll('select[data-autocomplete-url]').forEach(initPicker);
 });
 
+function initPicker(select) {
+    const wrapper = document.createElement('div');
+    wrapper.className = 'position-relative';
+    const chips = document.createElement('div');
+    chips.className = 'd-flex flex-wrap gap-1 mb-1';
+    const input = document.createElement('input');
+    input.type = 'search';
+    input.className = 'form-control';
+    input.placeholder = select.dataset.autocompletePlaceholder;
+    input.autocomplete = 'off';
+    const menu = document.createElement('div');
+    menu.className = 'list-group position-absolute w-100 shadow-sm d-none';
+    menu.style.zIndex = 1000;
+    select.parentNode.insertBefore(wrapper, select);
+    wrapper.append(chips, input, menu, select);
+    // Kept focusable (not display: none) so required-field validation still works
+    select.classList.add('visually-hidden');
+    select.tabIndex = -1;
+
+    function renderChips() {
+        chips.innerHTML = '';
+        Array.from(select.selectedOptions).forEach(function(option) {
+            const chip = document.createElement('span');
+            chip.className = 'badge bg-primary d-inline-flex align-items-center';
+            chip.textContent = option.textContent;
+            const remove = document.createElement('button');
+            remove.type = 'button';
+            remove.className = 'btn-close btn-close-white ms-1';
+            remove.style.fontSize = '0.6em';
+            remove.setAttribute('aria-label', 'Remove');
+            remove.addEventListener('click', function() {
+                option.remove();
+                renderChips();
+            });
+            chip.appendChild(remove);
+            chips.appendChild(chip);
+        });
+    }
+
+    function choose(result) {
+        if (!select.multiple) {
+            select.innerHTML = '';
+        }
+        let option = select.querySelector(`option[value="${result.id}"]`);
+        if (!option) {
+            option = new Option(result.label, result.id);
+            select.appendChild(option);
+        }
+        option.selected = true;
+        input.value = '';
+        menu.classList.add('d-none');
+        renderChips();
+    }
+
+    input.addEventListener('input', debounce(function() {
+        const query = input.value.trim();
+        if (!query) {
+            menu.classList.add('d-none');
+            return;
+        }
+        const url = new URL(select.dataset.autocompleteUrl, window.location.href);
+        url.searchParams.set(select.dataset.autocompleteParam, query);
+        fetch(url, {
+            headers: {'Accept': 'application/json'}
+        })
+            .then(response => response.json())
+            .then(data => {
+                menu.innerHTML = '';
+                data.results.forEach(function(result) {
+                    const item = document.createElement('button');
+                    item.type = 'button';
+                    item.className = 'list-group-item list-group-item-action';
+                    item.textContent = result.label;
+                    item.addEventListener('click', () => choose(result));
+                    menu.appendChild(item);
+                });
+                menu.classList.toggle('d-none', !data.results.length);
+            });
+    }, 200));
+
+    renderChips();
+}
+
 // Utility functions
 function showToast(message, type = 'info') {
     const toastContainer = document.querySelector('.toast-container') || createToastContainer();